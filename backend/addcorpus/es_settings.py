@@ -1,6 +1,7 @@
 import os
 import warnings
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
 
 from django.conf import settings
 from langcodes import Language, standardize_tag
@@ -15,6 +16,7 @@ AVAILABLE_ES_STEMMERS = ['arabic', 'armenian', 'basque', 'bengali', 'brazilian',
                          'persian', 'portuguese', 'romanian', 'russian', 'sorani',
                          'spanish', 'swedish', 'turkish', 'thai']
 
+@lru_cache(maxsize=None)
 def get_language_key(language_code):
     '''
     Get the nltk stopwords file / elasticsearch stemmer name for a language code
@@ -42,12 +44,24 @@ def stopwords_available(language_code: str) -> bool:
     return os.path.exists(path)
 
 def get_nltk_stopwords(language_code):
-    path = _stopwords_path(language_code)
+    return list(_nltk_stopwords(language_code))
+
+@lru_cache(maxsize=None)
+def get_nltk_stopword_set(language_code) -> FrozenSet[str]:
+    '''
+    Get the nltk stopwords for a language as a set.
 
+    Stopword lists are cached per language code, so they are read once per process,
+    and later calls do not access the file system.
+    '''
+    return frozenset(_nltk_stopwords(language_code))
+
+@lru_cache(maxsize=None)
+def _nltk_stopwords(language_code) -> Tuple[str]:
+    path = _stopwords_path(language_code)
     if os.path.exists(path):
         with open(path) as infile:
-            words = [line.strip() for line in infile.readlines()]
-            return words
+            return tuple(line.strip() for line in infile.readlines())
     else:
         raise NotImplementedError('language {} has no nltk stopwords list'.format(language_code))
 
@@ -1,6 +1,11 @@
+import os
 import pytest
 
-from addcorpus.es_settings import es_settings, stopwords_available, stemming_available
+from addcorpus import es_settings as es_settings_module
+from addcorpus.es_settings import (
+    es_settings, get_nltk_stopwords, get_nltk_stopword_set, stopwords_available,
+    stemming_available,
+)
 
 char_filter_tokenizer = {'char_filter': ['number_filter'], 'tokenizer': 'standard'}
 
@@ -76,3 +81,31 @@ def test_analysis_available(is_available):
     assert not is_available('')
     assert not is_available(None)
     assert not is_available('enm') # enm = Middle English
+
+def test_nltk_stopword_set():
+    stopwords = get_nltk_stopword_set('en')
+    assert isinstance(stopwords, frozenset)
+    assert 'the' in stopwords
+    assert get_nltk_stopword_set('en') is stopwords
+    assert stopwords == set(get_nltk_stopwords('en'))
+
+@pytest.fixture()
+def stopwords_data(settings, tmpdir):
+    settings.NLTK_DATA_PATH = str(tmpdir)
+    os.makedirs(os.path.join(tmpdir, 'corpora', 'stopwords'))
+    with open(os.path.join(tmpdir, 'corpora', 'stopwords', 'english'), 'w') as f:
+        f.write('the\na\n')
+    es_settings_module.get_nltk_stopword_set.cache_clear()
+    es_settings_module._nltk_stopwords.cache_clear()
+    yield
+    es_settings_module.get_nltk_stopword_set.cache_clear()
+    es_settings_module._nltk_stopwords.cache_clear()
+
+def test_nltk_stopword_set_cached(stopwords_data, monkeypatch):
+    assert get_nltk_stopword_set('en') == {'the', 'a'}
+
+    def no_file_access():
+        raise AssertionError('stopwords directory should not be accessed')
+
+    monkeypatch.setattr(es_settings_module, '_stopwords_directory', no_file_access)
+    assert get_nltk_stopword_set('en') == {'the', 'a'}
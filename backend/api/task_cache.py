@@ -0,0 +1,146 @@
+'''
+Cache for the results of celery tasks.
+
+Results are stored under a key derived from the task name, its arguments, and the
+version of the index it reads from. When a request is repeated, the result can be
+returned without scheduling a task.
+
+Cached results get a task ID of their own (`cached:{key}`), so they can be retrieved
+through the task status view like the results of celery tasks. Only keys generated by
+`result_key` can be read through a task ID.
+
+Results are written by the celery worker and read by the web server, so caching celery
+tasks requires a cache backend that is shared between processes (e.g. Redis). With a
+process-local cache, tasks are always scheduled.
+'''
+
+import hashlib
+import json
+from typing import Callable, Dict, Optional
+from celery import shared_task, Signature
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from es.search import index_version
+
+CACHED_TASK_PREFIX = 'cached:'
+
+RESULT_KEY_PREFIX = 'task_result:'
+'Prefix of cache keys for task results'
+
+RESULT_CACHE_TIMEOUT = 24 * 60 * 60
+'Default number of seconds for which task results are cached'
+
+RESULT_CACHE_MAX_SIZE = 1024 * 1024
+'Default maximum size (in bytes) of a result to be cached'
+
+_MISSING = object()
+
+
+def result_key(task_name: str, arguments: Dict, version: str) -> str:
+    '''
+    The cache key for the result of a task.
+
+    Parameters:
+    - `task_name`: the name of the task
+    - `arguments`: the arguments of the task. They are serialised with sorted keys,
+    so the order of keys does not matter.
+    - `version`: the version of the index the task reads from
+    '''
+    normalized = json.dumps(arguments, sort_keys=True, default=str)
+    digest = hashlib.sha256(f'{task_name}|{normalized}|{version}'.encode()).hexdigest()
+    return RESULT_KEY_PREFIX + digest
+
+
+def corpus_result_key(task_name: str, arguments: Dict, corpus_name: str) -> str:
+    '''
+    The cache key for the result of a task that reads from the index of a corpus.
+
+    The key includes the current version of the index, so results are invalidated
+    when the corpus is reindexed or its documents change.
+    '''
+    return result_key(task_name, arguments, index_version(corpus_name))
+
+
+def store_result(key: str, result) -> None:
+    '''
+    Store a result in the cache, unless it exceeds the maximum size.
+    '''
+    max_size = getattr(settings, 'TASK_RESULT_CACHE_MAX_SIZE', RESULT_CACHE_MAX_SIZE)
+    if len(json.dumps(result, default=str)) > max_size:
+        return
+    timeout = getattr(settings, 'TASK_RESULT_CACHE_TIMEOUT', RESULT_CACHE_TIMEOUT)
+    cache.set(key, result, timeout=timeout)
+
+
+@shared_task()
+def store_task_result(result, key: str):
+    '''
+    Celery callback to store the result of a task in the cache.
+    '''
+    store_result(key, result)
+
+
+def caching_enabled() -> bool:
+    '''
+    Whether results of celery tasks can be cached.
+
+    This is controlled by the `TASK_RESULT_CACHE_ENABLED` setting. By default, it is
+    enabled unless the cache backend is local to the process.
+    '''
+    enabled = getattr(settings, 'TASK_RESULT_CACHE_ENABLED', None)
+    if enabled is None:
+        return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+    return enabled
+
+
+def cached_task_id(key: str) -> Optional[str]:
+    '''
+    The task ID for a cached result, or `None` if the result is not cached.
+    '''
+    if cache.get(key, _MISSING) is not _MISSING:
+        return CACHED_TASK_PREFIX + key
+
+
+def schedule(signature: Signature, key: str) -> str:
+    '''
+    Schedule a task, unless its result is already cached. The result of the task is
+    stored in the cache when it finishes.
+
+    Returns the ID of the task, or the ID of the cached result.
+    '''
+    if not caching_enabled():
+        return signature.apply_async().id
+    cached_id = cached_task_id(key)
+    if cached_id:
+        return cached_id
+    result = signature.apply_async(link=store_task_result.s(key))
+    return result.id
+
+
+def cached_call(key: str, function: Callable, *args, **kwargs):
+    '''
+    Call a function, or return its cached result.
+    '''
+    result = cache.get(key, _MISSING)
+    if result is _MISSING:
+        result = function(*args, **kwargs)
+        store_result(key, result)
+    return result
+
+
+def is_cached_task_id(task_id: str) -> bool:
+    return task_id.startswith(CACHED_TASK_PREFIX)
+
+
+def cached_task_key(task_id: str) -> Optional[str]:
+    '''
+    The cache key for a cached task ID, or `None` if the ID does not refer to a task
+    result.
+    '''
+    key = task_id[len(CACHED_TASK_PREFIX):]
+    if is_cached_task_id(task_id) and key.startswith(RESULT_KEY_PREFIX):
+        return key
+
@@ -0,0 +1,213 @@
+'''
+Read the states and results of a list of tasks.
+
+States are read in bulk: cached results are read from the Django cache in a single
+request, and the results of celery tasks are read from the result backend in a single
+request (e.g. a Redis `MGET`), rather than one request per task.
+'''
+
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, NamedTuple, Tuple
+from celery import current_app as celery_app
+from celery.backends.base import KeyValueStoreBackend
+from celery.states import FAILURE, PENDING, READY_STATES, SUCCESS
+from django.conf import settings
+from django.core.cache import cache
+
+from api import task_cache
+
+MAX_WAIT = 5
+'Default maximum number of seconds for which a status request can wait for tasks'
+
+MAX_CONCURRENT = 8
+'Default maximum number of requests that can wait for tasks at the same time'
+
+ACTIVE_KEY = 'task_status:active'
+'Cache key for the number of requests that are waiting for tasks'
+
+ACTIVE_KEY_TIMEOUT = 10 * 60
+'''
+Number of seconds after which the count of waiting requests is reset, so requests
+that were interrupted before they were counted down are eventually forgotten.
+'''
+
+POLL_INTERVAL = 0.25
+'Number of seconds between reading task states while waiting'
+
+STREAM_TIMEOUT = 30
+'''
+Default maximum number of seconds for which task results are streamed. After this,
+the client should open a new stream for the remaining tasks.
+'''
+
+STREAM_RETRY_DELAY = 1
+'Number of seconds after which a client should reopen a stream that timed out'
+
+
+class TaskStatus(NamedTuple):
+    state: str
+    result: Any = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state in READY_STATES
+
+    @property
+    def succeeded(self) -> bool:
+        return self.state == SUCCESS
+
+    @property
+    def failed(self) -> bool:
+        return self.ready and not self.succeeded
+
+
+def max_wait() -> float:
+    return getattr(settings, 'TASK_STATUS_MAX_WAIT', MAX_WAIT)
+
+
+def max_concurrent() -> int:
+    return getattr(settings, 'TASK_STATUS_MAX_CONCURRENT', MAX_CONCURRENT)
+
+
+@contextmanager
+def waiting_slot() -> Iterator[bool]:
+    '''
+    Count a request that waits for tasks while the context is open.
+
+    Waiting requests occupy a worker of the web server, so their number is limited
+    by the `TASK_STATUS_MAX_CONCURRENT` setting. Requests are counted in the cache, so
+    the limit applies to all processes if the cache is shared. Yields whether the
+    request may wait.
+    '''
+    cache.add(ACTIVE_KEY, 0, timeout=ACTIVE_KEY_TIMEOUT)
+    try:
+        active = cache.incr(ACTIVE_KEY)
+    except ValueError:
+        # the count expired in the meantime
+        cache.add(ACTIVE_KEY, 1, timeout=ACTIVE_KEY_TIMEOUT)
+        active = 1
+    try:
+        yield active <= max_concurrent()
+    finally:
+        try:
+            cache.decr(ACTIVE_KEY)
+        except ValueError:
+            pass
+
+
+def task_statuses(task_ids: List[str]) -> List[TaskStatus]:
+    '''
+    The state of each task, and its result if it succeeded.
+
+    Returns a list in the same order as `task_ids`.
+    '''
+    cached_ids = [id for id in task_ids if task_cache.is_cached_task_id(id)]
+    celery_ids = [id for id in task_ids if not task_cache.is_cached_task_id(id)]
+
+    statuses = {
+        **_cached_statuses(cached_ids),
+        **dict(zip(celery_ids, _backend_statuses(celery_ids))),
+    }
+    return [statuses[id] for id in task_ids]
+
+
+def wait_for_statuses(task_ids: List[str], wait: float) -> List[TaskStatus]:
+    '''
+    Long polling: wait until another task is ready, or until all tasks are ready,
+    for up to `wait` seconds (limited to the `TASK_STATUS_MAX_WAIT` setting). If too
+    many requests are waiting already (see `waiting_slot`), returns immediately.
+
+    Returns the state of each task, as in `task_statuses`.
+    '''
+    statuses = task_statuses(task_ids)
+    n_ready = _count_ready(statuses)
+    if n_ready == len(statuses):
+        return statuses
+
+    with waiting_slot() as may_wait:
+        deadline = time.monotonic() + (min(wait, max_wait()) if may_wait else 0)
+        while n_ready < len(statuses) and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            statuses = task_statuses(task_ids)
+            if _count_ready(statuses) > n_ready:
+                break
+
+    return statuses
+
+
+def stream_statuses(
+    task_ids: List[str], timeout: float | None = None
+) -> Iterator[Tuple[int, TaskStatus]]:
+    '''
+    Yield the index and status of each task as soon as it is ready, in the order in
+    which tasks complete.
+
+    Stops after a task has failed, or after `timeout` seconds (by default the
+    `TASK_STREAM_TIMEOUT` setting). If too many requests are waiting already (see
+    `waiting_slot`), only the tasks that are ready are yielded.
+    '''
+    if timeout is None:
+        timeout = getattr(settings, 'TASK_STREAM_TIMEOUT', STREAM_TIMEOUT)
+    pending = list(range(len(task_ids)))
+
+    with waiting_slot() as may_wait:
+        deadline = time.monotonic() + (timeout if may_wait else 0)
+        while pending:
+            statuses = task_statuses([task_ids[i] for i in pending])
+            for i, status in zip(list(pending), statuses):
+                if status.ready:
+                    pending.remove(i)
+                    yield i, status
+                    if status.failed:
+                        return
+            if not pending or time.monotonic() >= deadline:
+                return
+            time.sleep(POLL_INTERVAL)
+
+
+def _count_ready(statuses: List[TaskStatus]) -> int:
+    return sum(status.ready for status in statuses)
+
+
+def _cached_statuses(task_ids: List[str]) -> dict:
+    if not task_ids:
+        return {}
+    keys = {task_id: task_cache.cached_task_key(task_id) for task_id in task_ids}
+    values = cache.get_many([key for key in keys.values() if key])
+    return {
+        task_id: TaskStatus(SUCCESS, values[key]) if key in values else TaskStatus(FAILURE)
+        for task_id, key in keys.items()
+    }
+
+
+def _backend_statuses(task_ids: List[str]) -> List[TaskStatus]:
+    '''
+    Read task states from the celery result backend. Key-value backends (such as
+    Redis) are read with a single request; other backends are read per task.
+    '''
+    if not task_ids:
+        return []
+
+    backend = celery_app.backend
+    if not isinstance(backend, KeyValueStoreBackend):
+        return [_async_result_status(task_id) for task_id in task_ids]
+
+    keys = [backend.get_key_for_task(task_id) for task_id in task_ids]
+    values = backend.mget(keys)
+    if hasattr(values, 'items'):
+        values = [values.get(key) for key in keys]
+    return [_meta_status(backend.decode_result(value) if value else None) for value in values]
+
+
+def _meta_status(meta) -> TaskStatus:
+    if not meta:
+        return TaskStatus(PENDING)
+    state = meta['status']
+    return TaskStatus(state, meta['result'] if state == SUCCESS else None)
+
+
+def _async_result_status(task_id: str) -> TaskStatus:
+    result = celery_app.AsyncResult(id=task_id)
+    state = result.state
+    return TaskStatus(state, result.result if state == SUCCESS else None)
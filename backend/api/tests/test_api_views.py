@@ -1,6 +1,8 @@
+import pytest
 from addcorpus.models import Corpus
 from rest_framework.status import is_success
 from api.models import Query
+from api.views import parse_wait
 from visualization.query import MATCH_ALL
 from django.utils import timezone
 
@@ -46,6 +48,20 @@ def test_task_status_view(transactional_db, admin_client, celery_worker):
     response = admin_client.post('/api/task_status', nonexistent_tasks, content_type='application/json')
     assert response.status_code == 200
 
+
+@pytest.mark.parametrize('wait', ['soon', -1, 'nan', [1]])
+def test_task_status_invalid_wait(admin_client, wait):
+    request = {'task_ids': ['1234'], 'wait': wait}
+    response = admin_client.post('/api/task_status', request, content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_parse_wait(settings):
+    settings.TASK_STATUS_MAX_WAIT = 5
+    assert parse_wait(None) == 0
+    assert parse_wait('2.5') == 2.5
+    assert parse_wait(60) == 5
+
 def test_abort_task_view(transactional_db, admin_client, celery_worker):
     bad_request = {
         'bad_key': 'data'
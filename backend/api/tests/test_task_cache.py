@@ -0,0 +1,80 @@
+from time import sleep
+from celery import shared_task
+
+from api import task_cache
+
+
+@shared_task()
+def add(x, y):
+    return x + y
+
+
+def test_result_key():
+    key = task_cache.result_key('task', {'a': 1, 'b': [1, 2]}, 'v1')
+    assert key == task_cache.result_key('task', {'b': [1, 2], 'a': 1}, 'v1')
+    assert key != task_cache.result_key('task', {'a': 2, 'b': [1, 2]}, 'v1')
+    assert key != task_cache.result_key('other_task', {'a': 1, 'b': [1, 2]}, 'v1')
+    assert key != task_cache.result_key('task', {'a': 1, 'b': [1, 2]}, 'v2')
+
+
+def test_store_result_size_limit(settings):
+    settings.TASK_RESULT_CACHE_MAX_SIZE = 100
+
+    task_cache.store_result('small', [1, 2, 3])
+    assert task_cache.cached_task_id('small') == 'cached:small'
+
+    task_cache.store_result('large', list(range(1000)))
+    assert task_cache.cached_task_id('large') is None
+
+
+def test_store_result_size_is_json_size(settings):
+    settings.TASK_RESULT_CACHE_MAX_SIZE = len('[1, 2, 3]')
+    task_cache.store_result('fits', [1, 2, 3])
+    assert task_cache.cached_task_id('fits') == 'cached:fits'
+
+
+def test_caching_enabled(settings):
+    del settings.TASK_RESULT_CACHE_ENABLED
+    # the test settings use a cache that is local to the process
+    assert not task_cache.caching_enabled()
+
+    settings.TASK_RESULT_CACHE_ENABLED = True
+    assert task_cache.caching_enabled()
+
+
+def test_cached_call():
+    calls = []
+
+    def function(value):
+        calls.append(value)
+        return value * 2
+
+    assert task_cache.cached_call('key', function, 2) == 4
+    assert task_cache.cached_call('key', function, 2) == 4
+    assert calls == [2]
+
+
+def test_schedule_cached(transactional_db, admin_client, celery_worker):
+    signature = add.s(1, 2)
+    key = task_cache.result_key(signature.task, {'args': signature.args}, 'v1')
+
+    task_id = task_cache.schedule(signature, key)
+    assert not task_cache.is_cached_task_id(task_id)
+    for _ in range(50):
+        if task_cache.cached_task_id(key):
+            break
+        sleep(0.1)
+
+    cached_id = task_cache.schedule(signature, key)
+    assert task_cache.is_cached_task_id(cached_id)
+
+    response = admin_client.post(
+        '/api/task_status', {'task_ids': [cached_id]}, content_type='application/json'
+    )
+    assert response.data == {'status': 'done', 'results': [3]}
+
+    task_cache.cache.delete(key)
+    response = admin_client.post(
+        '/api/task_status', {'task_ids': [cached_id]}, content_type='application/json'
+    )
+    assert response.status_code == 500
@@ -0,0 +1,135 @@
+import time
+from celery import shared_task
+from django.core.cache import cache
+
+from api import task_status
+
+
+@shared_task()
+def multiply(x, y):
+    return x * y
+
+
+def test_task_statuses(transactional_db, celery_worker):
+    done = multiply.delay(2, 3)
+    done.get(timeout=10)
+    cache.set('task_result:key', 'cached result')
+
+    statuses = task_status.task_statuses(
+        ['cached:task_result:key', done.id, 'unknown', 'cached:task_result:missing']
+    )
+
+    assert statuses == [
+        ('SUCCESS', 'cached result'),
+        ('SUCCESS', 6),
+        ('PENDING', None),
+        ('FAILURE', None),
+    ]
+    assert [status.failed for status in statuses] == [False, False, False, True]
+
+
+def test_task_statuses_cache_namespace():
+    # cache entries other than task results cannot be read through a task ID
+    cache.set('other_key', 'secret')
+    statuses = task_status.task_statuses(['cached:other_key'])
+    assert statuses == [('FAILURE', None)]
+
+
+def test_wait_for_statuses(transactional_db, celery_worker, settings):
+    settings.TASK_STATUS_MAX_WAIT = 0.5
+
+    # returns when the wait limit is reached
+    statuses = task_status.wait_for_statuses(['unknown'], 60)
+    assert statuses == [('PENDING', None)]
+
+    result = multiply.delay(3, 4)
+    statuses = task_status.wait_for_statuses([result.id], 5)
+    assert statuses == [('SUCCESS', 12)]
+
+
+def test_wait_for_statuses_concurrency(transactional_db, celery_worker, settings):
+    settings.TASK_STATUS_MAX_CONCURRENT = 1
+
+    with task_status.waiting_slot() as may_wait:
+        assert may_wait
+        # another request cannot wait
+        start = time.monotonic()
+        statuses = task_status.wait_for_statuses(['unknown'], 5)
+        assert time.monotonic() - start < 1
+        assert statuses == [('PENDING', None)]
+
+    with task_status.waiting_slot() as may_wait:
+        assert may_wait
+
+
+def test_task_status_view_partial(transactional_db, admin_client, celery_worker):
+    done = multiply.delay(2, 3)
+    done.get(timeout=10)
+
+    data = {'task_ids': [done.id, 'unknown']}
+    response = admin_client.post('/api/task_status', data, content_type='application/json')
+    assert response.data == {'status': 'working'}
+
+    response = admin_client.post(
+        '/api/task_status', {**data, 'partial': True}, content_type='application/json'
+    )
+    assert response.data == {
+        'status': 'working',
+        'results': [6, None],
+        'ready': [True, False],
+    }
+
+
+def test_stream_statuses(transactional_db, celery_worker):
+    first = multiply.delay(1, 2)
+    first.get(timeout=10)
+    second = multiply.delay(2, 2)
+
+    streamed = list(task_status.stream_statuses([second.id, first.id], timeout=10))
+    assert sorted(streamed) == [(0, ('SUCCESS', 4)), (1, ('SUCCESS', 2))]
+
+    streamed = list(task_status.stream_statuses(['unknown', first.id], timeout=0))
+    assert streamed == [(1, ('SUCCESS', 2))]
+
+
+def test_task_stream_view(transactional_db, admin_client, celery_worker):
+    done = multiply.delay(2, 3)
+    done.get(timeout=10)
+    cache.set('task_result:key', 'cached result')
+
+    response = admin_client.post(
+        '/api/task_stream', {'task_ids': ['cached:task_result:key', done.id]},
+        content_type='application/json',
+    )
+    assert response['Content-Type'] == 'text/event-stream'
+    content = b''.join(response.streaming_content).decode()
+    events = content.strip().split('\n\n')
+    assert events == [
+        'event: result\ndata: {"index": 0, "result": "cached result"}',
+        'event: result\ndata: {"index": 1, "result": 6}',
+        'event: done\ndata: {}',
+    ]
+
+    response = admin_client.post(
+        '/api/task_stream', {'task_ids': [done.id, 'cached:task_result:missing']},
+        content_type='application/json',
+    )
+    content = b''.join(response.streaming_content).decode()
+    assert content.endswith(
+        'event: error\ndata: {"index": 1, "detail": "Task failed"}\n\n'
+    )
+
+
+def test_task_stream_timeout(transactional_db, admin_client, celery_worker, settings):
+    settings.TASK_STREAM_TIMEOUT = 0
+    done = multiply.delay(2, 3)
+    done.get(timeout=10)
+
+    response = admin_client.post(
+        '/api/task_stream', {'task_ids': ['unknown', done.id]},
+        content_type='application/json',
+    )
+    content = b''.join(response.streaming_content).decode()
+    assert content.endswith(
+        'event: timeout\ndata: {"pending": [0], "retry": 1}\n\n'
+    )
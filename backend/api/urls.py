@@ -3,5 +3,6 @@ from api.views import *
 
 urlpatterns = [
     path('task_status', TaskStatusView.as_view()),
+    path('task_stream', TaskStreamView.as_view()),
     path('abort_tasks', AbortTasksView.as_view()),
 ]
@@ -3,9 +3,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from api.serializers import QuerySerializer
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, ParseError
 from rest_framework.decorators import action
+import json
 import logging
+import math
+from django.http import StreamingHttpResponse
+from api import task_status
 from api.utils import check_json_keys
 from celery import current_app as celery_app
 
@@ -29,10 +33,34 @@ class QueryViewset(viewsets.ReadOnlyModelViewSet):
         queries.delete()
         return Response('success')
 
+def parse_wait(value) -> float:
+    '''
+    Parse the `wait` parameter of a task status request: a non-negative number of
+    seconds. Values above the maximum wait (`TASK_STATUS_MAX_WAIT`) are limited to it.
+    '''
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ParseError('wait should be a number')
+    try:
+        wait = float(value)
+    except ValueError:
+        raise ParseError('wait should be a number')
+    if not math.isfinite(wait) or wait < 0:
+        raise ParseError('wait should be a non-negative number')
+    return min(wait, task_status.max_wait())
+
+
 class TaskStatusView(APIView):
     '''
     Get the status of an array of backend tasks (working/done/failed),
-    and the results if they are complete
+    and the results if they are complete.
+
+    Optional parameters:
+    - `wait`: number of seconds to wait until another task is complete (long polling)
+    - `partial`: if true, the response for unfinished tasks includes the results of
+    the tasks that are complete, with `null` for the others, and a list of which tasks
+    are `ready`.
     '''
 
     def post(self, request, *args, **kwargs):
@@ -41,25 +69,89 @@ class TaskStatusView(APIView):
 
         check_json_keys(request, ['task_ids'])
         task_ids = request.data['task_ids']
+        wait = parse_wait(request.data.get('wait'))
 
-        results = [celery_app.AsyncResult(id=task_id) for task_id in task_ids]
-        if not all(results):
+        try:
+            if wait:
+                statuses = task_status.wait_for_statuses(task_ids, wait)
+            else:
+                statuses = task_status.task_statuses(task_ids)
+        except Exception as e:
+            logger.error(e)
             raise APIException(detail='Could not get task data')
 
-        if any(result.state == 'FAILURE' for result in results):
+        if any(status.failed for status in statuses):
             raise APIException(detail='Task failed')
 
         # all tasks finished
-        if all(result.state == 'SUCCESS' for result in results):
-            outcomes = [result.get() for result in results]
+        if all(status.succeeded for status in statuses):
             return Response({
                 'status': 'done',
-                'results': outcomes
+                'results': [status.result for status in statuses]
             })
 
         # no failed tasks, but not all finished
-        if all(result.state in ['PENDING', 'STARTED', 'SUCCESS'] for result in results):
-            return Response({'status': 'working'})
+        if request.data.get('partial'):
+            return Response({
+                'status': 'working',
+                'results': [status.result for status in statuses],
+                'ready': [status.succeeded for status in statuses],
+            })
+        return Response({'status': 'working'})
+
+class TaskStreamView(APIView):
+    '''
+    Stream the results of an array of backend tasks as server-sent events, as soon
+    as each task is complete.
+
+    Sends a `result` event for each task, with the index of the task in the request
+    and its result, followed by a `done` event when all tasks are complete. If a task
+    fails, an `error` event is sent instead.
+
+    Streams are kept short, since they occupy a worker of the web server. If tasks
+    are still pending when the stream times out, a `timeout` event is sent with the
+    indices of the pending tasks and the number of seconds after which the client
+    should request a new stream for them.
+    '''
+
+    def post(self, request, *args, **kwargs):
+        check_json_keys(request, ['task_ids'])
+        task_ids = request.data['task_ids']
+        response = StreamingHttpResponse(
+            _task_events(task_ids), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # disable buffering in nginx, so events are sent immediately
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+def _task_events(task_ids):
+    ready = set()
+    try:
+        for index, status in task_status.stream_statuses(task_ids):
+            if status.failed:
+                yield _event('error', {'index': index, 'detail': 'Task failed'})
+                return
+            ready.add(index)
+            yield _event('result', {'index': index, 'result': status.result})
+    except Exception as e:
+        logger.error(e)
+        yield _event('error', {'detail': 'Could not get task data'})
+        return
+
+    pending = [i for i in range(len(task_ids)) if i not in ready]
+    if pending:
+        yield _event('timeout', {
+            'pending': pending, 'retry': task_status.STREAM_RETRY_DELAY,
+        })
+    else:
+        yield _event('done', {})
+
+
+def _event(name: str, data) -> str:
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'
+
 
 class AbortTasksView(APIView):
     '''
@@ -276,9 +276,9 @@ def json_mock_corpus(db, json_corpus_definition) -> Corpus:
 @pytest.fixture(scope='session')
 def celery_config():
     return {
-        'task_serializer': 'pickle',
-        'result_serializer': 'pickle',
-        'accept_content': ['json', 'pickle'],
+        'task_serializer': 'json',
+        'result_serializer': 'json',
+        'accept_content': ['json'],
     }
 
 
@@ -12,7 +12,7 @@ from api.utils import find_media_file
 from ianalyzer_readers.extract import XML, Metadata, Combined
 from addcorpus.python_corpora.filters import MultipleChoiceFilter, RangeFilter
 from addcorpus.python_corpora.corpus import XMLCorpusDefinition, FieldDefinition
-from media.image_processing import get_pdf_info, retrieve_pdf, pdf_pages, build_partial_pdf
+from media.image_processing import get_pdf_info, pdf_pages, cached_partial_pdf
 from addcorpus.es_mappings import keyword_mapping, main_content_mapping
 from addcorpus.es_settings import es_settings
 
@@ -252,7 +252,5 @@ class DutchAnnualReports(XMLCorpusDefinition):
         start_page = int(request_args['start_page'])
         end_page = int(request_args['end_page'])
         absolute_path = find_media_file(self.data_directory, image_path, self.mimetype)
-        input_pdf = retrieve_pdf(absolute_path)
         pages = range(start_page, end_page)
-        out = build_partial_pdf(pages, input_pdf)
-        return out
+        return cached_partial_pdf(absolute_path, pages)
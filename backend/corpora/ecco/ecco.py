@@ -18,7 +18,7 @@ from addcorpus.python_corpora.corpus import XMLCorpusDefinition, FieldDefinition
 from addcorpus.es_settings import es_settings
 from addcorpus.es_mappings import keyword_mapping, main_content_mapping
 from corpora.utils.constants import document_context
-from media.image_processing import get_pdf_info, retrieve_pdf, pdf_pages, build_partial_pdf
+from media.image_processing import get_pdf_info, pdf_pages, cached_partial_pdf
 from media.media_url import media_url
 
 # Source files ################################################################
@@ -292,7 +292,5 @@ class Ecco(XMLCorpusDefinition):
         start_page = int(request_args['start_page'])
         end_page = int(request_args['end_page'])
         absolute_path = find_media_file(self.data_directory, image_path, 'application/pdf')
-        input_pdf = retrieve_pdf(absolute_path)
         pages = range(start_page, end_page)
-        out = build_partial_pdf(pages, input_pdf)
-        return out
+        return cached_partial_pdf(absolute_path, pages)
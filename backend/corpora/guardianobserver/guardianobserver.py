@@ -17,7 +17,7 @@ from ianalyzer_readers.xml_tag import Tag
 from ianalyzer_readers import extract
 
 from api.utils import find_media_file
-from indexing.run_update_task import update_document
+from es.client import elasticsearch
 from addcorpus.python_corpora import filters
 from addcorpus.python_corpora.corpus import XMLCorpusDefinition, FieldDefinition
 from media.image_processing import sizeof_fmt
@@ -188,6 +188,18 @@ class GuardianObserver(XMLCorpusDefinition):
         'context_display_name': 'publication'
     }
 
+    def _store_image_path(self, corpus_name, document, image_path):
+        '''
+        Store the zip archive that holds the scan of a document in the index, so it
+        does not have to be searched again.
+        '''
+        doc_id = document.get('_id', document.get('id', None))
+        if not doc_id:
+            logger.info("failed to update the following document: {}".format(document))
+            return
+        client = elasticsearch(corpus_name)
+        client.update(index=self.es_index, id=doc_id, doc={'image_path': image_path})
+
     def request_media(self, document, corpus_name):
         field_vals = document['fieldValues']
         target_filename = "{}_{}_{}.pdf".format(
@@ -221,12 +233,7 @@ class GuardianObserver(XMLCorpusDefinition):
                 correct_file = next((pdf for pdf in pdfs if pdf.split("/")[1]==target_filename), None)
                 if correct_file:
                     image_path = join(path, zipfile.name)
-                    update_body = {
-                        "doc": {
-                            "image_path": image_path
-                        }
-                    }
-                    update_document(self.es_index, document, update_body)
+                    self._store_image_path(corpus_name, document, image_path)
                     # define subdirectory in the zip archive
                     filename = join(correct_file.split('/')[0], target_filename)
                     break
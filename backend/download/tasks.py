@@ -7,6 +7,7 @@ from es import download as es_download
 from download import create_csv
 from download.models import Download
 from addcorpus.models import Corpus
+from users.models import CustomUser
 from visualization.tasks import histogram_term_frequency_tasks, timeline_term_frequency_tasks, ngram_data_tasks
 from visualization import query
 from download.mail import send_csv_email
@@ -40,9 +41,10 @@ def download_scroll(request_json, download_size=10000):
 
 
 @shared_task()
-def make_download(request_json, download_id, download_size=None, user=None):
+def make_download(request_json, download_id, download_size=None, user_id=None):
     corpus_name = request_json['corpus']
     corpus = Corpus.objects.get(name=corpus_name)
+    user = CustomUser.objects.get(pk=user_id) if user_id else None
     es_query = api_query_to_es_query(request_json, corpus_name)
     results, _total = es_download.scroll(
         corpus_name, es_query, download_size)
@@ -89,7 +91,7 @@ def download_search_results(request_json, user):
     download = Download.objects.create(download_type='search_results', corpus=corpus, parameters=request_json, user=user)
 
     make_chain = lambda: chain(
-        make_download.s(request_json, download.id, download_limit, user),
+        make_download.s(request_json, download.id, download_limit, user.id),
         complete_download.s(download.id),
         csv_data_email.s(user.email, user.username),
     ).on_error(complete_failed_download.s(download.id))
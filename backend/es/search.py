@@ -1,3 +1,4 @@
+import hashlib
 from typing import Dict
 from es.client import elasticsearch, server_for_corpus
 from addcorpus.models import Corpus
@@ -13,6 +14,32 @@ def get_index(corpus_name: str) -> str:
     name = corpus.name if corpus.has_python_definition else f'custom[{corpus.pk}]'
     return f'{prefix}-{name}' if prefix else name
 
+def index_version(corpus_name: str, client = None) -> str:
+    '''
+    An identifier for the current state of the index of a corpus.
+
+    The version changes when the alias of the corpus points to a different index, or
+    when documents are added, updated or deleted. Use it in cache keys for data
+    derived from the index.
+    '''
+    index = get_index(corpus_name)
+    if not client:
+        client = elasticsearch(corpus_name)
+
+    stats = client.indices.stats(index=index, metric=['docs', 'indexing'])
+    state = sorted(
+        (
+            name,
+            index_stats.get('uuid'),
+            index_stats['primaries']['docs']['count'],
+            index_stats['primaries']['docs']['deleted'],
+            index_stats['primaries']['indexing']['index_total'],
+            index_stats['primaries']['indexing']['delete_total'],
+        )
+        for name, index_stats in stats['indices'].items()
+    )
+    return hashlib.sha256(repr(state).encode()).hexdigest()[:16]
+
 def search(corpus_name: str, query_model: Dict = {}, client = None, **kwargs):
     """
     Make a basic search request.
@@ -83,6 +83,15 @@ WORDCLOUD_LIMIT = 1000
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER', 'redis://')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_BROKER', 'redis://')
 
+# Cache, shared between the web server and celery workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', os.getenv('CELERY_BROKER', 'redis://')),
+        'KEY_PREFIX': 'textcavator',
+    }
+}
+
 # url to the frontend for generating email links
 BASE_URL = 'http://localhost:4200'
 
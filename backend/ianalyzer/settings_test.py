@@ -23,6 +23,14 @@ UBLAD_DATA = '' # necessary to make ublad test not fail
 
 SERVERS['default']['index_prefix'] = 'test'
 
+# the celery worker in tests runs in the same process, so a local cache is shared
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+TASK_RESULT_CACHE_ENABLED = True
+
 REST_FRAMEWORK.update(
     {
         "DEFAULT_THROTTLE_RATES": {
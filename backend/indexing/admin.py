@@ -12,6 +12,12 @@ class CreateIndexAdmin(admin.StackedInline):
 class PopulateIndexAdmin(admin.StackedInline):
     model = models.PopulateIndexTask
     extra = 0
+    readonly_fields = [
+        'started', 'progress_updated', 'sources_total', 'sources_processed',
+        'bytes_processed', 'documents_indexed', 'documents_failed', 'extraction_time',
+        'bulk_time', 'documents_per_second', 'bytes_per_second',
+        'estimated_time_remaining',
+    ]
 
 
 class UpdateIndexAdmin(admin.StackedInline):
@@ -83,4 +89,27 @@ class IndexJobAdmin(admin.ModelAdmin):
                 )
 
 
+class IndexedSourceAdmin(admin.ModelAdmin):
+    '''
+    Sources that were extracted into an index. Sort by extraction time to find the
+    sources that are slow to extract.
+    '''
+
+    list_display = ['path', 'index', 'size', 'extraction_time']
+    list_filter = ['index']
+    search_fields = ['path']
+    ordering = ['-extraction_time']
+    exclude = ['document_ids']
+
+    def has_add_permission(self, request):
+        # sources are recorded while populating an index
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        # disable editing; deleting a source means it is extracted again in the next
+        # delta run
+        return False
+
+
 admin.site.register(models.IndexJob, IndexJobAdmin)
+admin.site.register(models.IndexedSource, IndexedSourceAdmin)
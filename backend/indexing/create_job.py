@@ -29,6 +29,7 @@ def create_indexing_job(
     prod: bool = False,
     rollover: bool = False,
     update: bool = False,
+    delta: bool = False,
 ) -> IndexJob:
     '''
     Create an IndexJob to index a corpus.
@@ -37,7 +38,7 @@ def create_indexing_job(
     running an update script, and rolling over the alias. Parameters are described
     in detail in the documentation for the `index` command.
     '''
-    create_new = not (add or update)
+    create_new = not (add or update or delta)
 
     update_server_table_from_settings()
 
@@ -59,6 +60,7 @@ def create_indexing_job(
             index=index,
             document_min_date=start,
             document_max_date=end,
+            delta=delta,
         )
 
     if update:
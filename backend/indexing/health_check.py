@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Dict
 from elasticsearch import NotFoundError
 import warnings
 
@@ -145,6 +145,26 @@ class CorpusIndexHealth:
         if self.latest_job:
             return self.latest_job.status()
 
+    @property
+    def populate_progress(self) -> Optional[Dict]:
+        '''
+        Throughput statistics of the populate task in the last IndexJob
+        '''
+        if self.latest_job:
+            task = self.latest_job.populateindextasks.last()
+            if task and task.started:
+                return {
+                    'documents_indexed': task.documents_indexed,
+                    'documents_failed': task.documents_failed,
+                    'sources_processed': task.sources_processed,
+                    'sources_total': task.sources_total,
+                    'extraction_time': task.extraction_time,
+                    'bulk_time': task.bulk_time,
+                    'documents_per_second': task.documents_per_second(),
+                    'bytes_per_second': task.bytes_per_second(),
+                    'estimated_time_remaining': task.estimated_time_remaining(),
+                }
+
     @property
     def includes_latest_data(self) -> Optional[bool]:
         '''
@@ -70,6 +70,17 @@ class Command(BaseCommand):
                 for the corpus. Cannot be used in combination with --update.'''
         )
 
+        parser.add_argument(
+            '--delta',
+            action='store_true',
+            help='''Skip index creation, and only extract sources that were added or
+                changed since they were last indexed. Documents from changed sources
+                and from source files that no longer exist are removed from the index.
+                Only source files are tracked; this has no effect for corpora that do
+                not read sources from files. Cannot be used in combination with
+                --update, --delete, or --mappings-only.'''
+        )
+
         parser.add_argument(
             '--prod', '-p',
             action='store_true',
@@ -98,6 +109,7 @@ class Command(BaseCommand):
             add=False,
             delete=False,
             update=False,
+            delta=False,
             mappings_only=False,
             prod=False,
             rollover=False,
@@ -111,7 +123,7 @@ class Command(BaseCommand):
         corpus_definition = load_corpus_definition(corpus)
 
         self._validate_arguments(
-            start, end, add, delete, update, mappings_only, prod, rollover,
+            start, end, add, delete, update, delta, mappings_only, prod, rollover,
             create_only, run_async,
         )
 
@@ -135,7 +147,7 @@ class Command(BaseCommand):
 
         job = create_indexing_job(
             corpus_object, start_index, end_index, mappings_only, add, delete, prod,
-            rollover, update
+            rollover, update, delta
         )
 
         print(f'Created IndexJob #{job.pk}')
@@ -151,6 +163,7 @@ class Command(BaseCommand):
         add,
         delete,
         update,
+        delta,
         mappings_only,
         prod,
         rollover,
@@ -187,6 +200,13 @@ class Command(BaseCommand):
                 'and index after deleting it.'
             )
 
+        if delta and (update or delete or mappings_only):
+            raise ValueError(
+                '--delta cannot be used in combination with --update, --delete, or '
+                '--mappings-only. Delta indexing adds changed sources to an existing '
+                'index.'
+            )
+
         if rollover and not prod:
             raise ValueError(
                 '--rollover can only be used in combination with --prod. Alias rollover '
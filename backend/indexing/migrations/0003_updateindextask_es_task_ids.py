@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexing', '0002_addaliastask_status_createindextask_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='updateindextask',
+            name='es_task_ids',
+            field=models.JSONField(blank=True, default=list, help_text='IDs of update-by-query tasks submitted to Elasticsearch; can be used to look up their progress with the tasks API'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('es', '0001_initial'),
+        ('indexing', '0003_updateindextask_es_task_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='populateindextask',
+            name='delta',
+            field=models.BooleanField(default=False, help_text='only extract sources that were added or changed since they were last indexed, and remove documents from sources that no longer exist'),
+        ),
+        migrations.CreateModel(
+            name='IndexedSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.TextField(help_text='absolute path to the source file')),
+                ('modified', models.FloatField(help_text='modification time of the file when it was indexed')),
+                ('size', models.BigIntegerField(help_text='size of the file (in bytes) when it was indexed')),
+                ('content_hash', models.CharField(help_text='SHA-256 hash of the file contents when it was indexed', max_length=64)),
+                ('document_ids', models.JSONField(default=list, help_text='IDs of the documents that were indexed from this source')),
+                ('index', models.ForeignKey(help_text='index into which the source was extracted', on_delete=django.db.models.deletion.CASCADE, related_name='indexed_sources', to='es.index')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='indexedsource',
+            constraint=models.UniqueConstraint(fields=('index', 'path'), name='unique_source_per_index'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexing', '0004_indexedsource_populateindextask_delta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='indexedsource',
+            name='extraction_time',
+            field=models.FloatField(blank=True, help_text='seconds spent extracting documents from this source', null=True),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='bulk_time',
+            field=models.FloatField(default=0, help_text='seconds spent sending documents to Elasticsearch'),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='bytes_processed',
+            field=models.PositiveBigIntegerField(default=0, help_text='total size (in bytes) of sources that have been extracted'),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='documents_failed',
+            field=models.PositiveBigIntegerField(default=0, help_text='number of documents that could not be indexed'),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='documents_indexed',
+            field=models.PositiveBigIntegerField(default=0, help_text='number of documents that were indexed successfully'),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='extraction_time',
+            field=models.FloatField(default=0, help_text='seconds spent reading and extracting documents from sources'),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='progress_updated',
+            field=models.DateTimeField(blank=True, help_text='time when the progress statistics were last updated', null=True),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='sources_processed',
+            field=models.PositiveIntegerField(default=0, help_text='number of sources that have been extracted'),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='sources_total',
+            field=models.PositiveIntegerField(blank=True, help_text='number of sources to extract (if known in advance)', null=True),
+        ),
+        migrations.AddField(
+            model_name='populateindextask',
+            name='started',
+            field=models.DateTimeField(blank=True, help_text='time when document extraction started', null=True),
+        ),
+    ]
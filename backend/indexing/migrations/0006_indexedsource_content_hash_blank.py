@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-19 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indexing', '0005_populate_progress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='indexedsource',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 hash of the file contents when it was indexed; only recorded for delta runs', max_length=64),
+        ),
+    ]
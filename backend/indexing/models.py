@@ -136,7 +136,7 @@ class IndexTask(models.Model):
         return elasticsearch(self.corpus.name)
 
     def is_aborted(self) -> bool:
-        self.refresh_from_db()
+        self.refresh_from_db(fields=['status'])
         return self.status in [TaskStatus.CANCELLED, TaskStatus.ABORTED]
 
 
@@ -173,10 +173,81 @@ class PopulateIndexTask(IndexTask):
         null=True,
         help_text='maximum date on which to filter documents'
     )
+    delta = models.BooleanField(
+        default=False,
+        help_text='only extract sources that were added or changed since they were '
+            'last indexed, and remove documents from sources that no longer exist',
+    )
+    started = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text='time when document extraction started',
+    )
+    progress_updated = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text='time when the progress statistics were last updated',
+    )
+    sources_total = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text='number of sources to extract (if known in advance)',
+    )
+    sources_processed = models.PositiveIntegerField(
+        default=0,
+        help_text='number of sources that have been extracted',
+    )
+    bytes_processed = models.PositiveBigIntegerField(
+        default=0,
+        help_text='total size (in bytes) of sources that have been extracted',
+    )
+    documents_indexed = models.PositiveBigIntegerField(
+        default=0,
+        help_text='number of documents that were indexed successfully',
+    )
+    documents_failed = models.PositiveBigIntegerField(
+        default=0,
+        help_text='number of documents that could not be indexed',
+    )
+    extraction_time = models.FloatField(
+        default=0,
+        help_text='seconds spent reading and extracting documents from sources',
+    )
+    bulk_time = models.FloatField(
+        default=0,
+        help_text='seconds spent sending documents to Elasticsearch',
+    )
 
     def __str__(self):
         return f'populate {self.index} based on {self.corpus}'
 
+    @property
+    def elapsed_time(self) -> Optional[float]:
+        '''Seconds between the start of extraction and the last progress update'''
+        if self.started and self.progress_updated:
+            return (self.progress_updated - self.started).total_seconds()
+
+    @admin.display()
+    def documents_per_second(self) -> Optional[float]:
+        if self.elapsed_time:
+            return round(self.documents_indexed / self.elapsed_time, 1)
+
+    @admin.display()
+    def bytes_per_second(self) -> Optional[float]:
+        if self.elapsed_time:
+            return round(self.bytes_processed / self.elapsed_time)
+
+    @admin.display()
+    def estimated_time_remaining(self) -> Optional[float]:
+        '''
+        Estimated seconds until all sources are extracted, based on the progress so far.
+
+        Only available if the number of sources is known.
+        '''
+        if self.elapsed_time and self.sources_total and self.sources_processed:
+            remaining = self.sources_total - self.sources_processed
+            return round(self.elapsed_time / self.sources_processed * remaining)
+
 
 class UpdateIndexTask(IndexTask):
     '''
@@ -196,6 +267,12 @@ class UpdateIndexTask(IndexTask):
         null=True,
         help_text='maximum date on which to filter documents'
     )
+    es_task_ids = models.JSONField(
+        blank=True,
+        default=list,
+        help_text='IDs of update-by-query tasks submitted to Elasticsearch; can be '
+            'used to look up their progress with the tasks API',
+    )
 
     def __str__(self):
         return f'update {self.index} based on {self.corpus}'
@@ -250,3 +327,55 @@ class DeleteIndexTask(IndexTask):
 
     def __str__(self):
         return f'delete {self.index}'
+
+
+class IndexedSource(models.Model):
+    '''
+    A source file that was extracted into an index.
+
+    Records the state of the file at the time of extraction, and the IDs of the
+    documents that were indexed from it. This is used to determine which sources
+    have changed when populating an index with the `delta` option.
+    '''
+
+    index = models.ForeignKey(
+        to=Index,
+        on_delete=models.CASCADE,
+        related_name='indexed_sources',
+        help_text='index into which the source was extracted',
+    )
+    path = models.TextField(
+        help_text='absolute path to the source file',
+    )
+    modified = models.FloatField(
+        help_text='modification time of the file when it was indexed',
+    )
+    size = models.BigIntegerField(
+        help_text='size of the file (in bytes) when it was indexed',
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 hash of the file contents when it was indexed; only '
+            'recorded for delta runs',
+    )
+    document_ids = models.JSONField(
+        default=list,
+        help_text='IDs of the documents that were indexed from this source',
+    )
+    extraction_time = models.FloatField(
+        blank=True,
+        null=True,
+        help_text='seconds spent extracting documents from this source',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['index', 'path'],
+                name='unique_source_per_index',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.path} in {self.index}'
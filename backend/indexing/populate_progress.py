@@ -0,0 +1,103 @@
+'''
+Throughput statistics for populating an index.
+'''
+
+import logging
+from time import monotonic
+from typing import Optional
+from django.utils import timezone
+
+from indexing.models import PopulateIndexTask
+
+logger = logging.getLogger('indexing')
+
+PROGRESS_SAVE_INTERVAL = 10
+'Minimum number of seconds between saving progress statistics to the database'
+
+SLOW_SOURCE_THRESHOLD = 60
+'Sources that take more than this number of seconds to extract are logged as a warning'
+
+PROGRESS_FIELDS = [
+    'started', 'progress_updated', 'sources_total', 'sources_processed',
+    'bytes_processed', 'documents_indexed', 'documents_failed', 'extraction_time',
+    'bulk_time',
+]
+
+
+class PopulateProgress:
+    '''
+    Keeps track of the progress of a PopulateIndexTask.
+
+    Statistics are stored on the task, and saved to the database at most once every
+    `interval` seconds.
+
+    Extraction and indexing run in a single pipeline, so any time that is not spent on
+    extraction is counted as time spent on bulk requests.
+    '''
+
+    def __init__(self, task: PopulateIndexTask, interval: float = PROGRESS_SAVE_INTERVAL):
+        self.task = task
+        self.interval = interval
+        self._start = None
+        self._last_save = None
+
+
+    def start(self, sources_total: Optional[int] = None) -> None:
+        self._start = monotonic()
+        self.task.started = timezone.now()
+        self.task.sources_total = sources_total
+        self.task.sources_processed = 0
+        self.task.bytes_processed = 0
+        self.task.documents_indexed = 0
+        self.task.documents_failed = 0
+        self.task.extraction_time = 0
+        self.task.bulk_time = 0
+        self._save()
+
+
+    def add_extraction_time(self, seconds: float) -> None:
+        self.task.extraction_time += seconds
+
+
+    def source_done(self, source_name: str, size: int, extraction_time: float) -> None:
+        self.task.sources_processed += 1
+        self.task.bytes_processed += size
+
+        if extraction_time > SLOW_SOURCE_THRESHOLD:
+            logger.warning(f'Extracting {source_name} took {extraction_time:.1f}s')
+        else:
+            logger.debug(f'Extracted {source_name} in {extraction_time:.1f}s')
+
+
+    def document_done(self, success: bool) -> None:
+        if success:
+            self.task.documents_indexed += 1
+        else:
+            self.task.documents_failed += 1
+
+        if monotonic() - self._last_save >= self.interval:
+            self._save()
+            self._log()
+
+
+    def finish(self) -> None:
+        self._save()
+        self._log()
+
+
+    def _save(self) -> None:
+        now = monotonic()
+        self._last_save = now
+        self.task.bulk_time = max(now - self._start - self.task.extraction_time, 0)
+        self.task.progress_updated = timezone.now()
+        self.task.save(update_fields=PROGRESS_FIELDS)
+
+
+    def _log(self) -> None:
+        task = self.task
+        message = 'Indexed {} documents ({} docs/s, {} bytes/s)'.format(
+            task.documents_indexed, task.documents_per_second(), task.bytes_per_second()
+        )
+        if task.estimated_time_remaining() is not None:
+            message += f', estimated {task.estimated_time_remaining()}s remaining'
+        logger.info(message)
@@ -11,6 +11,7 @@ from addcorpus.python_corpora.load_corpus import load_corpus_definition
 from indexing.models import (
     CreateIndexTask
 )
+from indexing.source_tracking import clear_sources
 
 
 logger = logging.getLogger('indexing')
@@ -75,4 +76,7 @@ def create(task: CreateIndexTask):
         settings=settings,
         mappings=es_mapping,
     )
+    # the new index is empty, so sources from an earlier index with the same name
+    # must be extracted again
+    clear_sources(task.index)
     return index_name
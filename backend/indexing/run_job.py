@@ -20,6 +20,7 @@ from indexing.run_management_tasks import (
 )
 from indexing.run_update_task import run_update_task
 from ianalyzer.celery_utils import warn_if_no_worker
+from visualization.corpus_statistics import try_update_corpus_statistics
 from indexing.stop_job import mark_tasks_stopped, TaskAborted, raise_if_aborted
 
 
@@ -35,11 +36,17 @@ TASK_HANDLERS: Dict[Type[IndexTask], Callable[[IndexTask], None]] = {
     DeleteIndexTask: delete_index,
 }
 
+TASK_TYPES: Dict[str, Type[IndexTask]] = {
+    task_type.__name__: task_type for task_type in TASK_HANDLERS
+}
+'IndexTask classes by name, used to pass tasks to celery by their type and ID'
+
 
 @celery.shared_task()
-def run_task(task: IndexTask) -> None:
-    '''Run an IndexTask'''
+def run_task(task_type: str, task_pk: int) -> None:
+    '''Run an IndexTask, identified by the name of its class and its primary key'''
 
+    task = TASK_TYPES[task_type].objects.get(pk=task_pk)
     task_id = f'{task.__class__.__name__} #{task.pk}' # e.g. "CreateIndexTask #1"
 
     if task.is_aborted():
@@ -71,12 +78,13 @@ def run_task(task: IndexTask) -> None:
 
 
 @celery.shared_task()
-def handle_job_error(request, exc, traceback, job: IndexJob):
-    mark_tasks_stopped(job)
+def handle_job_error(request, exc, traceback, job_id: int):
+    mark_tasks_stopped(IndexJob.objects.get(pk=job_id))
 
 
 @celery.shared_task()
-def start_job(job: IndexJob) -> None:
+def start_job(job_id: int) -> None:
+    job = IndexJob.objects.get(pk=job_id)
     _log_job_started(job)
 
     try:
@@ -91,9 +99,21 @@ def start_job(job: IndexJob) -> None:
         task.save()
 
 
+@celery.shared_task()
+def update_statistics(job_id: int) -> None:
+    '''
+    Refresh the precomputed statistics of the corpus after the tasks of a job are
+    completed. Errors are logged, but do not fail the job.
+    '''
+    job = IndexJob.objects.get(pk=job_id)
+    try_update_corpus_statistics(job.corpus)
+
+
 def job_chain(job: IndexJob) -> celery.chain:
-    signatures = [start_job.si(job)] + [run_task.si(task) for task in job.tasks()]
-    return celery.chain(signatures).on_error(handle_job_error.s(job))
+    signatures = [start_job.si(job.pk)] + [
+        run_task.si(task.__class__.__name__, task.pk) for task in job.tasks()
+    ] + [update_statistics.si(job.pk)]
+    return celery.chain(signatures).on_error(handle_job_error.s(job.pk))
 
 
 def perform_indexing(job: IndexJob):
@@ -5,6 +5,7 @@ Functionality to run indexing tasks too straightforward to warrant a separate mo
 from indexing.models import (
     DeleteIndexTask, RemoveAliasTask, AddAliasTask, UpdateSettingsTask,
 )
+from indexing.source_tracking import clear_sources
 
 
 def add_alias(task: AddAliasTask):
@@ -37,6 +38,7 @@ def delete_index(task: DeleteIndexTask):
     client.indices.delete(
         index=task.index.name,
     )
+    clear_sources(task.index)
 
 
 def update_index_settings(task: UpdateSettingsTask):
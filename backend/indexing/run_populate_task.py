@@ -1,9 +1,15 @@
 import logging
+from collections import deque
+from collections.abc import Sized
+from time import perf_counter
+from typing import List
 import elasticsearch.helpers as es_helpers
 
 from addcorpus.reader import make_reader
 from indexing.models import PopulateIndexTask
-from indexing.stop_job import raise_if_aborted
+from indexing.populate_progress import PopulateProgress
+from indexing.source_tracking import SourceTracker, source_path, source_size
+from indexing.stop_job import raise_if_aborted, throttled_abort_check
 
 logger = logging.getLogger('indexing')
 
@@ -11,8 +17,14 @@ logger = logging.getLogger('indexing')
 def populate(task: PopulateIndexTask):
     '''
     Populate an ElasticSearch index from the corpus' source files.
+
+    Extracted sources are recorded, so that a later task with the `delta` option can
+    skip sources that have not changed. Throughput statistics are saved on the task
+    while it runs.
     '''
     reader = make_reader(task.corpus)
+    tracker = SourceTracker(task.index, hash_contents=task.delta)
+    progress = PopulateProgress(task)
 
     logger.info('Attempting to populate index...')
 
@@ -20,7 +32,34 @@ def populate(task: PopulateIndexTask):
     files = reader.sources(
         start=task.document_min_date,
         end=task.document_max_date)
-    docs = reader.documents(files)
+
+    if task.delta:
+        files = tracker.changed_sources(files)
+        logger.info(f'Found {len(files)} new or changed sources')
+        delete_documents(task, tracker.remove_outdated(files))
+
+    # Bulk results are returned in the same order as the actions, so the source of
+    # each document is queued to match results with sources
+    document_sources = deque()
+
+    def documents():
+        for i, source in enumerate(files):
+            tracker.start_source(i, source)
+            source_docs = iter(reader.source2dicts(source, source_index=i))
+            extraction_time = 0
+            while True:
+                start = perf_counter()
+                doc = next(source_docs, None)
+                extraction_time += perf_counter() - start
+                if doc is None:
+                    break
+                document_sources.append(i)
+                yield doc
+            progress.add_extraction_time(extraction_time)
+            progress.source_done(
+                source_path(source) or f'source #{i}', source_size(source), extraction_time
+            )
+            tracker.set_extraction_time(i, extraction_time)
 
     # Each source document is decorated as an indexing operation, so that it
     # can be sent to ElasticSearch in bulk
@@ -31,12 +70,14 @@ def populate(task: PopulateIndexTask):
             "_id": doc.get("id"),
             "_source": doc,
         }
-        for doc in docs
+        for doc in documents()
     )
 
     server_config = task.index.server.configuration
 
     raise_if_aborted(task)
+    check_aborted = throttled_abort_check(task)
+    progress.start(sources_total=len(files) if isinstance(files, Sized) else None)
 
     # Do bulk operation
     client = task.client()
@@ -48,6 +89,44 @@ def populate(task: PopulateIndexTask):
         raise_on_exception=False,
         raise_on_error=False,
     ):
-        if not success:
+        source_index = document_sources.popleft()
+        if success:
+            tracker.add_document(source_index, info['index']['_id'])
+        else:
+            tracker.document_failed(source_index)
             logger.error(f"FAILED INDEX: {info}")
-        raise_if_aborted(task)
+        progress.document_done(success)
+        check_aborted()
+
+    tracker.finish()
+    progress.finish()
+
+
+def delete_documents(task: PopulateIndexTask, document_ids: List[str]):
+    '''
+    Delete documents from the index of a task.
+    '''
+    if not document_ids:
+        return
+
+    logger.info(f'Deleting {len(document_ids)} outdated documents...')
+
+    server_config = task.index.server.configuration
+    actions = (
+        {
+            "_op_type": "delete",
+            "_index": task.index.name,
+            "_id": doc_id,
+        }
+        for doc_id in document_ids
+    )
+    for success, info in es_helpers.streaming_bulk(
+        task.client(),
+        actions,
+        chunk_size=server_config["chunk_size"],
+        max_chunk_bytes=server_config["max_chunk_bytes"],
+        raise_on_exception=False,
+        raise_on_error=False,
+    ):
+        if not success and info['delete'].get('status') != 404:
+            logger.error(f"FAILED DELETE: {info}")
@@ -1,14 +1,23 @@
-from django.conf import settings
+from typing import Dict, Optional, Iterable
+from time import sleep
+from elasticsearch import Elasticsearch
+import elasticsearch.helpers as es_helpers
 
 from addcorpus.python_corpora.corpus import CorpusDefinition
-from es.client import elasticsearch
 from indexing.models import UpdateIndexTask
+from indexing.stop_job import throttled_abort_check, raise_if_aborted
 from addcorpus.python_corpora.load_corpus import load_corpus_definition
 from addcorpus.exceptions import PythonDefinitionRequired
 
 import logging
 logger = logging.getLogger('indexing')
 
+MAX_CONCURRENT_UPDATES = 4
+'Maximum number of update-by-query requests that run at the same time'
+
+UPDATE_POLL_INTERVAL = 2
+'Number of seconds between progress checks of update-by-query requests'
+
 def run_update_task(task: UpdateIndexTask) -> None:
     if not task.corpus.has_python_definition:
         raise PythonDefinitionRequired(task.corpus, 'Update task not applicable')
@@ -17,23 +26,21 @@ def run_update_task(task: UpdateIndexTask) -> None:
 
     if corpus_definition.update_body():
         min_date = task.document_min_date or task.corpus.configuration.min_date
-        max_date = task.document_max_date or task.corpus.configuration.min_date
+        max_date = task.document_max_date or task.corpus.configuration.max_date
         update_index(
-            task.corpus.name,
+            task,
             corpus_definition,
             corpus_definition.update_query(
                 min_date=min_date.strftime('%Y-%m-%d'),
                 max_date=max_date.strftime('%Y-%m-%d')
         ))
     elif corpus_definition.update_script():
-        update_by_query(
-            task.corpus.name, corpus_definition, corpus_definition.update_script()
-        )
+        update_by_query(task, corpus_definition.update_script())
     else:
         raise RuntimeError("Cannot update without update_body or update_script")
 
 
-def update_index(corpus: str, corpus_definition: CorpusDefinition, query_model):
+def update_index(task: UpdateIndexTask, corpus_definition: CorpusDefinition, query_model):
     ''' update information for fields in the index
     requires the definition of the functions
     - update_query
@@ -41,65 +48,142 @@ def update_index(corpus: str, corpus_definition: CorpusDefinition, query_model):
     - update_body
     (defines which fields should be updated with which value)
     in the corpus definition class
+
+    Documents are read with a scroll and updated with bulk requests.
     '''
-    client = elasticsearch(corpus)
-    scroll_timeout, scroll_size = get_es_settings(corpus, corpus_definition)
-    results = client.search(
-        index=corpus,
-        size=scroll_size,
-        scroll=scroll_timeout,
-        body=query_model,
-        timeout=settings.ES_SEARCH_TIMEOUT
+    client = task.client()
+    index = task.index.name
+    server_config = task.index.server.configuration
+    query = query_model.get('query', {'match_all': {}})
+
+    total_hits = client.count(index=index, query=query)['count']
+    docs = es_helpers.scan(
+        client,
+        index=index,
+        query={'query': query},
+        size=server_config['scroll_page_size'],
+        scroll=server_config['scroll_timeout'],
     )
-    hits = len(results['hits']['hits'])
-    total_hits = results['hits']['total']
-    for doc in results['hits']['hits']:
-        update_body = corpus_definition.update_body(doc)
-        update_document(corpus, doc, update_body, client)
-    while hits<total_hits:
-        scroll_id = results['_scroll_id']
-        for doc in results['hits']['hits']:
-            update_body = corpus_definition.update_body(doc)
-            update_document(corpus, doc, update_body, client)
-        results = client.scroll(scroll_id=scroll_id,
-            scroll=scroll_timeout)
-        hits += len(results['hits']['hits'])
-        logger.info("Updated {} of {} documents".format(hits, total_hits))
-
-
-def update_by_query(corpus: str, corpus_definition: CorpusDefinition, query_generator):
-    client = elasticsearch(corpus)
-    scroll_timeout, scroll_size = get_es_settings(corpus, corpus_definition)
-    for query_model in query_generator:
-        response = client.update_by_query(
-            index=corpus,
-            size=scroll_size,
-            scroll=scroll_timeout,
-            body=query_model,
-            timeout=settings.ES_SEARCH_TIMEOUT
-        )
-        if response['updated']==0:
-            logger.info('No documents updated for query {}'.format(query_model))
-
-
-def update_document(corpus: str, doc, update_body, client=None):
-    if not client:
-        client = elasticsearch(corpus)
-    doc_id = doc.get('_id', doc.get('id', None))
-    if not doc_id:
-        logger.info("failed to update the following document: {}".format(doc))
+    actions = (
+        _update_action(index, doc, corpus_definition.update_body(doc))
+        for doc in docs
+    )
+
+    check_aborted = throttled_abort_check(task)
+
+    processed = 0
+    for success, info in es_helpers.streaming_bulk(
+        client,
+        filter(None, actions),
+        chunk_size=server_config['chunk_size'],
+        max_chunk_bytes=server_config['max_chunk_bytes'],
+        raise_on_exception=False,
+        raise_on_error=False,
+    ):
+        if not success:
+            logger.error(f'FAILED UPDATE: {info}')
+        processed += 1
+        if processed % server_config['chunk_size'] == 0:
+            logger.info(f'Updated {processed} of {total_hits} documents')
+        check_aborted()
+
+    logger.info(f'Updated {processed} of {total_hits} documents')
+
+
+def _update_action(index: str, doc: Dict, update_body: Optional[Dict]) -> Optional[Dict]:
+    '''
+    Bulk action to update a document from the index, based on an update body.
+    '''
+    if not update_body:
         return None
-    client.update(index=corpus, id=doc_id, body=update_body)
+    return {
+        '_op_type': 'update',
+        '_index': index,
+        '_id': doc['_id'],
+        **update_body,
+    }
+
+
+def update_by_query(task: UpdateIndexTask, query_generator: Iterable[Dict]):
+    '''
+    Run update-by-query requests for each query in the generator.
 
+    Requests are submitted to Elasticsearch as background tasks, sliced over the shards
+    of the index. Up to `MAX_CONCURRENT_UPDATES` requests run at the same time; the IDs
+    of submitted tasks are stored on the UpdateIndexTask. If the task is aborted or
+    fails, requests that are still running are cancelled.
+    '''
+    client = task.client()
+    index = task.index.name
+    server_config = task.index.server.configuration
+    queries = iter(query_generator)
+    running = []
+
+    try:
+        while True:
+            while len(running) < MAX_CONCURRENT_UPDATES:
+                query_model = next(queries, None)
+                if query_model is None:
+                    break
+                response = client.update_by_query(
+                    index=index,
+                    scroll=server_config['scroll_timeout'],
+                    scroll_size=server_config['scroll_page_size'],
+                    slices='auto',
+                    wait_for_completion=False,
+                    **query_model,
+                )
+                running.append(response['task'])
+                task.es_task_ids = task.es_task_ids + [response['task']]
+                task.save(update_fields=['es_task_ids'])
+
+            if not running:
+                break
+
+            sleep(UPDATE_POLL_INTERVAL)
+            raise_if_aborted(task)
+            running = [
+                es_task_id for es_task_id in running
+                if not _es_task_completed(client, es_task_id)
+            ]
+    except BaseException:
+        for es_task_id in running:
+            _cancel_es_task(client, es_task_id)
+        raise
+
+
+def _cancel_es_task(client: Elasticsearch, es_task_id: str) -> None:
+    '''
+    Cancel a task in Elasticsearch. Errors are logged, so they do not hide the
+    exception that caused the cancellation.
+    '''
+    try:
+        client.tasks.cancel(task_id=es_task_id)
+    except Exception:
+        logger.exception(f'Could not cancel update {es_task_id}')
+
+
+def _es_task_completed(client: Elasticsearch, es_task_id: str) -> bool:
+    '''
+    Check the progress of an update-by-query task in Elasticsearch and log its status.
+
+    Raises an exception if the task failed.
+    '''
+    result = client.tasks.get(task_id=es_task_id)
+    status = result['task']['status']
+
+    if not result['completed']:
+        logger.info('Update {}: updated {} of {} documents'.format(
+            es_task_id, status['updated'], status['total']
+        ))
+        return False
 
+    if 'error' in result:
+        raise RuntimeError(f'Update {es_task_id} failed: {result["error"]}')
 
-def get_es_settings(corpus: str, corpus_definition):
-    """ Get the settings for the scroll request.
-    Return:
-    - scroll_timeout
-    - scroll_size
-    """
-    server = settings.CORPUS_SERVER_NAMES.get(corpus, 'default')
-    scroll_timeout = settings.SERVERS[server]['scroll_timeout']
-    scroll_size = settings.SERVERS[server]['scroll_page_size']
-    return scroll_timeout, scroll_size
+    response = result.get('response', {})
+    if response.get('failures'):
+        logger.error(f'FAILED UPDATE: {response["failures"]}')
+    if response.get('updated', status['updated']) == 0:
+        logger.info(f'No documents updated for update {es_task_id}')
+    return True
@@ -1,5 +1,5 @@
 from rest_framework.serializers import (
-    Serializer, BooleanField, ChoiceField, CharField,
+    Serializer, BooleanField, ChoiceField, CharField, DictField,
     ModelSerializer, ValidationError,
     PrimaryKeyRelatedField
 )
@@ -16,6 +16,7 @@ class IndexHealthSerializer(Serializer):
     index_compatible = BooleanField()
     latest_job = PrimaryKeyRelatedField(read_only=True)
     job_status = ChoiceField(choices=TaskStatus.choices)
+    populate_progress = DictField(allow_null=True)
     includes_latest_data = BooleanField()
     corpus_ready_to_index = BooleanField()
     corpus_validation_feedback = CharField()
@@ -0,0 +1,229 @@
+'''
+Keep track of the source files that are extracted into an index.
+
+This enables "delta" indexing: a PopulateIndexTask can skip sources that did not
+change since they were last indexed.
+'''
+
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from ianalyzer_readers.readers.core import Source
+
+from es.models import Index
+from indexing.models import IndexedSource
+
+
+def source_path(source: Source) -> Optional[str]:
+    '''
+    The absolute path of a source, if it is read from a file.
+
+    Returns `None` for sources that are not files (e.g. bytes or an HTTP response).
+    '''
+    if isinstance(source, tuple) and len(source) == 2:
+        source = source[0]
+    if isinstance(source, str) and os.path.isfile(source):
+        return os.path.abspath(source)
+
+
+def source_size(source: Source) -> int:
+    '''
+    Size of a source in bytes, if it is a file or a bytes object; 0 otherwise.
+    '''
+    if path := source_path(source):
+        return os.path.getsize(path)
+    if isinstance(source, tuple) and len(source) == 2:
+        source = source[0]
+    if isinstance(source, bytes):
+        return len(source)
+    return 0
+
+
+def file_hash(path: str) -> str:
+    '''SHA-256 hash of the contents of a file'''
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _record_is_current(record: IndexedSource) -> bool:
+    '''
+    Whether the file of an IndexedSource is unchanged since it was recorded.
+
+    If the modification time has changed, but the contents have not, the record
+    is updated with the new modification time. This requires the content hash of the
+    record; records without a hash are considered changed.
+    '''
+    stat = os.stat(record.path)
+    if stat.st_size != record.size:
+        return False
+    if stat.st_mtime == record.modified:
+        return True
+    if record.content_hash and file_hash(record.path) == record.content_hash:
+        record.modified = stat.st_mtime
+        record.save(update_fields=['modified'])
+        return True
+    return False
+
+
+def clear_sources(index: Index) -> None:
+    '''
+    Remove the records of the sources extracted into an index. Use this when the
+    documents in the index are removed, e.g. when the index is deleted or recreated.
+    '''
+    index.indexed_sources.all().delete()
+
+
+class SourceTracker:
+    '''
+    Keeps track of the sources extracted into an index, and the documents that are
+    indexed from each source.
+
+    While populating an index, call `start_source()` when a source is extracted,
+    `add_document()` for each document that is indexed successfully, and
+    `document_failed()` for each document that is not. A source is recorded in the
+    database once all its documents are processed; call `finish()` after the last
+    document. Sources with failed documents are not recorded, so they are extracted
+    again in the next delta run.
+
+    Parameters:
+    - `index`: the index that is populated
+    - `hash_contents`: whether to record the content hash of each source. Hashing
+    reads each file an extra time; it is only needed for delta runs, where it detects
+    files that were touched but not changed.
+    '''
+
+    def __init__(self, index: Index, hash_contents: bool = True):
+        self.index = index
+        self.hash_contents = hash_contents
+        self._in_progress: OrderedDict[int, IndexedSource] = OrderedDict()
+        self._failed = set()
+
+
+    def changed_sources(self, sources: Iterable[Source]) -> List[Source]:
+        '''
+        Select the sources that were added or changed since they were last indexed.
+
+        Sources that are not read from a file cannot be tracked, and are always
+        included.
+        '''
+        records = {
+            record.path: record
+            for record in self._records().defer('document_ids')
+        }
+        return [
+            source for source in sources
+            if not self._is_current(source_path(source), records)
+        ]
+
+
+    def _is_current(self, path: Optional[str], records: dict) -> bool:
+        return path in records and _record_is_current(records[path])
+
+
+    def remove_outdated(self, changed_sources: Iterable[Source]) -> List[str]:
+        '''
+        Remove records of changed sources and of files that no longer exist.
+
+        Returns the IDs of documents that were indexed from these sources; these
+        documents should be deleted from the index.
+        '''
+        changed_paths = set(filter(None, map(source_path, changed_sources)))
+        outdated = [
+            record.pk
+            for record in self._records().defer('document_ids')
+            if record.path in changed_paths or not os.path.isfile(record.path)
+        ]
+        records = self._records().filter(pk__in=outdated)
+        document_ids = [
+            doc_id
+            for ids in records.values_list('document_ids', flat=True)
+            for doc_id in ids
+        ]
+        records.delete()
+        return document_ids
+
+
+    def start_source(self, source_index: int, source: Source) -> None:
+        '''
+        Start tracking a source that is about to be extracted.
+        '''
+        path = source_path(source)
+        if not path:
+            return
+        stat = os.stat(path)
+        self._in_progress[source_index] = IndexedSource(
+            index=self.index,
+            path=path,
+            modified=stat.st_mtime,
+            size=stat.st_size,
+            content_hash=file_hash(path) if self.hash_contents else '',
+        )
+
+
+    def set_extraction_time(self, source_index: int, seconds: float) -> None:
+        '''
+        Register the time it took to extract a source.
+        '''
+        if source_index in self._in_progress:
+            self._in_progress[source_index].extraction_time = seconds
+
+
+    def add_document(self, source_index: int, document_id: str) -> None:
+        '''
+        Register a document that was indexed from a source.
+
+        Sources are assumed to be processed in order, so any sources that were started
+        before this one are considered complete.
+        '''
+        self._complete_sources_before(source_index)
+        if source_index in self._in_progress:
+            self._in_progress[source_index].document_ids.append(document_id)
+
+
+    def document_failed(self, source_index: int) -> None:
+        '''
+        Register a document from a source that could not be indexed.
+        '''
+        self._complete_sources_before(source_index)
+        if source_index in self._in_progress:
+            self._failed.add(source_index)
+
+
+    def _complete_sources_before(self, source_index: int) -> None:
+        while self._in_progress and next(iter(self._in_progress)) < source_index:
+            self._save(*self._in_progress.popitem(last=False))
+
+
+    def finish(self) -> None:
+        '''
+        Record all sources that are still in progress.
+        '''
+        while self._in_progress:
+            self._save(*self._in_progress.popitem(last=False))
+
+
+    def _save(self, source_index: int, record: IndexedSource) -> None:
+        if source_index in self._failed:
+            self._failed.remove(source_index)
+            self._records().filter(path=record.path).delete()
+            return
+        IndexedSource.objects.update_or_create(
+            index=record.index,
+            path=record.path,
+            defaults={
+                'modified': record.modified,
+                'size': record.size,
+                'content_hash': record.content_hash,
+                'document_ids': record.document_ids,
+                'extraction_time': record.extraction_time,
+            }
+        )
+
+
+    def _records(self):
+        return IndexedSource.objects.filter(index=self.index)
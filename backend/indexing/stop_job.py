@@ -1,5 +1,11 @@
+from time import monotonic
+from typing import Callable
+
 from indexing.models import IndexJob, TaskStatus, IndexTask
 
+ABORT_CHECK_INTERVAL = 5
+'Minimum number of seconds between database lookups in a throttled abort check'
+
 
 def is_stoppable(job: IndexJob):
     return job.status() in [TaskStatus.QUEUED, TaskStatus.WORKING]
@@ -27,6 +33,27 @@ def raise_if_aborted(task: IndexTask):
     `run_task` wrapper will check the task status at the start; adding checks
     is useful for long-running tasks.
     '''
-    task.refresh_from_db()
     if task.is_aborted():
         raise TaskAborted
+
+
+def throttled_abort_check(
+    task: IndexTask, interval: float = ABORT_CHECK_INTERVAL
+) -> Callable[[], None]:
+    '''
+    Create a function that raises an exception if the index task is aborted.
+
+    Unlike `raise_if_aborted`, the returned function will only look up the task status
+    if at least `interval` seconds have passed since the previous lookup, so it can be
+    called for every document in a loop without a database query per document.
+    '''
+    last_check = None
+
+    def check():
+        nonlocal last_check
+        now = monotonic()
+        if last_check is None or now - last_check >= interval:
+            last_check = now
+            raise_if_aborted(task)
+
+    return check
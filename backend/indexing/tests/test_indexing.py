@@ -3,7 +3,7 @@ from datetime import datetime
 from time import sleep
 
 from addcorpus.models import Corpus
-from indexing.models import TaskStatus
+from indexing.models import IndexedSource, TaskStatus
 from indexing.run_job import perform_indexing
 from indexing.create_job import create_indexing_job
 from es.search import get_index
@@ -65,6 +65,24 @@ def test_add_clear(db, mock_corpus, es_index_client):
     assert res.get('count') == 0
 
 
+def test_delete_then_delta(db, mock_corpus, es_index_client):
+    corpus = Corpus.objects.get(name=mock_corpus)
+    job = create_indexing_job(corpus, START, END)
+    perform_indexing(job)
+    assert IndexedSource.objects.exists()
+
+    # recreating the index removes the documents, so their sources are forgotten
+    job = create_indexing_job(corpus, START, END, mappings_only=True, clear=True)
+    perform_indexing(job)
+    assert not IndexedSource.objects.exists()
+
+    job = create_indexing_job(corpus, START, END, delta=True)
+    perform_indexing(job)
+    sleep(1)
+    res = es_index_client.count(index='test-times*')
+    assert res.get('count') == 2
+
+
 def test_mismatch_corpus_index_names(mock_corpus, corpus_definition, es_index_client):
     assert corpus_definition.es_index != mock_corpus
 
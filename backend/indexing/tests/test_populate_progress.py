@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from addcorpus.models import Corpus
+from indexing import populate_progress
+from indexing.models import IndexJob, PopulateIndexTask, Index
+
+
+def test_populate_progress(db, mock_corpus, es_server, monkeypatch):
+    corpus = Corpus.objects.get(name=mock_corpus)
+    job = IndexJob.objects.create(corpus=corpus)
+    index = Index.objects.create(server=es_server, name='test-times')
+    task = PopulateIndexTask.objects.create(job=job, index=index)
+
+    clock = [0]
+    monkeypatch.setattr(populate_progress, 'monotonic', lambda: clock[0])
+
+    progress = populate_progress.PopulateProgress(task, interval=10)
+    progress.start(sources_total=4)
+    progress.add_extraction_time(2)
+    progress.source_done('a.xml', 1000, 2)
+    for _ in range(10):
+        progress.document_done(True)
+    progress.document_done(False)
+
+    saved = PopulateIndexTask.objects.get(pk=task.pk)
+    assert saved.documents_indexed == 0 # not saved yet
+
+    clock[0] = 10
+    progress.document_done(True)
+    saved = PopulateIndexTask.objects.get(pk=task.pk)
+    assert saved.documents_indexed == 11
+    assert saved.documents_failed == 1
+    assert saved.sources_processed == 1
+    assert saved.bytes_processed == 1000
+    assert saved.extraction_time == 2
+    assert saved.bulk_time == 8
+
+    saved.progress_updated = saved.started + timedelta(seconds=10)
+    assert saved.documents_per_second() == 1.1
+    assert saved.bytes_per_second() == 100
+    assert saved.estimated_time_remaining() == 30
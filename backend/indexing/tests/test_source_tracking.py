@@ -0,0 +1,117 @@
+import os
+import pytest
+
+from es.models import Index
+from indexing.models import IndexedSource
+from indexing.source_tracking import SourceTracker, clear_sources, source_path
+
+
+@pytest.fixture()
+def index(db, es_server):
+    return Index.objects.create(server=es_server, name='test-times')
+
+
+@pytest.fixture()
+def source_files(tmpdir):
+    paths = [os.path.join(tmpdir, f'{name}.csv') for name in ['a', 'b', 'c']]
+    for path in paths:
+        with open(path, 'w') as f:
+            f.write(path)
+    return paths
+
+
+def index_sources(tracker: SourceTracker, sources):
+    for i, source in enumerate(sources):
+        tracker.start_source(i, source)
+        tracker.add_document(i, f'doc-{i}')
+    tracker.finish()
+
+
+def test_source_path(source_files):
+    path = source_files[0]
+    assert source_path(path) == path
+    assert source_path((path, {'year': 1800})) == path
+    assert source_path(b'data') is None
+    assert source_path('nonexistent.csv') is None
+
+
+def test_record_sources(index, source_files):
+    tracker = SourceTracker(index)
+    tracker.start_source(0, source_files[0])
+    tracker.start_source(1, source_files[1])
+    tracker.add_document(0, 'doc-0')
+    tracker.add_document(1, 'doc-1')
+    assert IndexedSource.objects.count() == 1
+
+    tracker.add_document(1, 'doc-2')
+    tracker.finish()
+
+    assert IndexedSource.objects.count() == 2
+    record = IndexedSource.objects.get(path=source_files[1])
+    assert record.document_ids == ['doc-1', 'doc-2']
+
+
+def test_changed_sources(index, source_files):
+    tracker = SourceTracker(index)
+    index_sources(tracker, source_files[:2])
+
+    assert tracker.changed_sources(source_files) == source_files[2:]
+
+    # touched but unchanged
+    os.utime(source_files[0], (0, 0))
+    assert tracker.changed_sources(source_files) == source_files[2:]
+
+    with open(source_files[1], 'a') as f:
+        f.write('new data')
+    assert tracker.changed_sources(source_files) == source_files[1:]
+
+
+def test_remove_outdated(index, source_files):
+    tracker = SourceTracker(index)
+    index_sources(tracker, source_files)
+
+    os.remove(source_files[0])
+    document_ids = tracker.remove_outdated([source_files[1]])
+
+    assert sorted(document_ids) == ['doc-0', 'doc-1']
+    assert IndexedSource.objects.get().path == source_files[2]
+
+
+def test_sources_without_hash(index, source_files):
+    tracker = SourceTracker(index, hash_contents=False)
+    index_sources(tracker, source_files)
+    assert not IndexedSource.objects.get(path=source_files[0]).content_hash
+
+    # cannot tell if the contents changed
+    os.utime(source_files[0], (0, 0))
+    assert tracker.changed_sources(source_files) == source_files[:1]
+
+
+def test_failed_documents(index, source_files):
+    tracker = SourceTracker(index)
+    index_sources(tracker, source_files)
+
+    tracker.start_source(0, source_files[0])
+    tracker.add_document(0, 'doc-0')
+    tracker.document_failed(0)
+    tracker.start_source(1, source_files[1])
+    tracker.add_document(1, 'doc-1')
+    tracker.finish()
+
+    assert tracker.changed_sources(source_files) == source_files[:1]
+
+
+def test_indexed_source_admin(index, source_files, admin_client):
+    index_sources(SourceTracker(index), source_files)
+    response = admin_client.get('/admin/indexing/indexedsource/?o=4')
+    assert response.status_code == 200
+    assert source_files[0] in response.content.decode()
+
+
+def test_clear_sources(index, source_files):
+    tracker = SourceTracker(index)
+    index_sources(tracker, source_files)
+    clear_sources(index)
+
+    assert not IndexedSource.objects.exists()
+    assert tracker.changed_sources(source_files) == source_files
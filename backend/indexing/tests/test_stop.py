@@ -1,3 +1,4 @@
+import pytest
 from time import sleep
 from copy import copy
 from elasticsearch import Elasticsearch
@@ -49,3 +50,29 @@ def test_stop_job(transactional_db, mock_corpus, es_index_client: Elasticsearch,
     result = search.search(mock_corpus, MATCH_ALL, es_index_client)
     assert 0 < search.total_hits(result) < 20
 
+
+
+def test_throttled_abort_check(db, mock_corpus, es_server, monkeypatch, django_assert_num_queries):
+    corpus = Corpus.objects.get(name=mock_corpus)
+    job = models.IndexJob.objects.create(corpus=corpus)
+    index = models.Index.objects.create(server=es_server, name='test-times')
+    task = models.PopulateIndexTask.objects.create(
+        job=job, index=index, status=models.TaskStatus.WORKING
+    )
+
+    clock = [0]
+    monkeypatch.setattr(stop_job, 'monotonic', lambda: clock[0])
+    check = stop_job.throttled_abort_check(task, interval=5)
+
+    with django_assert_num_queries(1):
+        for _ in range(100):
+            check()
+
+    models.PopulateIndexTask.objects.filter(pk=task.pk).update(
+        status=models.TaskStatus.ABORTED
+    )
+    check() # not checked yet
+
+    clock[0] = 5
+    with pytest.raises(stop_job.TaskAborted):
+        check()
@@ -0,0 +1,105 @@
+import pytest
+from time import sleep
+
+from addcorpus.models import Corpus
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from indexing import run_update_task
+from indexing.create_job import create_indexing_job
+from indexing.models import TaskStatus
+from indexing.run_job import perform_indexing
+from indexing.tests.test_indexing import START, END
+
+
+def test_update_index(mock_corpus, corpus_definition, es_index_client, monkeypatch):
+    corpus = Corpus.objects.get(name=mock_corpus)
+    job = create_indexing_job(corpus, START, END)
+    perform_indexing(job)
+    sleep(1)
+
+    def update_body(doc=None):
+        if not doc:
+            return True
+        return {'doc': {'source': 'updated'}}
+
+    monkeypatch.setattr(corpus_definition, 'update_body', update_body)
+    monkeypatch.setattr(
+        run_update_task, 'load_corpus_definition', lambda name: corpus_definition
+    )
+
+    update_job = create_indexing_job(corpus, START, END, update=True)
+    perform_indexing(update_job)
+    assert update_job.status() == TaskStatus.DONE
+    sleep(1)
+
+    result = es_index_client.search(index='test-times', query={'match_all': {}})
+    hits = result['hits']['hits']
+    assert len(hits) == 2
+    assert all(hit['_source']['source'] == 'updated' for hit in hits)
+
+
+def test_update_by_query(mock_corpus, corpus_definition, es_index_client, monkeypatch):
+    corpus = Corpus.objects.get(name=mock_corpus)
+    job = create_indexing_job(corpus, START, END)
+    perform_indexing(job)
+    sleep(1)
+
+    def update_script():
+        yield {
+            'script': {
+                'source': "ctx._source['source'] = 'updated'",
+                'lang': 'painless',
+            },
+            'query': {'match_all': {}},
+        }
+
+    monkeypatch.setattr(corpus_definition, 'update_script', update_script)
+    monkeypatch.setattr(
+        run_update_task, 'load_corpus_definition', lambda name: corpus_definition
+    )
+    monkeypatch.setattr(run_update_task, 'UPDATE_POLL_INTERVAL', 0.1)
+
+    update_job = create_indexing_job(corpus, START, END, update=True)
+    perform_indexing(update_job)
+    assert update_job.status() == TaskStatus.DONE
+    assert len(update_job.updateindextasks.first().es_task_ids) == 1
+    sleep(1)
+
+    result = es_index_client.search(index='test-times', query={'match_all': {}})
+    hits = result['hits']['hits']
+    assert all(hit['_source']['source'] == 'updated' for hit in hits)
+
+
+class FailingUpdateClient:
+    '''Mock client for update-by-query requests that fail while they are polled'''
+
+    def __init__(self):
+        self.submitted = []
+        self.cancelled = []
+        self.tasks = self
+
+    def update_by_query(self, **kwargs):
+        es_task_id = f'node:{len(self.submitted)}'
+        self.submitted.append(es_task_id)
+        return {'task': es_task_id}
+
+    def get(self, task_id):
+        raise ConnectionError('Elasticsearch is unavailable')
+
+    def cancel(self, task_id):
+        self.cancelled.append(task_id)
+
+
+def test_update_by_query_failure(db, mock_corpus, monkeypatch):
+    corpus = Corpus.objects.get(name=mock_corpus)
+    job = create_indexing_job(corpus, START, END, update=True)
+    task = job.updateindextasks.get()
+    client = FailingUpdateClient()
+    monkeypatch.setattr(task, 'client', lambda: client)
+    monkeypatch.setattr(run_update_task, 'UPDATE_POLL_INTERVAL', 0)
+
+    queries = ({'query': {'match_all': {}}} for _ in range(6))
+    with pytest.raises(ConnectionError):
+        run_update_task.update_by_query(task, queries)
+
+    assert len(client.submitted) == run_update_task.MAX_CONCURRENT_UPDATES
+    assert client.cancelled == client.submitted
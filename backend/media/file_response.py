@@ -0,0 +1,177 @@
+'''
+Responses for media files, with support for conditional requests, byte ranges,
+and offloading to the reverse proxy.
+'''
+
+import os
+import re
+from typing import Iterator, Optional
+from urllib.parse import quote
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.http.response import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+'Number of bytes read at a time when streaming a range of a file'
+
+
+def file_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def file_response(
+    request: HttpRequest, path: str, filename: str, content_type: str,
+    as_attachment: bool = True,
+) -> HttpResponse:
+    '''
+    Respond with a file from disk.
+
+    - Responds with 304 Not Modified if the request has a matching `If-None-Match` or
+    `If-Modified-Since` header.
+    - Responds with the requested bytes (206 Partial Content) for a `Range` request,
+    unless an `If-Range` header does not match the current version of the file.
+    - If the `MEDIA_SENDFILE` setting is configured, the file is sent by the reverse
+    proxy, which handles ranges itself.
+    '''
+    stat = os.stat(path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=last_modified,
+    )
+    if conditional is not None:
+        return conditional
+
+    response = (
+        _sendfile_response(path, content_type)
+        or _range_response(request, path, stat.st_size, etag, last_modified, content_type)
+    )
+    if response is None:
+        response = FileResponse(
+            open(path, 'rb'), filename=filename, as_attachment=as_attachment,
+            content_type=content_type,
+        )
+    else:
+        response['Content-Disposition'] = content_disposition_header(
+            as_attachment, filename
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _sendfile_response(path: str, content_type: str) -> Optional[HttpResponse]:
+    '''
+    A response that lets the reverse proxy send the file, if configured.
+
+    The `MEDIA_SENDFILE` setting can be `'x-accel-redirect'` (nginx) or
+    `'x-sendfile'` (Apache, lighttpd). Only files in the directories of the
+    `MEDIA_SENDFILE_LOCATIONS` setting are sent by the proxy; for nginx, it maps those
+    directories to internal locations in the nginx configuration. Other files (such as
+    cached pdf excerpts) are sent by Django.
+    '''
+    backend = getattr(settings, 'MEDIA_SENDFILE', None)
+    if backend not in ['x-sendfile', 'x-accel-redirect']:
+        return None
+
+    real_path = os.path.realpath(path)
+    locations = getattr(settings, 'MEDIA_SENDFILE_LOCATIONS', {})
+    for directory, location in locations.items():
+        directory = os.path.join(os.path.realpath(directory), '')
+        if real_path.startswith(directory):
+            response = HttpResponse(content_type=content_type)
+            if backend == 'x-sendfile':
+                response['X-Sendfile'] = real_path
+            else:
+                relative_path = os.path.relpath(real_path, directory)
+                # nginx expects a URI, so special characters in the path are quoted
+                response['X-Accel-Redirect'] = location.rstrip('/') + '/' + quote(relative_path)
+            return response
+
+
+def _range_response(
+    request: HttpRequest, path: str, size: int, etag: str, last_modified: int,
+    content_type: str,
+) -> Optional[HttpResponse]:
+    '''
+    A 206 or 416 response for a request with a single byte range, or `None` if the
+    full file should be sent.
+    '''
+    header = request.headers.get('Range')
+    if not header or not _if_range_matches(request, etag, last_modified):
+        return None
+
+    byte_range = parse_range(header, size)
+    if byte_range is None:
+        # multiple or malformed ranges: ignore the header and send the full file
+        return None
+    if byte_range is False:
+        response = HttpResponse(status=416, content_type=content_type)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        _read_range(path, start, end), status=206, content_type=content_type,
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def _if_range_matches(request: HttpRequest, etag: str, last_modified: int) -> bool:
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def parse_range(header: str, size: int):
+    '''
+    Parse a `Range` header with a single byte range.
+
+    Returns the first and last byte (inclusive), `None` if the header is not a single
+    valid byte range, or `False` if the range cannot be satisfied.
+    '''
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        # invalid range, which should be ignored (RFC 9110)
+        return None
+    if start >= size:
+        return False
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
@@ -1,7 +1,23 @@
 from pypdf import PdfReader, PdfWriter
 from io import BytesIO
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import BinaryIO, Iterable
 
 from os.path import getsize, split
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger()
+
+PDF_INFO_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+'Number of seconds for which the metadata of a pdf is cached'
+
+PDF_CACHE_MAX_SIZE = 500 * 1024 * 1024
+'Default maximum size (in bytes) of the directory of cached partial pdfs'
 
 
 def pdf_pages(all_pages, pages_returned, home_page):
@@ -52,10 +68,29 @@ def retrieve_pdf(path):
     return pdf
 
 
+def _file_key(path) -> str:
+    '''
+    A key for the current version of a file, based on its path, modification time
+    and size.
+    '''
+    stat = os.stat(path)
+    identifier = f'{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}'
+    return hashlib.sha256(identifier.encode()).hexdigest()
+
+
 def get_pdf_info(path):
     '''
-    Gather pdf information.
+    Gather pdf information. Results are cached until the file is modified.
     '''
+    key = f'pdf_info:{_file_key(path)}'
+    info = cache.get(key)
+    if info is None:
+        info = _read_pdf_info(path)
+        cache.set(key, info, timeout=PDF_INFO_CACHE_TIMEOUT)
+    return info
+
+
+def _read_pdf_info(path):
     pdf = PdfReader(path, 'rb')
     title = pdf.metadata.title
     _dir, filename = split(path)
@@ -68,6 +103,83 @@ def get_pdf_info(path):
     return info
 
 
+def pdf_cache_path() -> str:
+    return getattr(
+        settings, 'PDF_CACHE_PATH',
+        os.path.join(tempfile.gettempdir(), 'textcavator-pdf-cache')
+    )
+
+
+def cached_partial_pdf(path, pages: Iterable[int]) -> BinaryIO:
+    '''
+    A partial pdf consisting of the requested pages, as an open file.
+
+    Partial pdfs are stored on disk, so they are only built once for each version of
+    the source file. When the cache exceeds its maximum size (the `PDF_CACHE_MAX_SIZE`
+    setting), the least recently used files are removed.
+    '''
+    pages = list(pages)
+    directory = pdf_cache_path()
+    pages_key = ','.join(str(p) for p in pages)
+    filename = hashlib.sha256(f'{_file_key(path)}|{pages_key}'.encode()).hexdigest()
+    cached_path = os.path.join(directory, filename + '.pdf')
+
+    try:
+        # update the access time, which is used to find the least recently used files;
+        # the modification time is kept, so it can be used for conditional requests
+        os.utime(cached_path, ns=(time.time_ns(), os.stat(cached_path).st_mtime_ns))
+        return open(cached_path, 'rb')
+    except FileNotFoundError:
+        # not cached yet, or removed by a concurrent request
+        pass
+
+    os.makedirs(directory, exist_ok=True)
+    partial = build_partial_pdf(pages, retrieve_pdf(path))
+    # write to a temporary file first, so concurrent requests never read a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(partial.getbuffer())
+        os.replace(tmp_path, cached_path)
+        # open the file before eviction, so it stays readable if a concurrent
+        # request removes it
+        cached_file = open(cached_path, 'rb')
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _evict_partial_pdfs(directory, keep=cached_path)
+    return cached_file
+
+
+def _evict_partial_pdfs(directory, keep):
+    '''
+    Remove the least recently used partial pdfs until the cache directory is within
+    its maximum size.
+    '''
+    max_size = getattr(settings, 'PDF_CACHE_MAX_SIZE', PDF_CACHE_MAX_SIZE)
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith('.pdf'):
+            stat = entry.stat()
+            files.append((stat.st_atime, stat.st_size, entry.path))
+
+    total_size = sum(size for _, size, _ in files)
+    for _, size, file_path in sorted(files):
+        if total_size <= max_size:
+            break
+        if file_path == keep:
+            continue
+        try:
+            os.remove(file_path)
+            total_size -= size
+        except FileNotFoundError:
+            # removed by a concurrent request
+            pass
+        except OSError:
+            logger.warning(f'Could not remove cached pdf {file_path}', exc_info=True)
+
+
 def sizeof_fmt(num, suffix='B'):
     '''
     Converts numerical filesize to human-readable string.
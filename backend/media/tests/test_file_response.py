@@ -0,0 +1,107 @@
+import pytest
+
+from media.file_response import file_response, parse_range
+
+CONTENT = bytes(range(100))
+
+
+@pytest.fixture()
+def file_path(tmp_path):
+    path = tmp_path / 'scan.png'
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+def content(response) -> bytes:
+    return b''.join(response.streaming_content)
+
+
+def test_full_response(rf, file_path):
+    response = file_response(rf.get('/'), file_path, 'scan.png', 'image/png')
+    assert response.status_code == 200
+    assert content(response) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    assert response['Content-Disposition'] == 'attachment; filename="scan.png"'
+    assert response['ETag']
+    assert response['Last-Modified']
+
+
+def test_conditional_response(rf, file_path):
+    response = file_response(rf.get('/'), file_path, 'scan.png', 'image/png')
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    request = rf.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert file_response(request, file_path, 'scan.png', 'image/png').status_code == 304
+
+    request = rf.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert file_response(request, file_path, 'scan.png', 'image/png').status_code == 304
+
+    request = rf.get('/', HTTP_IF_NONE_MATCH='"other"')
+    assert file_response(request, file_path, 'scan.png', 'image/png').status_code == 200
+
+
+def test_range_response(rf, file_path):
+    request = rf.get('/', HTTP_RANGE='bytes=10-19')
+    response = file_response(request, file_path, 'scan.png', 'image/png')
+    assert response.status_code == 206
+    assert response['Content-Range'] == 'bytes 10-19/100'
+    assert content(response) == CONTENT[10:20]
+
+    request = rf.get('/', HTTP_RANGE='bytes=200-')
+    response = file_response(request, file_path, 'scan.png', 'image/png')
+    assert response.status_code == 416
+    assert response['Content-Range'] == 'bytes */100'
+
+    # invalid range: send the full file
+    request = rf.get('/', HTTP_RANGE='bytes=5-3')
+    response = file_response(request, file_path, 'scan.png', 'image/png')
+    assert response.status_code == 200
+
+    # If-Range does not match: send the full file
+    request = rf.get('/', HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+    response = file_response(request, file_path, 'scan.png', 'image/png')
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('header,expected', [
+    ('bytes=0-9', (0, 9)),
+    ('bytes=90-', (90, 99)),
+    ('bytes=-10', (90, 99)),
+    ('bytes=50-500', (50, 99)),
+    ('bytes=100-', False),
+    ('bytes=20-10', None),
+    ('bytes=150-120', None),
+    ('bytes=100-150', False),
+    ('bytes=0-9,20-29', None),
+    ('items=0-9', None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+def test_sendfile(rf, file_path, tmp_path, settings):
+    settings.MEDIA_SENDFILE = 'x-accel-redirect'
+    settings.MEDIA_SENDFILE_LOCATIONS = {str(tmp_path): '/protected/'}
+    response = file_response(rf.get('/'), file_path, 'scan.png', 'image/png')
+    assert response['X-Accel-Redirect'] == '/protected/scan.png'
+    assert response.content == b''
+
+    # special characters are quoted
+    path = tmp_path / 'scans' / 'scan #1?.png'
+    path.parent.mkdir()
+    path.write_bytes(CONTENT)
+    response = file_response(rf.get('/'), str(path), 'scan.png', 'image/png')
+    assert response['X-Accel-Redirect'] == '/protected/scans/scan%20%231%3F.png'
+
+    settings.MEDIA_SENDFILE = 'x-sendfile'
+    response = file_response(rf.get('/'), file_path, 'scan.png', 'image/png')
+    assert response['X-Sendfile'].endswith('scan.png')
+
+    # files outside the configured directories are sent by Django
+    settings.MEDIA_SENDFILE_LOCATIONS = {str(tmp_path / 'scans'): '/protected/'}
+    for backend in ['x-sendfile', 'x-accel-redirect']:
+        settings.MEDIA_SENDFILE = backend
+        response = file_response(rf.get('/'), file_path, 'scan.png', 'image/png')
+        assert 'X-Sendfile' not in response
+        assert 'X-Accel-Redirect' not in response
+        assert content(response) == CONTENT
@@ -0,0 +1,107 @@
+import os
+from pypdf import PdfReader, PdfWriter
+import pytest
+
+from media import image_processing
+
+
+@pytest.fixture()
+def pdf_path(tmp_path):
+    path = tmp_path / 'volume.pdf'
+    writer = PdfWriter()
+    for _ in range(10):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return str(path)
+
+
+@pytest.fixture()
+def pdf_cache(settings, tmp_path):
+    settings.PDF_CACHE_PATH = str(tmp_path / 'pdf-cache')
+    return settings.PDF_CACHE_PATH
+
+
+def count_calls(monkeypatch, name):
+    calls = []
+    function = getattr(image_processing, name)
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(image_processing, name, counted)
+    return calls
+
+
+def test_pdf_info_cache(pdf_path, monkeypatch):
+    calls = count_calls(monkeypatch, '_read_pdf_info')
+
+    info = image_processing.get_pdf_info(pdf_path)
+    assert info['filename'] == 'volume.pdf'
+    assert info['all_pages'] == list(range(10))
+    assert image_processing.get_pdf_info(pdf_path) == info
+    assert len(calls) == 1
+
+    # modifying the file invalidates the cache
+    stat = os.stat(pdf_path)
+    os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    image_processing.get_pdf_info(pdf_path)
+    assert len(calls) == 2
+
+
+def test_cached_partial_pdf(pdf_path, pdf_cache, monkeypatch):
+    calls = count_calls(monkeypatch, 'retrieve_pdf')
+
+    with image_processing.cached_partial_pdf(pdf_path, range(2, 5)) as f:
+        assert len(PdfReader(f).pages) == 3
+        mtime = os.stat(f.name).st_mtime_ns
+    with image_processing.cached_partial_pdf(pdf_path, range(2, 5)) as f:
+        assert len(PdfReader(f).pages) == 3
+        # the modification time (used for the ETag) is not changed
+        assert os.stat(f.name).st_mtime_ns == mtime
+    assert len(calls) == 1
+
+    with image_processing.cached_partial_pdf(pdf_path, range(3, 6)):
+        pass
+    assert len(calls) == 2
+    assert len(os.listdir(pdf_cache)) == 2
+
+
+def test_partial_pdf_removed(pdf_path, pdf_cache, monkeypatch):
+    with image_processing.cached_partial_pdf(pdf_path, range(2, 5)):
+        pass
+
+    # the cached file is removed by another request after it is found
+    utime = os.utime
+
+    def remove_and_utime(path, *args, **kwargs):
+        os.remove(path)
+        return utime(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'utime', remove_and_utime)
+    with image_processing.cached_partial_pdf(pdf_path, range(2, 5)) as f:
+        assert len(PdfReader(f).pages) == 3
+
+
+def test_partial_pdf_write_error(pdf_path, pdf_cache, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        image_processing.cached_partial_pdf(pdf_path, range(2, 5))
+
+    # the temporary file is removed
+    assert os.listdir(pdf_cache) == []
+
+
+def test_partial_pdf_eviction(pdf_path, pdf_cache, settings):
+    settings.PDF_CACHE_MAX_SIZE = 1
+
+    for start in range(3):
+        with image_processing.cached_partial_pdf(pdf_path, range(start, start + 2)):
+            pass
+
+    # only the most recent file is kept
+    assert len(os.listdir(pdf_cache)) == 1
@@ -6,6 +6,7 @@ from addcorpus.permissions import (CanSearchCorpus,
                                    corpus_name_from_request)
 from api.utils import check_json_keys, find_media_file
 from django.http.response import FileResponse
+from media.file_response import file_response
 from rest_framework.exceptions import APIException, NotFound, ParseError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -17,6 +18,9 @@ logger = logging.getLogger()
 class GetMediaView(APIView):
     '''
     Return the image/pdf of a document
+
+    Files on disk support conditional requests and byte ranges, and can be sent by
+    the reverse proxy (see `media.file_response`).
     '''
 
     permission_classes = [CanSearchCorpus]
@@ -40,6 +44,17 @@ class GetMediaView(APIView):
             if not out:
                 raise NotFound()
 
+            path = getattr(out, 'name', None)
+            if isinstance(path, str) and os.path.isfile(path):
+                try:
+                    response = file_response(request, path, 'scan.pdf', 'application/pdf')
+                except FileNotFoundError:
+                    # removed by a concurrent request (e.g. a cached excerpt that was
+                    # evicted); send the file that is still open instead
+                    pass
+                else:
+                    out.close()
+                    return response
             return FileResponse(out, filename='scan.pdf',
                                 as_attachment=True,
                                 content_type='application/pdf')
@@ -50,10 +65,7 @@ class GetMediaView(APIView):
                 raise NotFound()
             else:
                 _, filename = os.path.split(image_path)
-                return FileResponse(open(path, 'rb'),
-                                    filename=filename,
-                                    as_attachment=True,
-                                    content_type=corpus.scan_image_type)
+                return file_response(request, path, filename, corpus.scan_image_type)
 
 
 class MediaMetadataView(APIView):
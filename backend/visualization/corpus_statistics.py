@@ -0,0 +1,186 @@
+'''
+Statistics over all documents in a corpus, which are precomputed after indexing.
+
+All statistics are collected with a single search request, and stored in the
+`CorpusStatistics` model. Stored statistics are only used while the index has not
+changed since they were computed; otherwise, statistics are aggregated from the
+index and cached per version of the index.
+'''
+
+import logging
+from typing import Dict, List, Optional
+
+from addcorpus.models import Corpus, Field
+from api import task_cache
+from es import search as es_search
+from visualization.models import CorpusStatistics
+
+logger = logging.getLogger('indexing')
+
+VALUE_COUNTS_SIZE = 100
+'Maximum number of values stored for each field with a multiple choice filter'
+
+
+def _mapping_type(field: Field) -> Optional[str]:
+    return (field.es_mapping or {}).get('type')
+
+
+def _has_multiple_choice_filter(field: Field) -> bool:
+    return (field.search_filter or {}).get('name') == 'MultipleChoiceFilter'
+
+
+def year_histogram_aggregation(field_name: str) -> Dict:
+    '''
+    Aggregation for the number of documents per year in a date field.
+    '''
+    return {
+        'date_histogram': {
+            'field': field_name,
+            'calendar_interval': 'year',
+            'format': 'yyyy',
+            'min_doc_count': 1,
+        }
+    }
+
+
+def parse_year_histogram(aggregation: Dict) -> Dict[str, int]:
+    '''
+    Convert the result of `year_histogram_aggregation` to a dictionary of document
+    counts by year. Years are strings, as they are stored in JSON.
+    '''
+    return {
+        bucket['key_as_string']: bucket['doc_count']
+        for bucket in aggregation['buckets']
+    }
+
+
+def statistics_aggregations(fields: List[Field]) -> Dict:
+    '''
+    The aggregations to compute statistics for the fields of a corpus.
+    '''
+    aggs = {}
+    for field in fields:
+        mapping_type = _mapping_type(field)
+        if mapping_type == 'geo_point':
+            aggs[f'geo_centroid:{field.name}'] = {'geo_centroid': {'field': field.name}}
+            aggs[f'geo_bounds:{field.name}'] = {'geo_bounds': {'field': field.name}}
+        elif mapping_type == 'date':
+            aggs[f'date_min:{field.name}'] = {'min': {'field': field.name}}
+            aggs[f'date_max:{field.name}'] = {'max': {'field': field.name}}
+            aggs[f'date_years:{field.name}'] = year_histogram_aggregation(field.name)
+        elif _has_multiple_choice_filter(field):
+            aggs[f'values:{field.name}'] = {
+                'terms': {'field': field.name, 'size': VALUE_COUNTS_SIZE}
+            }
+    return aggs
+
+
+def parse_statistics(fields: List[Field], aggregations: Dict) -> Dict:
+    '''
+    Convert the results of `statistics_aggregations` to the values of the fields of
+    the `CorpusStatistics` model.
+    '''
+    geo, date_ranges, value_counts = {}, {}, {}
+    for field in fields:
+        name = field.name
+        if f'geo_centroid:{name}' in aggregations:
+            geo[name] = {
+                'centroid': aggregations[f'geo_centroid:{name}'],
+                'bounds': aggregations[f'geo_bounds:{name}'].get('bounds'),
+            }
+        if f'date_min:{name}' in aggregations:
+            date_ranges[name] = {
+                'min': aggregations[f'date_min:{name}'].get('value_as_string'),
+                'max': aggregations[f'date_max:{name}'].get('value_as_string'),
+            }
+            if f'date_years:{name}' in aggregations:
+                date_ranges[name]['years'] = parse_year_histogram(
+                    aggregations[f'date_years:{name}']
+                )
+        if f'values:{name}' in aggregations:
+            value_counts[name] = [
+                {'key': bucket['key'], 'doc_count': bucket['doc_count']}
+                for bucket in aggregations[f'values:{name}']['buckets']
+            ]
+    return {
+        'geo': geo,
+        'date_ranges': date_ranges,
+        'value_counts': value_counts,
+    }
+
+
+def update_corpus_statistics(corpus: Corpus) -> CorpusStatistics:
+    '''
+    Compute the statistics for a corpus from its index, and store them.
+    '''
+    fields = list(corpus.configuration.fields.filter(indexed=True))
+    query_model = {'aggs': statistics_aggregations(fields)}
+    result = es_search.search(
+        corpus.name, query_model, size=0, track_total_hits=True
+    )
+    values = parse_statistics(fields, result.get('aggregations', {}))
+    statistics, _ = CorpusStatistics.objects.update_or_create(
+        corpus=corpus,
+        defaults={
+            **values,
+            'document_count': es_search.total_hits(result),
+            'index_version': es_search.index_version(corpus.name),
+        },
+    )
+    return statistics
+
+
+def try_update_corpus_statistics(corpus: Corpus) -> None:
+    '''
+    Update the statistics for a corpus, logging errors instead of raising them.
+    '''
+    try:
+        update_corpus_statistics(corpus)
+    except Exception:
+        logger.exception(f'Could not update statistics for corpus {corpus.name}')
+
+
+def current_statistics(corpus_name: str) -> Optional[CorpusStatistics]:
+    '''
+    The stored statistics of a corpus, or `None` if there are none, or if the index
+    has changed since they were computed.
+    '''
+    statistics = CorpusStatistics.objects.filter(corpus__name=corpus_name).first()
+    if statistics and statistics.index_version == es_search.index_version(corpus_name):
+        return statistics
+
+
+def stored_geo_centroid(corpus_name: str, field_name: str) -> Optional[Dict]:
+    '''
+    The stored centroid of a geo field, or `None` if it is not available or out of
+    date.
+    '''
+    statistics = current_statistics(corpus_name)
+    if statistics:
+        return statistics.geo_centroid(field_name)
+
+
+def year_histogram(corpus_name: str, field_name: str) -> Dict[int, int]:
+    '''
+    The number of documents per year in a date field of a corpus. Years without
+    documents are left out.
+
+    Uses the stored statistics if they are up to date; otherwise, the histogram is
+    aggregated from the index and cached per version of the index.
+    '''
+    statistics = current_statistics(corpus_name)
+    histogram = statistics.year_histogram(field_name) if statistics else None
+    if histogram is None:
+        key = task_cache.corpus_result_key(
+            'year_histogram', {'corpus': corpus_name, 'date_field': field_name},
+            corpus_name,
+        )
+        years = task_cache.cached_call(key, _search_year_histogram, corpus_name, field_name)
+        histogram = {int(year): count for year, count in years.items()}
+    return histogram
+
+
+def _search_year_histogram(corpus_name: str, field_name: str) -> Dict[str, int]:
+    query_model = {'aggs': {'years': year_histogram_aggregation(field_name)}}
+    result = es_search.search(corpus_name, query_model, size=0)
+    return parse_year_histogram(es_search.aggregation_results(result)['years'])
@@ -1,5 +1,8 @@
+import hashlib
+from django.core.cache import cache
+
 from es.client import elasticsearch
-from es.search import total_hits, search
+from es.search import aggregation_results, index_version, total_hits, search
 from addcorpus.models import Corpus, CorpusConfiguration
 from visualization.query import MATCH_ALL
 
@@ -34,19 +37,61 @@ def count_total(es_client, corpus_name):
     )
     return total_hits(result)
 
+COVERAGE_CACHE_TIMEOUT = 24 * 60 * 60
+'Number of seconds for which a coverage report is cached'
+
 def report_coverage(corpus_name):
     '''
     Returns a dict with the ratio of documents that have a value for each field in the corpus
+
+    Reports are cached per version of the index.
     '''
 
     es_client = elasticsearch(corpus_name)
     corpus_conf = CorpusConfiguration.objects.get(corpus__name=corpus_name)
+    field_names = list(corpus_conf.fields.values_list('name', flat=True))
 
-    total = count_total(es_client, corpus_name)
+    version = index_version(corpus_name, es_client)
+    fields_key = hashlib.sha256(','.join(field_names).encode()).hexdigest()[:16]
+    key = f'field_coverage:{corpus_name}:{version}:{fields_key}'
 
-    return {
-        field.name: count_field(es_client, corpus_name, field.name) / total
-        for field in corpus_conf.fields.all()
-    }
+    report = cache.get(key)
+    if report is None:
+        report = count_coverage(es_client, corpus_name, field_names)
+        cache.set(key, report, timeout=COVERAGE_CACHE_TIMEOUT)
+    return report
 
 
+def count_coverage(es_client, corpus_name, field_names):
+    '''
+    The ratio of documents that have a value for each field, computed in a single
+    request with a filters aggregation.
+    '''
+
+    body = {
+        **MATCH_ALL,
+        'aggs': {
+            'coverage': {
+                'filters': {
+                    'filters': {
+                        name: {'exists': {'field': name}}
+                        for name in field_names
+                    }
+                }
+            }
+        }
+    }
+    result = search(
+        corpus_name=corpus_name,
+        query_model=body,
+        client=es_client,
+        size=0,
+        track_total_hits=True,
+    )
+    total = total_hits(result)
+    buckets = aggregation_results(result)['coverage']['buckets']
+
+    return {
+        name: buckets[name]['doc_count'] / total if total else 0.0
+        for name in field_names
+    }
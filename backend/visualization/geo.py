@@ -0,0 +1,153 @@
+'''
+Geo data for the map visualisation.
+
+Documents can be retrieved as individual points, or as clusters: the number of
+documents per map tile for a zoom level.
+'''
+
+import json
+import logging
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from django.conf import settings
+
+from es import download as es_download, search as es_search
+
+logger = logging.getLogger()
+
+POINTS_LIMIT = 10000
+'Default maximum number of documents returned as individual points'
+
+MAX_CLUSTERS = 10000
+'Maximum number of clusters returned for a zoom level'
+
+MAX_ZOOM = 29
+'Highest zoom level supported by the geotile grid aggregation'
+
+
+def points_limit() -> int:
+    return getattr(settings, 'MAP_POINTS_LIMIT', POINTS_LIMIT)
+
+
+def document_feature(document: Dict, geo_field: str) -> Optional[Dict]:
+    '''
+    Convert a search hit to a GeoJSON point feature, or `None` if the document has
+    no location.
+    '''
+    source = document['_source']
+    if source.get(geo_field) is None:
+        return None
+    return {
+        'type': 'Feature',
+        'geometry': {
+            'type': 'Point',
+            'coordinates': source[geo_field]['coordinates'],
+        },
+        'properties': {
+            'id': source.get('id', document['_id']),
+        },
+    }
+
+
+def geo_points(
+    corpus_name: str, es_query: Dict, geo_field: str, limit: Optional[int] = None
+) -> Tuple[Iterator[Dict], int]:
+    '''
+    Iterate over matching documents as GeoJSON point features.
+
+    Documents are scrolled in pages, up to a limit. The total number of hits is
+    requested immediately, so connection errors are raised before iterating.
+
+    Returns an iterator of features, and the total number of matching documents.
+    '''
+    limit = limit or points_limit()
+    chunks, total = es_download.scroll_chunks(
+        corpus_name, es_query, limit, source_includes=['id', geo_field],
+    )
+    documents = islice(chain.from_iterable(chunks), limit)
+    return _features(documents, geo_field), total
+
+
+def points_json(features: Iterator[Dict], total: int, limit: int) -> Iterator[str]:
+    '''
+    Serialise point features as a JSON object, one feature at a time.
+
+    The object includes the total number of matching documents, the limit on the
+    number of points, and whether the features were truncated to that limit. If an
+    error occurs while iterating, the object is closed with an `error` property, so
+    the response is still valid JSON.
+    '''
+    header = {'total': total, 'limit': limit, 'truncated': total > limit}
+    yield json.dumps(header)[:-1] + ', "features": ['
+    try:
+        for i, feature in enumerate(features):
+            yield (',' if i else '') + json.dumps(feature)
+    except Exception as e:
+        logger.error(e)
+        yield '], "error": "could not generate geo data"}'
+        return
+    yield ']}'
+
+
+def _features(documents: Iterator[Dict], geo_field: str) -> Iterator[Dict]:
+    for document in documents:
+        feature = document_feature(document, geo_field)
+        if feature:
+            yield feature
+
+
+def geo_clusters(
+    corpus_name: str, es_query: Dict, geo_field: str, zoom: int,
+    bounds: Optional[Dict] = None,
+) -> List[Dict]:
+    '''
+    Count matching documents per map tile for a zoom level.
+
+    Parameters:
+    - `zoom`: the zoom level; higher levels use smaller tiles
+    - `bounds`: optional bounding box to restrict the clusters to the visible map, as
+    a dict with `top_left` and `bottom_right` points
+
+    Returns a list of GeoJSON point features, located at the centroid of the documents
+    in each tile. The properties include the number of documents and the tile key.
+    '''
+    grid = {
+        'field': geo_field,
+        'precision': zoom,
+        'size': MAX_CLUSTERS,
+    }
+    if bounds:
+        grid['bounds'] = bounds
+
+    query_model = {
+        **es_query,
+        'aggs': {
+            'clusters': {
+                'geotile_grid': grid,
+                'aggs': {
+                    'centroid': {'geo_centroid': {'field': geo_field}},
+                },
+            },
+        },
+    }
+    result = es_search.search(corpus_name, query_model, size=0)
+    buckets = es_search.aggregation_results(result)['clusters']['buckets']
+    return [cluster_feature(bucket) for bucket in buckets]
+
+
+def cluster_feature(bucket: Dict) -> Dict:
+    '''
+    Convert a geotile grid bucket to a GeoJSON point feature.
+    '''
+    location = bucket['centroid']['location']
+    return {
+        'type': 'Feature',
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [location['lon'], location['lat']],
+        },
+        'properties': {
+            'tile': bucket['key'],
+            'count': bucket['doc_count'],
+        },
+    }
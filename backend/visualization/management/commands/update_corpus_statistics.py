@@ -0,0 +1,33 @@
+from django.core.management import BaseCommand
+
+from addcorpus.models import Corpus
+from visualization.corpus_statistics import update_corpus_statistics
+
+
+class Command(BaseCommand):
+    help = '''
+    Compute and store the statistics of corpora (such as the centroid of geo fields),
+    which are used by visualisations. Statistics are updated automatically when a
+    corpus is indexed; use this command to compute them for corpora that were indexed
+    before, or whose index was changed otherwise.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'corpus',
+            nargs='?',
+            help='''Corpus for which statistics should be computed. This should match
+                the "name" field in the database. If left out, statistics are computed
+                for all active corpora.'''
+        )
+
+    def handle(self, corpus=None, **options):
+        corpora = Corpus.objects.filter(name=corpus) if corpus else \
+            Corpus.objects.filter(active=True)
+
+        for corpus_obj in corpora:
+            statistics = update_corpus_statistics(corpus_obj)
+            self.stdout.write(
+                f'Updated statistics for {corpus_obj.name} '
+                f'({statistics.document_count} documents)'
+            )
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.28 on 2026-10-19 05:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('addcorpus', '0038_alter_corpusconfiguration_es_alias_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorpusStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('updated', models.DateTimeField(auto_now=True, help_text='time when the statistics were last computed')),
+                ('index_version', models.CharField(blank=True, help_text='version of the index from which the statistics were computed', max_length=64)),
+                ('document_count', models.IntegerField(default=0, help_text='number of documents in the corpus')),
+                ('geo', models.JSONField(blank=True, default=dict, help_text='centroid and bounding box of each geo field, by field name')),
+                ('date_ranges', models.JSONField(blank=True, default=dict, help_text='minimum and maximum value of each date field, by field name')),
+                ('value_counts', models.JSONField(blank=True, default=dict, help_text='most frequent values of each field with a multiple choice filter, by field name')),
+                ('corpus', models.OneToOneField(help_text='corpus to which the statistics apply', on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='addcorpus.corpus')),
+            ],
+            options={
+                'verbose_name_plural': 'corpus statistics',
+            },
+        ),
+    ]
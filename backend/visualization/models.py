@@ -0,0 +1,71 @@
+from typing import Dict, Optional
+from django.db import models
+
+from addcorpus.models import Corpus
+
+
+class CorpusStatistics(models.Model):
+    '''
+    Aggregations over all documents in a corpus, which do not depend on the query.
+
+    Statistics are computed after a corpus is indexed, so they do not have to be
+    aggregated from the index on every request.
+    '''
+
+    corpus = models.OneToOneField(
+        to=Corpus,
+        on_delete=models.CASCADE,
+        related_name='statistics',
+        help_text='corpus to which the statistics apply',
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+        help_text='time when the statistics were last computed',
+    )
+    index_version = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='version of the index from which the statistics were computed',
+    )
+    document_count = models.IntegerField(
+        default=0,
+        help_text='number of documents in the corpus',
+    )
+    geo = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='centroid and bounding box of each geo field, by field name',
+    )
+    date_ranges = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='minimum and maximum value of each date field, by field name',
+    )
+    value_counts = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='most frequent values of each field with a multiple choice filter, '
+            'by field name',
+    )
+
+    class Meta:
+        verbose_name_plural = 'corpus statistics'
+
+    def __str__(self):
+        return f'Statistics for {self.corpus}'
+
+    def geo_centroid(self, field_name: str) -> Optional[Dict]:
+        '''
+        The centroid of a geo field, in the format of a `geo_centroid` aggregation,
+        or `None` if it is not available.
+        '''
+        return self.geo.get(field_name, {}).get('centroid')
+
+    def year_histogram(self, field_name: str) -> Optional[Dict[int, int]]:
+        '''
+        The number of documents per year in a date field, or `None` if it is not
+        available.
+        '''
+        years = self.date_ranges.get(field_name, {}).get('years')
+        if years is not None:
+            return {int(year): count for year, count in years.items()}
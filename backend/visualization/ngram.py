@@ -1,13 +1,23 @@
 from collections import Counter
+import logging
 from typing import Tuple, Dict, List, Literal, Iterable
 from elasticsearch import Elasticsearch
 from itertools import chain
+from django.conf import settings
 
 from addcorpus.models import CorpusConfiguration
 from datetime import datetime
 from es.download import scroll
 from es.client import elasticsearch
-from visualization import query, termvectors
+from visualization import corpus_statistics, query, termvectors
+
+logger = logging.getLogger(__name__)
+
+MAX_NGRAMS_PER_BIN = 10000
+'''
+Default maximum number of ngrams included in the result for a time bin. Results of
+bins are passed between celery tasks, so rare ngrams are left out to keep them small.
+'''
 
 
 def get_ngrams(results, number_of_ngrams=10):
@@ -53,7 +63,10 @@ def get_time_bins(es_query, corpus):
     10 years (>100 yrs), 5 years (100-20 yrs) of 1 year (<20 yrs)."""
 
     min_date, max_date = get_total_time_interval(es_query, corpus)
-    min_year, max_year = min_date.year, max_date.year
+    return _year_bins(min_date.year, max_date.year)
+
+
+def _year_bins(min_year: int, max_year: int) -> List[Tuple[int, int]]:
     time_range = max_year - min_year
 
     if time_range < 1:
@@ -78,6 +91,41 @@ def get_time_bins(es_query, corpus):
     return bins
 
 
+def get_ngram_time_bins(es_query, corpus_name: str, date_field: str) -> List[Tuple[int, int]]:
+    '''
+    Time bins for the ngram graph, based on the years in which the corpus has
+    documents.
+
+    The range of the bins is limited to the years with documents (rather than the
+    configured range of the corpus), and bins without any documents are left out, so
+    no tasks are scheduled for them. If the document counts cannot be retrieved, this
+    falls back to `get_time_bins`.
+    '''
+    try:
+        histogram = corpus_statistics.year_histogram(corpus_name, date_field)
+    except Exception:
+        logger.warning('Could not retrieve year histogram', exc_info=True)
+        histogram = None
+
+    if not histogram:
+        return get_time_bins(es_query, corpus_name)
+
+    min_year, max_year = min(histogram), max(histogram)
+    query_min, query_max = query.get_date_range(es_query)
+    if query_min:
+        min_year = max(min_year, query_min.year)
+    if query_max:
+        max_year = min(max_year, query_max.year)
+    bins = [
+        (start, end) for start, end in _year_bins(min_year, max_year)
+        if any(year in histogram for year in range(start, end + 1))
+    ] if min_year <= max_year else []
+
+    # if the query does not cover any documents, return regular bins (with empty
+    # results) rather than no bins at all
+    return bins or get_time_bins(es_query, corpus_name)
+
+
 def tokens_by_time_interval(
     corpus_name: str,
     es_query: Dict,
@@ -130,15 +178,32 @@ def tokens_by_time_interval(
         bin_ngrams.update(tokens)
         ngram_ttfs.update(ttfs)
 
+    top_ngrams = _most_frequent_ngrams(
+        bin_ngrams, ngram_ttfs if freq_compensation else None,
+    )
     results = {
         'time_interval': format_time_label(bin[0], bin[1]),
-        'ngrams': bin_ngrams
+        'ngrams': {ngram: bin_ngrams[ngram] for ngram in top_ngrams},
     }
     if freq_compensation:
-        results['ngram_ttfs'] = ngram_ttfs
+        results['ngram_ttfs'] = {ngram: ngram_ttfs[ngram] for ngram in top_ngrams}
     return results
 
 
+def _most_frequent_ngrams(ngrams: Counter, ttfs: Dict | None = None) -> List[str]:
+    '''
+    The most frequent ngrams in a time bin, up to the maximum number per bin.
+
+    If total term frequencies are provided, frequencies are relative to the total term
+    frequency, as in `get_top_n_ngrams`.
+    '''
+    limit = getattr(settings, 'NGRAM_MAX_PER_BIN', MAX_NGRAMS_PER_BIN)
+    if ttfs is None:
+        return [ngram for ngram, _ in ngrams.most_common(limit)]
+    frequency = lambda ngram: ngrams[ngram] / max(1.0, ttfs[ngram])
+    return sorted(ngrams, key=frequency, reverse=True)[:limit]
+
+
 def _count_tokens_in_document(
     hit: Dict,
     client: Elasticsearch,
@@ -237,7 +302,7 @@ def get_top_n_ngrams(results, number_of_ngrams=10):
 
     Input:
     - `results`: a list of dictionaries with the following fields:
-    'ngram': Counter objects with ngram frequencies
+    'ngrams': dicts (or Counters) with ngram frequencies
     'time_interval': the time intervals for which the ngrams were counted
     (optional): 'ngram-ttf': averaged total term frequencies - only computed if freq_compensation was requested
     - `number_of_ngrams`: the number of top ngrams to return
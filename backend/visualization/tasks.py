@@ -1,47 +1,44 @@
-from typing import Dict
+from typing import Dict, List, Optional
 from celery import chord, group, shared_task
 from django.conf import settings
-from visualization import wordcloud, ngram, term_frequency
+from api import task_cache
+from visualization import wordcloud, ngram, term_frequency, geo
 from es import download as es_download, search as es_search
 from api.api_query import api_query_to_es_query
+from es.search import index_version
 
 @shared_task()
 def get_wordcloud_data(request_json):
     corpus_name = request_json['corpus']
     es_query = api_query_to_es_query(request_json, corpus_name)
-    list_of_texts, _ = es_download.scroll(corpus_name, es_query, settings.WORDCLOUD_LIMIT)
-    word_counts = wordcloud.make_wordcloud_data(list_of_texts, request_json['field'], request_json['corpus'])
+    documents, _ = es_download.scroll(
+        corpus_name, es_query, settings.WORDCLOUD_LIMIT, source=False
+    )
+    word_counts = wordcloud.make_wordcloud_data(documents, request_json['field'], request_json['corpus'])
     return word_counts
 
 
 @shared_task()
 def get_geo_data(request_json):
-    ''' Fetch all documents regardless of number of search results.
-    This should be fast enough for this operation.
+    '''
+    Fetch documents with a location as GeoJSON features, up to the limit for the map.
     '''
     corpus_name = request_json['corpus']
-    geo_field = request_json['field']
     es_query = api_query_to_es_query(request_json, corpus_name)
-    list_of_documents, _ = es_download.scroll(
-        corpus_name, es_query, source_includes=['id', geo_field])
-
-    # Convert documents to GeoJSON features
-    geojson_features = []
-    for doc in list_of_documents:
-        if doc['_source'][geo_field] is not None:
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": doc['_source'][geo_field]['coordinates']
-                },
-                "properties": {
-                    "id": doc['_source']['id']
-                }
-            }
-            geojson_features.append(feature)
+    return list(geo.geo_points(corpus_name, es_query, request_json['field']))
+
 
-    return geojson_features
+@shared_task()
+def get_geo_clusters(request_json):
+    '''
+    Count documents per map tile for a zoom level.
+    '''
+    corpus_name = request_json['corpus']
+    es_query = api_query_to_es_query(request_json, corpus_name)
+    return geo.geo_clusters(
+        corpus_name, es_query, request_json['field'], request_json['zoom'],
+        bounds=request_json.get('bounds'),
+    )
 
 
 @shared_task()
@@ -73,7 +70,7 @@ def ngram_data_tasks(request_json: Dict):
     corpus_name = request_json['corpus_name']
     es_query = api_query_to_es_query(request_json, corpus_name)
     freq_compensation = request_json['freq_compensation']
-    bins = ngram.get_time_bins(es_query, corpus_name)
+    bins = ngram.get_ngram_time_bins(es_query, corpus_name, request_json['date_field'])
     mode = request_json.get('mode', 'ngrams')
 
     return chord(group([
@@ -161,3 +158,73 @@ def timeline_term_frequency_tasks(request_json, include_query_in_result = False)
         )
         for bin in bins
     )
+
+
+def schedule_cached_group(
+    tasks: group, corpus_name: str, costs: Optional[List[float]] = None
+) -> List[str]:
+    '''
+    Schedule the tasks in a group, skipping tasks whose result is already cached.
+
+    If `costs` are provided, tasks are scheduled from cheapest to most expensive, so
+    the cheapest results are available first.
+
+    Returns the task IDs, in the order of the tasks in the group.
+    '''
+    version = index_version(corpus_name)
+    signatures = list(tasks.tasks)
+    order = range(len(signatures))
+    if costs:
+        order = sorted(order, key=lambda i: costs[i])
+
+    task_ids = [None] * len(signatures)
+    for i in order:
+        signature = signatures[i]
+        task_ids[i] = task_cache.schedule(
+            signature,
+            task_cache.result_key(
+                signature.task,
+                {'args': signature.args, 'kwargs': signature.kwargs},
+                version,
+            ),
+        )
+    return task_ids
+
+
+def term_frequency_costs(bins: List[Dict]) -> List[float]:
+    '''
+    Estimated cost of each bin in a term frequency request: the number of documents
+    that match the query in the bin (`doc_count`). For bins without a document count,
+    the number of documents for which matches are counted (`size`) is used instead;
+    bins without either come last.
+    '''
+    return [_term_frequency_cost(bin) for bin in bins]
+
+
+def _term_frequency_cost(bin: Dict) -> float:
+    for key in ['doc_count', 'size']:
+        if bin.get(key) is not None:
+            return bin[key]
+    return float('inf')
+
+
+def schedule_ngram_data(request_json: Dict) -> List[str]:
+    '''
+    Schedule the ngram tasks for a request, unless the result is already cached.
+
+    Returns the ID of the task that integrates the results, followed by the IDs of
+    the tasks for each bin.
+    '''
+    key = task_cache.corpus_result_key(
+        'ngram_data', request_json, request_json['corpus_name']
+    )
+    caching = task_cache.caching_enabled()
+    cached_id = task_cache.cached_task_id(key) if caching else None
+    if cached_id:
+        return [cached_id]
+
+    tasks = ngram_data_tasks(request_json)
+    if caching:
+        tasks.body.link(task_cache.store_task_result.s(key))
+    result = tasks.apply_async()
+    return [result.id, *(task.id for task in result.parent.children)]
@@ -0,0 +1,138 @@
+from addcorpus.models import Corpus, Field
+from api import task_cache
+from es import search as es_search
+from visualization import corpus_statistics, tasks
+from visualization.models import CorpusStatistics
+
+FIELDS = [
+    Field(name='location', es_mapping={'type': 'geo_point'}),
+    Field(name='date', es_mapping={'type': 'date'}),
+    Field(
+        name='genre', es_mapping={'type': 'keyword'},
+        search_filter={'name': 'MultipleChoiceFilter'},
+    ),
+    Field(name='content', es_mapping={'type': 'text'}),
+]
+
+AGGREGATIONS = {
+    'geo_centroid:location': {'location': {'lat': 52.1, 'lon': 5.1}, 'count': 3},
+    'geo_bounds:location': {
+        'bounds': {
+            'top_left': {'lat': 53.0, 'lon': 4.0},
+            'bottom_right': {'lat': 51.0, 'lon': 6.0},
+        }
+    },
+    'date_min:date': {'value': 0, 'value_as_string': '1800-01-01'},
+    'date_max:date': {'value': 1, 'value_as_string': '1899-12-31'},
+    'date_years:date': {
+        'buckets': [
+            {'key_as_string': '1800', 'doc_count': 3},
+            {'key_as_string': '1899', 'doc_count': 1},
+        ]
+    },
+    'values:genre': {'buckets': [{'key': 'Romance', 'doc_count': 2}]},
+}
+
+
+def test_statistics_aggregations():
+    aggs = corpus_statistics.statistics_aggregations(FIELDS)
+    assert set(aggs.keys()) == set(AGGREGATIONS.keys())
+
+
+def test_parse_statistics():
+    values = corpus_statistics.parse_statistics(FIELDS, AGGREGATIONS)
+    assert values['geo']['location']['centroid']['location'] == {'lat': 52.1, 'lon': 5.1}
+    assert values['geo']['location']['bounds']['top_left'] == {'lat': 53.0, 'lon': 4.0}
+    assert values['date_ranges'] == {
+        'date': {
+            'min': '1800-01-01',
+            'max': '1899-12-31',
+            'years': {'1800': 3, '1899': 1},
+        }
+    }
+    assert values['value_counts'] == {'genre': [{'key': 'Romance', 'doc_count': 2}]}
+
+
+def test_update_corpus_statistics(db, small_mock_corpus, monkeypatch):
+    requests = []
+
+    def search(corpus_name, query_model, **kwargs):
+        requests.append(query_model)
+        return {'hits': {'total': {'value': 10}, 'hits': []}}
+
+    monkeypatch.setattr(es_search, 'search', search)
+    monkeypatch.setattr(es_search, 'index_version', lambda corpus_name: 'v1')
+
+    corpus = Corpus.objects.get(name=small_mock_corpus)
+    statistics = corpus_statistics.update_corpus_statistics(corpus)
+
+    assert len(requests) == 1
+    assert statistics.document_count == 10
+    assert statistics.index_version == 'v1'
+    assert CorpusStatistics.objects.get(corpus=corpus) == statistics
+
+
+def test_stored_geo_centroid(admin_client, small_mock_corpus, monkeypatch):
+    monkeypatch.setattr(es_search, 'index_version', lambda corpus_name: 'v1')
+    centroid = AGGREGATIONS['geo_centroid:location']
+    CorpusStatistics.objects.create(
+        corpus=Corpus.objects.get(name=small_mock_corpus),
+        index_version='v1',
+        geo={'location': {'centroid': centroid}},
+    )
+
+    response = admin_client.post(
+        '/api/visualization/geo_centroid',
+        {'corpus': small_mock_corpus, 'field': 'location'},
+        content_type='application/json',
+    )
+    assert response.status_code == 200
+    assert response.data == centroid
+
+
+def test_outdated_geo_centroid(admin_client, small_mock_corpus, monkeypatch):
+    monkeypatch.setattr(es_search, 'index_version', lambda corpus_name: 'v2')
+    monkeypatch.setattr(task_cache, 'index_version', lambda corpus_name: 'v2')
+    current_centroid = {'location': {'lat': 48.9, 'lon': 2.4}, 'count': 5}
+    monkeypatch.setattr(tasks, 'get_geo_centroid', lambda request_json: current_centroid)
+    CorpusStatistics.objects.create(
+        corpus=Corpus.objects.get(name=small_mock_corpus),
+        index_version='v1',
+        geo={'location': {'centroid': AGGREGATIONS['geo_centroid:location']}},
+    )
+
+    response = admin_client.post(
+        '/api/visualization/geo_centroid',
+        {'corpus': small_mock_corpus, 'field': 'location'},
+        content_type='application/json',
+    )
+    assert response.status_code == 200
+    assert response.data == current_centroid
+
+
+def test_year_histogram(db, small_mock_corpus, monkeypatch):
+    requests = []
+
+    def search(corpus_name, query_model, **kwargs):
+        requests.append(query_model)
+        return {'aggregations': {'years': AGGREGATIONS['date_years:date']}}
+
+    monkeypatch.setattr(es_search, 'search', search)
+    monkeypatch.setattr(es_search, 'index_version', lambda corpus_name: 'v1')
+    monkeypatch.setattr(task_cache, 'index_version', lambda corpus_name: 'v1')
+    statistics = CorpusStatistics.objects.create(
+        corpus=Corpus.objects.get(name=small_mock_corpus),
+        index_version='v1',
+        date_ranges={'date': {'years': {'1850': 2}}},
+    )
+
+    # stored statistics are used while they are up to date
+    assert corpus_statistics.year_histogram(small_mock_corpus, 'date') == {1850: 2}
+    assert requests == []
+
+    # otherwise, the histogram is aggregated from the index
+    statistics.index_version = 'v0'
+    statistics.save()
+    expected = {1800: 3, 1899: 1}
+    assert corpus_statistics.year_histogram(small_mock_corpus, 'date') == expected
+    assert len(requests) == 1
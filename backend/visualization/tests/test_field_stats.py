@@ -1,3 +1,5 @@
+from es import search as es_search
+from visualization import field_stats
 from visualization.field_stats import count_field, count_total, report_coverage
 
 
@@ -20,3 +22,53 @@ def test_report(small_mock_corpus, es_client, index_small_mock_corpus, small_moc
         'content': 1.0,
         'genre': 1.0,
     }
+
+
+class MockIndices:
+    def __init__(self):
+        self.doc_count = 4
+
+    def stats(self, index, metric):
+        return {'indices': {index: {
+            'uuid': 'abc',
+            'primaries': {
+                'docs': {'count': self.doc_count, 'deleted': 0},
+                'indexing': {'index_total': self.doc_count, 'delete_total': 0},
+            },
+        }}}
+
+
+class MockClient:
+    def __init__(self):
+        self.indices = MockIndices()
+        self.searches = []
+
+    def search(self, index, **kwargs):
+        self.searches.append(kwargs)
+        filters = kwargs['aggs']['coverage']['filters']['filters']
+        return {
+            'hits': {'total': {'value': 4}},
+            'aggregations': {'coverage': {'buckets': {
+                name: {'doc_count': 2 if name == 'genre' else 4}
+                for name in filters
+            }}},
+        }
+
+
+def test_report_single_request(db, small_mock_corpus, monkeypatch):
+    client = MockClient()
+    monkeypatch.setattr(field_stats, 'elasticsearch', lambda corpus_name: client)
+    monkeypatch.setattr(es_search, 'elasticsearch', lambda corpus_name: client)
+
+    expected = {'date': 1.0, 'title': 1.0, 'content': 1.0, 'genre': 0.5}
+    assert report_coverage(small_mock_corpus) == expected
+    assert len(client.searches) == 1
+
+    # cached
+    assert report_coverage(small_mock_corpus) == expected
+    assert len(client.searches) == 1
+
+    # new index version
+    client.indices.doc_count = 5
+    report_coverage(small_mock_corpus)
+    assert len(client.searches) == 2
@@ -0,0 +1,71 @@
+import json
+import pytest
+
+from visualization import geo
+from visualization.query import MATCH_ALL
+
+
+def test_document_feature():
+    document = {
+        '_id': 'abc',
+        '_source': {
+            'id': 'doc1',
+            'location': {'type': 'Point', 'coordinates': [4.9, 52.4]},
+        },
+    }
+    assert geo.document_feature(document, 'location') == {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [4.9, 52.4]},
+        'properties': {'id': 'doc1'},
+    }
+
+    no_id = {'_id': 'abc', '_source': {'location': document['_source']['location']}}
+    assert geo.document_feature(no_id, 'location')['properties']['id'] == 'abc'
+
+    no_location = {'_id': 'abc', '_source': {'id': 'doc1', 'location': None}}
+    assert geo.document_feature(no_location, 'location') is None
+
+
+def test_cluster_feature():
+    bucket = {
+        'key': '6/32/21',
+        'doc_count': 12,
+        'centroid': {'location': {'lat': 52.4, 'lon': 4.9}, 'count': 12},
+    }
+    assert geo.cluster_feature(bucket) == {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [4.9, 52.4]},
+        'properties': {'tile': '6/32/21', 'count': 12},
+    }
+
+
+@pytest.mark.parametrize('body', [
+    {'mode': 'clusters'},
+    {'mode': 'clusters', 'zoom': 30},
+    {'mode': 'clusters', 'zoom': 'high'},
+    {'mode': 'heatmap'},
+])
+def test_map_view_validation(admin_client, small_mock_corpus, body):
+    response = admin_client.post(
+        '/api/visualization/geo',
+        {'corpus': small_mock_corpus, 'es_query': MATCH_ALL, 'field': 'location', **body},
+        content_type='application/json',
+    )
+    assert response.status_code == 400
+
+
+def test_points_json():
+    features = [{'type': 'Feature', 'properties': {'id': i}} for i in range(2)]
+    result = json.loads(''.join(geo.points_json(iter(features), 5, 2)))
+    assert result == {
+        'total': 5, 'limit': 2, 'truncated': True, 'features': features,
+    }
+
+    def failing_features():
+        yield features[0]
+        raise ConnectionError('lost connection to elasticsearch')
+
+    result = json.loads(''.join(geo.points_json(failing_features(), 1, 2)))
+    assert result['features'] == features[:1]
+    assert result['error'] == 'could not generate geo data'
+    assert not result['truncated']
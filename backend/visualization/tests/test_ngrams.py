@@ -1,5 +1,5 @@
 from typing import Counter
-from visualization import query, ngram
+from visualization import corpus_statistics, query, ngram
 from datetime import datetime, date
 import pytest
 
@@ -53,6 +53,25 @@ def test_time_bins(small_mock_corpus, basic_query):
     ]
     assert bins == target_bins
 
+def test_ngram_time_bins(small_mock_corpus, basic_query, monkeypatch):
+    histogram = {1800: 3, 1801: 1, 1850: 2, 1899: 1}
+    monkeypatch.setattr(corpus_statistics, 'year_histogram', lambda corpus, field: histogram)
+
+    # bins without documents are left out
+    bins = ngram.get_ngram_time_bins(basic_query, small_mock_corpus, 'date')
+    assert bins == [(1800, 1804), (1850, 1854), (1895, 1899)]
+
+    # the range is limited to the query
+    datefilter = query.make_date_filter(FILTER_MIN_DATE, FILTER_MAX_DATE)
+    query_with_date_filter = query.add_filter(basic_query, datefilter)
+    bins = ngram.get_ngram_time_bins(query_with_date_filter, small_mock_corpus, 'date')
+    assert bins == [(1850, 1850)]
+
+    # the range is limited to the years with documents
+    monkeypatch.setattr(corpus_statistics, 'year_histogram', lambda corpus, field: {1851: 1, 1853: 1})
+    bins = ngram.get_ngram_time_bins(basic_query, small_mock_corpus, 'date')
+    assert bins == [(1851, 1851), (1853, 1853)]
+
 def test_short_interval(small_mock_corpus, basic_query):
     start_date = datetime(year=1850, month=1, day=1)
     end_date = datetime(year=1850, month=12, day=31)
@@ -317,3 +336,12 @@ def test_freq_compensation(small_mock_corpus, index_small_mock_corpus, basic_que
     assert top_grams
 
 
+
+def test_max_ngrams_per_bin(settings):
+    settings.NGRAM_MAX_PER_BIN = 2
+    counts = Counter({'a b': 3, 'b c': 2, 'c d': 1})
+
+    assert ngram._most_frequent_ngrams(counts) == ['a b', 'b c']
+
+    ttfs = {'a b': 300, 'b c': 20, 'c d': 1}
+    assert ngram._most_frequent_ngrams(counts, ttfs) == ['c d', 'b c']
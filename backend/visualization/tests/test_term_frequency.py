@@ -223,3 +223,48 @@ def test_term_count_from_explain(small_mock_corpus, index_small_mock_corpus, que
     hit = hits(result)[0]
     count = term_frequency.count_matches_from_explanation(hit)
     assert count == expected_count
+
+
+def test_schedule_cheapest_bins_first(monkeypatch):
+    from visualization import tasks
+
+    scheduled = []
+    def schedule(signature, key):
+        scheduled.append(signature.args[3])
+        return f'task-{signature.args[3]}'
+
+    monkeypatch.setattr(tasks, 'index_version', lambda corpus_name: 'v1')
+    monkeypatch.setattr(tasks.task_cache, 'schedule', schedule)
+
+    bins = [
+        {'field_value': 'a', 'size': 100, 'doc_count': 500},
+        {'field_value': 'b', 'size': 100, 'doc_count': 20000},
+        {'field_value': 'c', 'size': 100, 'doc_count': 50},
+    ]
+    request_json = {
+        'corpus_name': 'mock-corpus',
+        'es_query': {'query': {'match_all': {}}},
+        'field_name': 'genre',
+        'bins': bins,
+    }
+    monkeypatch.setattr(tasks, 'api_query_to_es_query', lambda data, corpus: data['es_query'])
+
+    task_ids = tasks.schedule_cached_group(
+        tasks.histogram_term_frequency_tasks(request_json),
+        'mock-corpus',
+        costs=tasks.term_frequency_costs(bins),
+    )
+
+    assert scheduled == ['c', 'a', 'b']
+    assert task_ids == ['task-a', 'task-b', 'task-c']
+
+
+def test_term_frequency_costs():
+    from visualization import tasks
+
+    bins = [
+        {'field_value': 'a', 'size': 100, 'doc_count': 500},
+        {'field_value': 'b', 'size': 10},
+        {'field_value': 'c', 'size': None},
+    ]
+    assert tasks.term_frequency_costs(bins) == [500, 10, float('inf')]
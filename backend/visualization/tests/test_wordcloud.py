@@ -1,3 +1,5 @@
+from collections import Counter
+import re
 import visualization.wordcloud as wordcloud
 from es import search
 import pytest
@@ -98,10 +100,10 @@ def test_wordcloud_filtered(small_mock_corpus, es_client, index_small_mock_corpu
     for word in words_to_exclude:
         assert not occurs_in_results(word)
 
-def test_wordcloud_counts(small_mock_corpus):
+def test_wordcloud_counts():
     '''
     Each non-stopword only occurs once in the mock corpus data, so
-    this test uses some fake texts for counting.
+    this test uses some fake term vectors for counting.
     '''
 
     texts = [
@@ -110,13 +112,17 @@ def test_wordcloud_counts(small_mock_corpus):
         'Words, words, words...',
         'More words! More!',
         'That should be enough.',
+        'Nothing to see here',
     ]
-    docs = [
-        {'_source': {'content': text}}
+    term_vectors = [
+        {
+            term: {'term_freq': freq}
+            for term, freq in Counter(re.findall(r'\w+', text.lower())).items()
+        }
         for text in texts
     ]
 
-    results = wordcloud.make_wordcloud_data(docs, 'content', small_mock_corpus)
+    results = wordcloud.count_terms(term_vectors, stopwords=['that', 'should'])
 
     counts = {
         item['key']: item['doc_count']
@@ -124,6 +130,20 @@ def test_wordcloud_counts(small_mock_corpus):
     }
 
     assert counts['words'] == 5
+    assert counts['more'] == 3
+    assert 'that' not in counts # stopword
+    assert 'be' not in counts # too short
+    assert results[0]['key'] == 'words'
+
+def test_wordcloud_max_document_frequency():
+    term_vectors = [
+        {'common': {'term_freq': 1}, rare: {'term_freq': 1}}
+        for rare in ['alpha', 'beta', 'gamma', 'delta']
+    ]
+    results = wordcloud.count_terms(term_vectors, stopwords=[])
+    keys = [item['key'] for item in results]
+    assert 'common' not in keys
+    assert 'alpha' in keys
 
 def test_wordcloud_filters_stopwords(small_mock_corpus, small_mock_corpus_complete_wordcloud):
     stopwords = ['the', 'and', 'of']
@@ -131,3 +151,13 @@ def test_wordcloud_filters_stopwords(small_mock_corpus, small_mock_corpus_comple
         match = any(
             item['key'] == stopword for item in small_mock_corpus_complete_wordcloud)
         assert not match
+
+def test_field_stopwords(db, small_mock_corpus, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        stopwords = wordcloud.field_stopwords(small_mock_corpus, 'content')
+        assert isinstance(stopwords, frozenset)
+        assert 'the' in stopwords
+
+        # cached
+        assert wordcloud.field_stopwords(small_mock_corpus, 'content') is stopwords
+        assert wordcloud.field_stopwords(small_mock_corpus, 'genre') == frozenset()
@@ -1,14 +1,17 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import APIException, ParseError, ValidationError
-from visualization import tasks
+from visualization import tasks, geo, corpus_statistics
 import logging
+from django.http import StreamingHttpResponse
 from django.conf import settings
 from addcorpus.permissions import CanSearchCorpus
 from tag.permissions import CanSearchTags
 from visualization.field_stats import report_coverage
 from addcorpus.permissions import corpus_name_from_request
+from api import task_cache
 from api.utils import check_json_keys
+from api.api_query import api_query_to_es_query
 
 logger = logging.getLogger()
 
@@ -47,16 +50,48 @@ class WordcloudView(APIView):
 class MapView(APIView):
     '''
     Retrieve documents with geo_field coordinates.
+
+    In "points" mode (the default), matching documents are streamed as GeoJSON
+    features, up to a maximum number (see `geo.points_json`). In "clusters" mode, the
+    response contains the number of documents per map tile for the requested zoom
+    level, and the maximum number of points.
     '''
 
     permission_classes = [CanSearchCorpus]
 
     def post(self, request, *args, **kwargs):
         check_json_keys(request, ['corpus', 'es_query', 'field'])
+        mode = request.data.get('mode', 'points')
+
+        if mode == 'clusters':
+            zoom = request.data.get('zoom')
+            if not isinstance(zoom, int) or not 0 <= zoom <= geo.MAX_ZOOM:
+                raise ParseError(
+                    detail=f'zoom should be an integer between 0 and {geo.MAX_ZOOM}')
+            try:
+                clusters = tasks.get_geo_clusters(request.data)
+                return Response({
+                    'clusters': clusters,
+                    'points_limit': geo.points_limit(),
+                })
+            except Exception as e:
+                logger.error(e)
+                raise APIException(detail='could not generate geo data')
+
+        if mode != 'points':
+            raise ParseError(detail=f'unknown mode: {mode}')
+
         try:
-            # no need to run async: we will use the result directly
-            documents = tasks.get_geo_data(request.data)
-            return Response(documents)
+            corpus_name = request.data['corpus']
+            es_query = api_query_to_es_query(request.data, corpus_name)
+            limit = geo.points_limit()
+            features, total = geo.geo_points(
+                corpus_name, es_query, request.data['field'], limit
+            )
+            return StreamingHttpResponse(
+                geo.points_json(features, total, limit),
+                content_type='application/json',
+            )
         except Exception as e:
             logger.error(e)
             raise APIException(detail='could not generate geo data')
@@ -65,6 +100,8 @@ class MapView(APIView):
 class MapCentroidView(APIView):
     '''
     Retrieve the centroid of documents with a geo_field for a corpus.
+
+    Uses the centroid that was stored after indexing the corpus, if available.
     '''
 
     permission_classes = [CanSearchCorpus]
@@ -72,7 +109,15 @@ class MapCentroidView(APIView):
     def post(self, request, *args, **kwargs):
         check_json_keys(request, ['corpus', 'field'])
         try:
-            center = tasks.get_geo_centroid(request.data)
+            center = corpus_statistics.stored_geo_centroid(
+                request.data['corpus'], request.data['field']
+            )
+            if center:
+                return Response(center)
+            key = task_cache.corpus_result_key(
+                'geo_centroid', request.data, request.data['corpus']
+            )
+            center = task_cache.cached_call(key, tasks.get_geo_centroid, request.data)
             return Response(center)
         except Exception as e:
             logger.error(e)
@@ -94,9 +139,8 @@ class NgramView(APIView):
         ])
 
         try:
-            chord = tasks.ngram_data_tasks(request.data)()
-            subtasks = [chord, *chord.parent.children]
-            return Response({'task_ids': [task.id for task in subtasks]})
+            task_ids = tasks.schedule_ngram_data(request.data)
+            return Response({'task_ids': task_ids})
         except Exception as e:
             logger.error(e)
             raise APIException(detail='Could not set up ngram generation.')
@@ -125,10 +169,12 @@ class DateTermFrequencyView(APIView):
             raise ValidationError(detail='Maximum size exceeded')
 
         try:
-            group = tasks.timeline_term_frequency_tasks(
-                request.data).apply_async()
-            subtasks = group.children
-            return Response({'task_ids': [task.id for task in subtasks]})
+            task_ids = tasks.schedule_cached_group(
+                tasks.timeline_term_frequency_tasks(request.data),
+                request.data['corpus_name'],
+                costs=tasks.term_frequency_costs(bins),
+            )
+            return Response({'task_ids': task_ids})
         except Exception as e:
             logger.error(e)
             raise APIException('Could not set up term frequency generation.')
@@ -158,10 +204,12 @@ class AggregateTermFrequencyView(APIView):
             raise ValidationError(detail='Maximum size exceeded')
 
         try:
-            group = tasks.histogram_term_frequency_tasks(
-                request.data).apply_async()
-            subtasks = group.children
-            return Response({'task_ids': [task.id for task in subtasks]})
+            task_ids = tasks.schedule_cached_group(
+                tasks.histogram_term_frequency_tasks(request.data),
+                request.data['corpus_name'],
+                costs=tasks.term_frequency_costs(bins),
+            )
+            return Response({'task_ids': task_ids})
         except Exception as e:
             logger.error(e)
             raise APIException('Could not set up term frequency generation.')
@@ -1,36 +1,133 @@
 from collections import Counter
-from sklearn.feature_extraction.text import CountVectorizer
+import re
+from typing import Dict, FrozenSet, Iterable, List
+from django.core.cache import cache
 
-from addcorpus.models import Corpus
-from addcorpus.es_settings import get_nltk_stopwords
-from es import download as download
+from addcorpus.models import Field
+from addcorpus.es_settings import get_nltk_stopword_set
+from es.client import elasticsearch
 
-def field_stopwords(corpus_name, field_name):
-    corpus = Corpus.objects.get(name=corpus_name)
-    field = corpus.configuration.fields.get(name=field_name)
-    if field.language and field.language != 'dynamic':
+MAX_TERMS = 100
+'Number of terms included in the wordcloud'
+
+MAX_DOCUMENT_FREQUENCY = 0.7
+'Terms that occur in a larger proportion of documents are left out of the wordcloud'
+
+TERMVECTORS_BATCH_SIZE = 100
+'Number of documents per multi term vectors request'
+
+TOKEN_PATTERN = re.compile(r'[^0-9\s]{3,30}')
+'Terms must match this pattern to be included in the wordcloud'
+
+FIELD_LANGUAGES_CACHE_TIMEOUT = 10 * 60
+'Number of seconds for which the field languages of a corpus are cached'
+
+
+def field_stopwords(corpus_name, field_name) -> FrozenSet[str]:
+    language = field_languages(corpus_name).get(field_name)
+    if language and language != 'dynamic':
         try:
-            return get_nltk_stopwords(field.language)
+            return get_nltk_stopword_set(language)
         except:
-            return []
+            return frozenset()
     else:
-        return []
+        return frozenset()
+
+
+def field_languages(corpus_name) -> Dict[str, str]:
+    '''
+    The language of each field in a corpus. Results are cached.
+    '''
+    key = f'wordcloud:field_languages:{corpus_name}'
+    languages = cache.get(key)
+    if languages is None:
+        languages = dict(
+            Field.objects.filter(
+                corpus_configuration__corpus__name=corpus_name
+            ).values_list('name', 'language')
+        )
+        cache.set(key, languages, timeout=FIELD_LANGUAGES_CACHE_TIMEOUT)
+    return languages
 
-def make_wordcloud_data(documents, field, corpus):
-    texts = []
-    for document in documents:
-        content = document['_source'][field]
-        if isinstance(content, str) and len(content):
-            texts.append(content)
-        if isinstance(content, list) and len(content):
-            texts.append('\n'.join(content))
 
+def make_wordcloud_data(documents, field, corpus, client=None):
+    '''
+    Count the most frequent terms in a field for a list of search hits.
+
+    Term frequencies are read from the term vectors in the index, so the documents
+    do not need to include their `_source`.
+    '''
+    if not client:
+        client = elasticsearch(corpus)
+    term_vectors = _document_term_vectors(client, documents, field)
     stopwords = field_stopwords(corpus, field)
-    cv = CountVectorizer(max_features=100, max_df=0.7, token_pattern=r'(?u)\b[^0-9\s]{3,30}\b', stop_words=stopwords)
-    cvtexts = cv.fit_transform(texts)
-    counts = cvtexts.sum(axis=0).A1
-    words = list(cv.get_feature_names_out())
-    freq_distribution = Counter(dict(zip(words, counts)))
-    output = [{'key': word, 'doc_count': int(freq_distribution[word])} for word in words]
-    return output
+    return count_terms(term_vectors, stopwords)
+
+
+def count_terms(term_vectors: Iterable[Dict[str, Dict]], stopwords) -> List[Dict]:
+    '''
+    Count the most frequent terms, based on the term vectors of a field for each
+    document.
+
+    Terms are left out if they are stopwords, if they contain digits, if they are
+    shorter than 3 or longer than 30 characters, or if they occur in more than 70%
+    of the documents.
+
+    Returns a list of `{'key': term, 'doc_count': frequency}` dicts, sorted by
+    frequency.
+    '''
+    stopwords = frozenset(stopwords)
+    frequencies = Counter()
+    document_frequencies = Counter()
+    n_documents = 0
+
+    for terms in term_vectors:
+        n_documents += 1
+        for term, details in terms.items():
+            if term in stopwords or not TOKEN_PATTERN.fullmatch(term):
+                continue
+            frequencies[term] += details['term_freq']
+            document_frequencies[term] += 1
+
+    max_document_frequency = MAX_DOCUMENT_FREQUENCY * n_documents
+    counts = Counter({
+        term: frequency
+        for term, frequency in frequencies.items()
+        if document_frequencies[term] <= max_document_frequency
+    })
+    return [
+        {'key': term, 'doc_count': int(frequency)}
+        for term, frequency in counts.most_common(MAX_TERMS)
+    ]
+
+
+def _document_term_vectors(client, documents, field) -> Iterable[Dict[str, Dict]]:
+    '''
+    Fetch the term vectors of a field for a list of search hits, in batches.
+
+    Yields the terms of each document that contains the field.
+    '''
+    batch = []
+    for document in documents:
+        batch.append({'_index': document['_index'], '_id': document['_id']})
+        if len(batch) == TERMVECTORS_BATCH_SIZE:
+            yield from _term_vectors_batch(client, batch, field)
+            batch = []
+    if batch:
+        yield from _term_vectors_batch(client, batch, field)
+
 
+def _term_vectors_batch(client, docs, field) -> Iterable[Dict[str, Dict]]:
+    result = client.mtermvectors(
+        docs=docs,
+        fields=[field],
+        positions=False,
+        offsets=False,
+        payloads=False,
+        term_statistics=False,
+        field_statistics=False,
+    )
+    for doc in result['docs']:
+        term_vectors = doc.get('term_vectors', {})
+        if field in term_vectors:
+            yield term_vectors[field]['terms']
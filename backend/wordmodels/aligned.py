@@ -0,0 +1,196 @@
+'''
+Aligned storage of the diachronic word models of a corpus.
+
+The models of all time bins are stored with a shared vocabulary, so a term has the
+same index in every time bin. Queries across all time bins can then be answered with
+a single array operation. Aligned models are created with the `align_word_models`
+command, and stored in the word model directory of the corpus.
+'''
+
+from os.path import exists, join
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+VECTORS_FILE = 'aligned_vectors.npy'
+METADATA_FILE = 'aligned_metadata.npz'
+
+
+class AlignedModels:
+    '''
+    Word models for a series of time bins, aligned on a shared vocabulary.
+
+    Attributes:
+    - `terms`: the shared vocabulary
+    - `vectors`: array of unit-normalised vectors (time bins × vocabulary × dimensions).
+    Vectors of terms that are not in the model of a time bin are zero.
+    - `present`: boolean array (time bins × vocabulary) that marks which terms are in
+    the model of each time bin
+    - `start_years`, `end_years`: the time bins
+    - `sources`: array (time bins × 2) with the modification time (in nanoseconds)
+    and size of the model file of each time bin, when the models were aligned
+    '''
+
+    def __init__(
+        self, terms: np.ndarray, vectors: np.ndarray, present: np.ndarray,
+        start_years: np.ndarray, end_years: np.ndarray, sources: np.ndarray,
+    ):
+        self.terms = terms
+        self.vectors = vectors
+        self.present = present
+        self.start_years = start_years
+        self.end_years = end_years
+        self.sources = sources
+        self.key_to_index: Dict[str, int] = {
+            str(term): i for i, term in enumerate(terms)
+        }
+
+
+    def matches(self, models: List[Dict]) -> bool:
+        '''
+        Whether the aligned models were created from a list of word models: they
+        should have the same time bins, and the model files should not have changed
+        since they were aligned.
+        '''
+        return (
+            [int(year) for year in self.start_years] == [wm['start_year'] for wm in models]
+            and [int(year) for year in self.end_years] == [wm['end_year'] for wm in models]
+            and [tuple(int(value) for value in source) for source in self.sources]
+                == [wm['file_signature'] for wm in models]
+        )
+
+
+    def similarity_over_time(self, term1: str, term2: str) -> List[Optional[float]]:
+        '''
+        The similarity between two terms in each time bin; `None` for time bins where
+        either term is not in the model.
+        '''
+        return [row[0] for row in self.similarities_over_time(term1, [term2])]
+
+
+    def similarities_over_time(
+        self, term: str, comparison_terms: List[str]
+    ) -> List[List[Optional[float]]]:
+        '''
+        The similarity between a term and each of a list of comparison terms, in each
+        time bin.
+
+        Returns a list with the similarities for each time bin. It contains `None` for
+        terms that are not in the model of the time bin.
+        '''
+        if term not in self.key_to_index:
+            return [[None for _ in comparison_terms] for _ in self.vectors]
+        i = self.key_to_index[term]
+        indices = [self.key_to_index.get(t) for t in comparison_terms]
+        known = [j for j in indices if j is not None]
+        similarities = np.einsum('scd,sd->sc', self.vectors[:, known], self.vectors[:, i])
+        present = self.present[:, known] & self.present[:, [i]]
+
+        result = []
+        for row, row_present in zip(similarities, present):
+            values = iter(
+                float(similarity) if is_present else None
+                for similarity, is_present in zip(row, row_present)
+            )
+            result.append([
+                next(values) if j is not None else None for j in indices
+            ])
+        return result
+
+
+    def most_similar_over_time(self, term: str, n: int) -> List[List[Tuple[str, float]]]:
+        '''
+        The n most similar terms to a term in each time bin, as (term, similarity)
+        tuples. The result for a time bin is empty if the term is not in its model.
+        '''
+        if term not in self.key_to_index:
+            return [[] for _ in self.vectors]
+        i = self.key_to_index[term]
+        similarities = np.einsum('svd,sd->sv', self.vectors, self.vectors[:, i])
+        similarities[~self.present] = -np.inf
+        similarities[:, i] = -np.inf
+
+        n = min(n, similarities.shape[1] - 1)
+        if n < 1:
+            return [[] for _ in self.vectors]
+        top = np.argpartition(-similarities, n - 1, axis=1)[:, :n]
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_similarities = np.take_along_axis(top_similarities, order, axis=1)
+
+        return [
+            [
+                (str(self.terms[j]), float(similarity))
+                for j, similarity in zip(indices, row)
+                if np.isfinite(similarity)
+            ] if self.present[s, i] else []
+            for s, (indices, row) in enumerate(zip(top, top_similarities))
+        ]
+
+
+    @classmethod
+    def convert(cls, models: List[Dict], directory: str):
+        '''
+        Convert the word models of a corpus to aligned storage, and save the result
+        in a directory.
+
+        Vectors are written to a memory-mapped file, so the models do not have to fit
+        in memory at once.
+        '''
+        dimensions = {wm['vectors'].vector_size for wm in models}
+        if len(dimensions) > 1:
+            raise ValueError('Word models have different numbers of dimensions')
+
+        terms = sorted(set(
+            term for wm in models for term in wm['vectors'].index_to_key
+        ))
+        positions = {term: i for i, term in enumerate(terms)}
+        shape = (len(models), len(terms), dimensions.pop() if dimensions else 0)
+        vectors = np.lib.format.open_memmap(
+            join(directory, VECTORS_FILE), mode='w+', dtype=np.float32, shape=shape,
+        )
+        present = np.zeros(shape[:2], dtype=bool)
+
+        for s, wm in enumerate(models):
+            keyed_vectors = wm['vectors']
+            indices = np.array(
+                [positions[term] for term in keyed_vectors.index_to_key], dtype=np.intp
+            )
+            vectors[s, indices] = keyed_vectors.get_normed_vectors()
+            present[s, indices] = True
+        vectors.flush()
+
+        with open(join(directory, METADATA_FILE), 'wb') as f:
+            np.savez(
+                f,
+                terms=np.array(terms, dtype=str),
+                present=present,
+                start_years=np.array([wm['start_year'] for wm in models]),
+                end_years=np.array([wm['end_year'] for wm in models]),
+                sources=np.array(
+                    [wm['file_signature'] for wm in models], dtype=np.int64
+                ).reshape(len(models), 2),
+            )
+        return cls.load(directory)
+
+
+    @classmethod
+    def load(cls, directory: str):
+        '''
+        Load aligned models from a directory. Vectors are memory-mapped.
+        '''
+        vectors = np.load(join(directory, VECTORS_FILE), mmap_mode='r')
+        with np.load(join(directory, METADATA_FILE)) as data:
+            # metadata without sources cannot be matched to the models
+            sources = (
+                data['sources'] if 'sources' in data.files
+                else np.zeros((0, 2), dtype=np.int64)
+            )
+            return cls(
+                data['terms'], vectors, data['present'],
+                data['start_years'], data['end_years'], sources,
+            )
+
+
+def has_aligned_models(directory: str) -> bool:
+    return exists(join(directory, VECTORS_FILE)) and exists(join(directory, METADATA_FILE))
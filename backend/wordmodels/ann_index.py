@@ -0,0 +1,139 @@
+'''
+Approximate nearest neighbour search for word models.
+
+Indices are built offline with the `build_wordmodel_index` command, and stored next to
+the `.wv` file of each model.
+'''
+
+import logging
+import math
+from os.path import exists, getmtime, splitext
+from typing import List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger()
+
+INDEX_EXTENSION = '.ivf.npz'
+KMEANS_ITERATIONS = 20
+BATCH_SIZE = 10000
+
+
+def index_path(wm_file: str) -> str:
+    '''Path of the index file for a word model file'''
+    return splitext(wm_file)[0] + INDEX_EXTENSION
+
+
+class IVFIndex:
+    '''
+    Inverted file index for cosine similarity search.
+
+    Vectors are clustered with spherical k-means. A query is only compared to the
+    vectors in the `n_probe` clusters whose centroids are most similar to it. Probing
+    more clusters is slower, but gives results closer to exact search.
+    '''
+
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def default_probes(self) -> int:
+        return max(1, math.ceil(self.n_clusters / 10))
+
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_clusters: Optional[int] = None, seed: int = 0):
+        '''
+        Build an index for a matrix of unit-normalised vectors.
+
+        By default, the number of clusters is the square root of the vocabulary size.
+        '''
+        n_clusters = min(n_clusters or round(math.sqrt(len(vectors))), len(vectors))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)]
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = _assign_clusters(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = ~np.any(sums, axis=1)
+            sums[empty] = vectors[rng.choice(len(vectors), empty.sum(), replace=False)]
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+        assignments = _assign_clusters(vectors, centroids)
+        order = np.argsort(assignments, kind='stable').astype(np.int32)
+        offsets = np.searchsorted(assignments[order], np.arange(n_clusters + 1))
+        return cls(centroids.astype(np.float32), order, offsets.astype(np.int64))
+
+
+    def search(
+        self, vectors: np.ndarray, norms: np.ndarray, query: np.ndarray, n: int,
+        n_probe: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        '''
+        Find the (approximate) n most similar vectors to a unit-normalised query.
+
+        Parameters:
+        - `vectors`: the vectors that were used to build the index
+        - `norms`: the norms of the vectors
+        - `query`: the query vector
+        - `n`: the number of results
+        - `n_probe`: the number of clusters to search
+
+        Returns a list of (vector index, similarity) tuples, sorted by similarity.
+        '''
+        n_probe = min(n_probe or self.default_probes, self.n_clusters)
+        clusters = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        candidates = np.concatenate([
+            self.order[self.offsets[c]:self.offsets[c + 1]] for c in clusters
+        ])
+        similarities = (vectors[candidates] @ query) / norms[candidates]
+        n = min(n, len(candidates))
+        if not n:
+            return []
+        top = np.argpartition(-similarities, n - 1)[:n]
+        top = top[np.argsort(-similarities[top])]
+        return [(int(candidates[i]), float(similarities[i])) for i in top]
+
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            np.savez(f, centroids=self.centroids, order=self.order, offsets=self.offsets)
+
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls(data['centroids'], data['order'], data['offsets'])
+
+
+def load_index(wm_file: str, n_vectors: int) -> Optional[IVFIndex]:
+    '''
+    Load the index for a word model file, if it exists and matches the model.
+
+    An index that is older than the model file, or that was built for a different
+    number of vectors, is ignored, so related words are found with exact search.
+    '''
+    path = index_path(wm_file)
+    if not exists(path):
+        return None
+    if getmtime(path) < getmtime(wm_file):
+        logger.warning(f'Ignoring index {path}: it is older than the word model')
+        return None
+    index = IVFIndex.load(path)
+    if len(index.order) != n_vectors:
+        logger.warning(f'Ignoring index {path}: it does not match the word model')
+        return None
+    return index
+
+
+def _assign_clusters(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[start:start + BATCH_SIZE] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), BATCH_SIZE)
+    ])
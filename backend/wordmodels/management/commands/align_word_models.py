@@ -0,0 +1,31 @@
+from django.core.management import BaseCommand
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from wordmodels.aligned import AlignedModels
+from wordmodels.utils import load_word_models
+
+
+class Command(BaseCommand):
+    help = '''
+    Convert the word models of a corpus to aligned storage: the models of all time bins
+    are stored in a single array with a shared vocabulary. The result is saved in the
+    word model directory of the corpus, and used to compare terms across time bins.
+    Aligned models should be recreated when the models are changed.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'corpus',
+            help='''Corpus for which word models should be aligned. This should match
+                the name in settings.py'''
+        )
+
+    def handle(self, corpus, **options):
+        corpus_definition = load_corpus_definition(corpus)
+        models = load_word_models(corpus_definition)
+        aligned = AlignedModels.convert(models, corpus_definition.word_model_path)
+        self.stdout.write(
+            'Aligned {} word models with a vocabulary of {} terms'.format(
+                len(aligned.vectors), len(aligned.terms)
+            )
+        )
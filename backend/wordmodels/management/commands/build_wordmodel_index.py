@@ -0,0 +1,39 @@
+from glob import glob
+from django.core.management import BaseCommand
+from gensim.models import KeyedVectors
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from wordmodels.ann_index import IVFIndex, index_path
+
+
+class Command(BaseCommand):
+    help = '''
+    Build approximate nearest neighbour indices for the word models of a corpus. The
+    index for each model is saved next to its .wv file, and used to find related words.
+    Indices should be rebuilt when the models are changed.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'corpus',
+            help='''Corpus for which the indices should be built. This should match
+                the name in settings.py'''
+        )
+
+        parser.add_argument(
+            '--clusters', '-c',
+            type=int,
+            help='''Number of clusters in each index. Defaults to the square root of
+                the vocabulary size of the model.'''
+        )
+
+    def handle(self, corpus, clusters=None, **options):
+        corpus_definition = load_corpus_definition(corpus)
+        wv_list = sorted(glob('{}/*.wv'.format(corpus_definition.word_model_path)))
+
+        for wm_file in wv_list:
+            vectors = KeyedVectors.load(wm_file)
+            index = IVFIndex.build(vectors.get_normed_vectors(), clusters)
+            path = index_path(wm_file)
+            index.save(path)
+            self.stdout.write(f'Saved index with {index.n_clusters} clusters to {path}')
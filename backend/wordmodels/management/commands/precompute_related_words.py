@@ -0,0 +1,52 @@
+from glob import glob
+from django.core.management import BaseCommand
+from gensim.models import KeyedVectors
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from wordmodels.neighbours_table import NeighboursTable, table_path
+
+
+class Command(BaseCommand):
+    help = '''
+    Precompute the nearest neighbours of the most frequent terms in the word models of
+    a corpus. The table for each model is saved next to its .wv file, and used to find
+    related words for these terms. Tables should be recomputed when the models are
+    changed.
+    '''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'corpus',
+            help='''Corpus for which related words should be computed. This should
+                match the name in settings.py'''
+        )
+
+        parser.add_argument(
+            '--terms', '-t',
+            type=int,
+            default=10000,
+            help='''Number of terms for which to compute neighbours. Terms are
+                selected by frequency. Default: 10000'''
+        )
+
+        parser.add_argument(
+            '--neighbours', '-n',
+            type=int,
+            default=50,
+            help='''Number of neighbours to store for each term. Requests for more
+                neighbours are computed on the fly. Default: 50'''
+        )
+
+    def handle(self, corpus, terms=10000, neighbours=50, **options):
+        if terms < 1 or neighbours < 1:
+            raise ValueError('--terms and --neighbours should be at least 1')
+
+        corpus_definition = load_corpus_definition(corpus)
+        wv_list = sorted(glob('{}/*.wv'.format(corpus_definition.word_model_path)))
+
+        for wm_file in wv_list:
+            vectors = KeyedVectors.load(wm_file)
+            table = NeighboursTable.compute(vectors, terms, neighbours)
+            path = table_path(wm_file)
+            table.save(path)
+            self.stdout.write(f'Saved neighbours of {len(table.terms)} terms to {path}')
@@ -1,10 +1,16 @@
-from itertools import chain, combinations
+from itertools import chain
+import numpy as np
 
 from addcorpus.python_corpora.load_corpus import load_corpus_definition
 from wordmodels.utils import load_word_models, word_in_model, time_label, time_labels, transform_query
-from wordmodels.similarity import find_n_most_similar, term_similarity
+from wordmodels.similarity import find_n_most_similar, normalized_vectors
 
-def neighbor_network_data(corpus_name: str, query: str):
+NUMBER_NEIGHBOURS = 10
+
+MAX_NEIGHBOURS = 50
+'Maximum number of neighbours in a request, which limits the size of the similarity matrix'
+
+def neighbor_network_data(corpus_name: str, query: str, neighbours: int = NUMBER_NEIGHBOURS):
     term = transform_query(query)
     corpus = load_corpus_definition(corpus_name)
     wm_list = load_word_models(corpus)
@@ -12,7 +18,7 @@ def neighbor_network_data(corpus_name: str, query: str):
     times = time_labels(wm_list, sort=True)
 
     data_per_timeframe = (
-        graph_data_for_timeframe(wm, term)
+        graph_data_for_timeframe(wm, term, neighbours)
         for wm in wm_list
     )
 
@@ -26,18 +32,18 @@ def neighbor_network_data(corpus_name: str, query: str):
     }
 
 
-def graph_data_for_timeframe(wm, term: str):
-    nodes = _graph_nodes(wm, term)
+def graph_data_for_timeframe(wm, term: str, neighbours: int = NUMBER_NEIGHBOURS):
+    nodes = _graph_nodes(wm, term, neighbours)
     links = _graph_links(wm, nodes)
 
     return nodes, links
 
 
-def _graph_nodes(wm, term):
+def _graph_nodes(wm, term, neighbours):
     if not word_in_model(term, wm):
         return []
 
-    neighbours = find_n_most_similar(wm, term, 10)
+    neighbours = find_n_most_similar(wm, term, neighbours)
     query_node = {
         'term': term,
         'index': 0,
@@ -60,6 +66,13 @@ def _graph_nodes(wm, term):
 
 
 def _graph_links(wm, nodes):
+    '''
+    Links between all pairs of nodes with a similarity above the threshold.
+
+    The similarity matrix for all nodes is computed in a single matrix product.
+    '''
+    vocab = wm['vectors'].key_to_index
+    nodes = [node for node in nodes if node['term'] in vocab]
     if not len(nodes):
         return []
 
@@ -67,23 +80,20 @@ def _graph_links(wm, nodes):
         node['similarity'] for node in nodes
     )
 
-    links = []
+    vectors = normalized_vectors(wm['vectors'], [vocab[node['term']] for node in nodes])
+    similarities = vectors @ vectors.T
+    rows, columns = np.triu_indices(len(nodes), k=1)
+    linked = similarities[rows, columns] >= threshold
 
-    for n1, n2 in combinations(nodes, 2):
-        i1 = n1['index']
-        i2 = n2['index']
-        term1 = n1['term']
-        term2 = n2['term']
-        similarity = term_similarity(wm, term1, term2)
-        if similarity and similarity >= threshold:
-            links.append({
-                'source': i1,
-                'target': i2,
-                'value': similarity,
-                'timeframe': time_label(wm),
-            })
-
-    return links
+    return [
+        {
+            'source': nodes[i1]['index'],
+            'target': nodes[i2]['index'],
+            'value': float(similarities[i1, i2]),
+            'timeframe': time_label(wm),
+        }
+        for i1, i2 in zip(rows[linked], columns[linked])
+    ]
 
 
 def _graph_vega_doc(timeframes, nodes, links):
@@ -270,13 +280,16 @@ def _graph_vega_doc(timeframes, nodes, links):
     }
 
 def _graph_table_data(nodes, links):
-    find_term = lambda i: next(node for node in nodes if node['index'] == i)['term']
+    terms = {
+        (node['timeframe'], node['index']): node['term']
+        for node in nodes
+    }
 
     return [
         {
             'timeframe': link['timeframe'],
-            'term1': find_term(link['source']),
-            'term2': find_term(link['target']),
+            'term1': terms[(link['timeframe'], link['source'])],
+            'term2': terms[(link['timeframe'], link['target'])],
             'similarity': round(link['value'], 4),
         }
         for link in links
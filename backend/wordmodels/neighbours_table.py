@@ -0,0 +1,135 @@
+'''
+Precomputed nearest neighbours for word models.
+
+Tables are computed offline with the `precompute_related_words` command, and stored
+next to the `.wv` file of each model.
+'''
+
+import logging
+from os.path import exists, getmtime, splitext
+from typing import List, Optional, Tuple
+import numpy as np
+from gensim.models import KeyedVectors
+
+logger = logging.getLogger()
+
+TABLE_EXTENSION = '.neighbours.npz'
+BATCH_SIZE = 500
+
+
+def table_path(wm_file: str) -> str:
+    '''Path of the neighbours table for a word model file'''
+    return splitext(wm_file)[0] + TABLE_EXTENSION
+
+
+class NeighboursTable:
+    '''
+    The nearest neighbours of the most frequent terms in a word model.
+
+    Terms and neighbours are stored as indices in the vocabulary of the model. Each
+    row contains the neighbours of one term, sorted by similarity.
+    '''
+
+    def __init__(self, terms: np.ndarray, neighbours: np.ndarray, similarities: np.ndarray):
+        self.terms = terms
+        self.neighbours = neighbours
+        self.similarities = similarities
+        self._rows = {int(term): row for row, term in enumerate(terms)}
+
+    @property
+    def size(self) -> int:
+        '''Number of neighbours stored for each term'''
+        return self.neighbours.shape[1]
+
+
+    def max_index(self) -> int:
+        '''The highest vocabulary index in the table, or -1 if it is empty'''
+        return int(max(
+            self.terms.max(initial=-1), self.neighbours.max(initial=-1)
+        ))
+
+
+    def lookup(self, term_index: int, n: int) -> Optional[List[Tuple[int, float]]]:
+        '''
+        The n nearest neighbours of a term, as (vocabulary index, similarity) tuples.
+
+        Returns `None` if the term is not in the table, or if the table does not store
+        enough neighbours.
+        '''
+        row = self._rows.get(term_index)
+        if row is None or n > self.size:
+            return None
+        return [
+            (int(neighbour), float(similarity))
+            for neighbour, similarity in zip(
+                self.neighbours[row, :n], self.similarities[row, :n]
+            )
+        ]
+
+
+    @classmethod
+    def compute(cls, vectors: KeyedVectors, n_terms: int, n_neighbours: int):
+        '''
+        Compute the nearest neighbours for the first `n_terms` terms in the vocabulary.
+
+        Gensim sorts the vocabulary by frequency, so these are the most frequent terms.
+        The number of neighbours is limited to the size of the vocabulary.
+        '''
+        if n_terms < 1 or n_neighbours < 1:
+            raise ValueError('The number of terms and neighbours should be at least 1')
+        normed = vectors.get_normed_vectors()
+        if len(normed) < 2:
+            raise ValueError('Cannot compute neighbours for a vocabulary of one term')
+        terms = np.arange(min(n_terms, len(normed)), dtype=np.int32)
+        n_neighbours = min(n_neighbours, len(normed) - 1)
+        neighbours = np.zeros((len(terms), n_neighbours), dtype=np.int32)
+        similarities = np.zeros((len(terms), n_neighbours), dtype=np.float32)
+
+        for start in range(0, len(terms), BATCH_SIZE):
+            batch = terms[start:start + BATCH_SIZE]
+            batch_similarities = normed[batch] @ normed.T
+            batch_similarities[np.arange(len(batch)), batch] = -np.inf
+            top = np.argpartition(-batch_similarities, n_neighbours - 1, axis=1)[:, :n_neighbours]
+            top_similarities = np.take_along_axis(batch_similarities, top, axis=1)
+            order = np.argsort(-top_similarities, axis=1)
+            neighbours[batch] = np.take_along_axis(top, order, axis=1)
+            similarities[batch] = np.take_along_axis(top_similarities, order, axis=1)
+
+        return cls(terms, neighbours, similarities)
+
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                terms=self.terms,
+                neighbours=self.neighbours,
+                similarities=self.similarities,
+            )
+
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls(data['terms'], data['neighbours'], data['similarities'])
+
+
+def load_neighbours_table(wm_file: str, n_vectors: int) -> Optional[NeighboursTable]:
+    '''
+    Load the neighbours table for a word model file, if it exists and matches the
+    model.
+
+    A table that is older than the model file, or that refers to terms outside the
+    vocabulary of the model, is ignored.
+    '''
+    path = table_path(wm_file)
+    if not exists(path):
+        return None
+    if getmtime(path) < getmtime(wm_file):
+        logger.warning(f'Ignoring neighbours table {path}: it is older than the word model')
+        return None
+    table = NeighboursTable.load(path)
+    if table.max_index() >= n_vectors:
+        logger.warning(f'Ignoring neighbours table {path}: it does not match the word model')
+        return None
+    return table
@@ -1,24 +1,69 @@
+from typing import List, Optional
 import numpy as np
+from django.conf import settings
 
+from wordmodels.ann_index import IVFIndex
 from wordmodels.utils import transform_query
 
 def term_similarity(wm, term1, term2):
     vectors = wm['vectors']
     transformed1 = transform_query(term1)
     transformed2 = transform_query(term2)
-    vocab = vectors.index_to_key
+    vocab = vectors.key_to_index
     if transformed1 in vocab and transformed2 in vocab:
         similarity = vectors.similarity(transformed1, transformed2)
         return float(similarity)
 
-def find_n_most_similar(wm, query_term, n):
+def term_similarities(wm, term, comparison_terms) -> List[Optional[float]]:
+    '''
+    Compute the similarity between a term and each of a list of comparison terms.
+
+    Similarities are computed in a single matrix operation. The result contains `None`
+    for comparison terms that are not in the model.
+    '''
+    vectors = wm['vectors']
+    vocab = vectors.key_to_index
+    transformed = transform_query(term)
+    if transformed not in vocab:
+        return [None for _ in comparison_terms]
+
+    keys = [transform_query(t) for t in comparison_terms]
+    indices = [vocab[key] for key in keys if key in vocab]
+    similarities = iter(
+        normalized_vectors(vectors, indices) @ vectors.get_vector(transformed, norm=True)
+    )
+    return [
+        float(next(similarities)) if key in vocab else None
+        for key in keys
+    ]
+
+def normalized_vectors(vectors, indices: List[int]) -> np.ndarray:
+    '''
+    Matrix of unit-normalized vectors for the given vocabulary indices.
+    '''
+    vectors.fill_norms()
+    return vectors.vectors[indices] / vectors.norms[indices, np.newaxis]
+
+def find_n_most_similar(wm, query_term, n, exact=False):
     """given vectors of svd_ppmi or word2vec values
     with its vocabulary and analyzer,
     determine which n terms match the given query term best
+
+    Results are taken from the precomputed neighbours table of the model, if it
+    includes the term. Otherwise, if the model has an approximate nearest neighbour
+    index, it is used unless `exact` is true.
     """
     transformed_query = transform_query(query_term)
     vectors = wm['vectors']
-    results = most_similar_items(vectors, transformed_query, n)
+    if precomputed := precomputed_most_similar_items(wm, transformed_query, n):
+        results = precomputed
+    elif wm.get('index') and not exact:
+        results = approximate_most_similar_items(
+            vectors, wm['index'], transformed_query, n,
+            n_probe=getattr(settings, 'WORDMODELS_ANN_PROBES', None),
+        )
+    else:
+        results = most_similar_items(vectors, transformed_query, n)
     return [{
         'key': result[0],
         'similarity': result[1]
@@ -33,8 +78,46 @@ def most_similar_items(vectors, term, n):
     - `term`: the term for which to find the nearest neighbours, transformed with `transform_query`
     - `n`: number of neighbours to return
     '''
-    vocab = vectors.index_to_key
-    if term in vocab:
+    if term in vectors.key_to_index:
         results = vectors.most_similar(term, topn=n)
         return results
     return []
+
+def precomputed_most_similar_items(wm, term, n):
+    '''
+    Look up the n most similar terms in the precomputed neighbours table of a model.
+
+    Returns `None` if the model has no table, or if the table does not include the
+    term.
+    '''
+    vectors = wm['vectors']
+    table = wm.get('neighbours')
+    if table and term in vectors.key_to_index:
+        results = table.lookup(vectors.key_to_index[term], n)
+        if results is not None:
+            return [(vectors.index_to_key[i], similarity) for i, similarity in results]
+
+def approximate_most_similar_items(vectors, index: IVFIndex, term, n, n_probe=None):
+    '''
+    Find the (approximate) n most similar terms in a keyed vectors matrix, using an
+    approximate nearest neighbour index.
+
+    parameters:
+    - `vectors`: the KeyedVectors
+    - `index`: the IVFIndex for the vectors
+    - `term`: the term for which to find the nearest neighbours, transformed with `transform_query`
+    - `n`: number of neighbours to return
+    - `n_probe`: number of clusters to search in the index; uses the default of the
+    index if omitted
+    '''
+    if term not in vectors.key_to_index:
+        return []
+    vectors.fill_norms()
+    term_index = vectors.key_to_index[term]
+    query = vectors.get_vector(term, norm=True)
+    results = index.search(vectors.vectors, vectors.norms, query, n + 1, n_probe)
+    return [
+        (vectors.index_to_key[i], similarity)
+        for i, similarity in results
+        if i != term_index
+    ][:n]
@@ -0,0 +1,42 @@
+from celery import shared_task
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from api import task_cache
+from wordmodels import neighbor_network, utils, visualisations
+
+
+@shared_task()
+def get_related_words(query_term, corpus_name, neighbours):
+    word_data, times, data_per_timeframe = visualisations.get_diachronic_contexts(
+        query_term, corpus_name, number_similar=neighbours,
+    )
+    return {
+        'similarities_over_time': word_data,
+        'similarities_over_time_local_top_n': data_per_timeframe,
+        'time_points': times,
+    }
+
+
+@shared_task()
+def get_neighbor_network(query_term, corpus_name, neighbours):
+    return neighbor_network.neighbor_network_data(corpus_name, query_term, neighbours)
+
+
+@shared_task()
+def get_similarity_over_time(term_1, term_2, corpus_name):
+    return visualisations.get_similarity_over_time(term_1, term_2, corpus_name)
+
+
+def schedule_task(task, **kwargs) -> str:
+    '''
+    Schedule a word model task, and return its ID.
+
+    Results are cached with `api.task_cache`, keyed on the arguments of the task and
+    the version of the word models of the corpus. If the result of an identical
+    request is cached, the ID of the cached result is returned instead.
+    '''
+    corpus = load_corpus_definition(kwargs['corpus_name'])
+    key = task_cache.result_key(
+        task.name, kwargs, utils.word_models_version(corpus)
+    )
+    return task_cache.schedule(task.s(**kwargs), key)
@@ -0,0 +1,80 @@
+import os
+import shutil
+import pytest
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from wordmodels.aligned import AlignedModels
+from wordmodels.similarity import find_n_most_similar, term_similarities
+from wordmodels.utils import load_aligned_models, load_word_models
+import wordmodels.visualisations as visualisations
+
+
+@pytest.fixture
+def corpus_copy(mock_corpus, tmpdir):
+    corpus = load_corpus_definition(mock_corpus)
+    for filename in os.listdir(corpus.word_model_path):
+        shutil.copy(os.path.join(corpus.word_model_path, filename), tmpdir)
+    corpus.word_model_path = str(tmpdir)
+    return corpus
+
+
+def test_aligned_models(corpus_copy):
+    models = load_word_models(corpus_copy)
+    assert load_aligned_models(corpus_copy) is None
+
+    aligned = AlignedModels.convert(models, corpus_copy.word_model_path)
+    assert aligned.vectors.shape[:2] == aligned.present.shape
+    assert aligned.matches(models)
+
+    for s, wm in enumerate(models):
+        similarities = term_similarities(wm, 'she', ['her', 'he', 'nonexistent'])
+        aligned_similarities = aligned.similarities_over_time(
+            'she', ['her', 'he', 'nonexistent']
+        )[s]
+        assert aligned_similarities == pytest.approx(similarities)
+
+        expected = find_n_most_similar(wm, 'alice', 5)
+        result = aligned.most_similar_over_time('alice', 5)[s]
+        assert [key for key, _ in result] == [item['key'] for item in expected]
+
+    loaded = load_aligned_models(corpus_copy)
+    assert loaded.similarity_over_time('she', 'her') == pytest.approx(
+        aligned.similarity_over_time('she', 'her')
+    )
+
+
+def test_outdated_aligned_models(corpus_copy):
+    AlignedModels.convert(load_word_models(corpus_copy), corpus_copy.word_model_path)
+    assert load_aligned_models(corpus_copy)
+
+    # a model is replaced, with the same time bin
+    wm_file = sorted(
+        f for f in os.listdir(corpus_copy.word_model_path) if f.endswith('.wv')
+    )[0]
+    os.utime(os.path.join(corpus_copy.word_model_path, wm_file), (0, 0))
+    assert load_aligned_models(corpus_copy) is None
+
+
+def test_visualisations_with_aligned_models(corpus_copy, monkeypatch):
+    monkeypatch.setattr(
+        visualisations, 'load_corpus_definition', lambda name: corpus_copy
+    )
+    word_data, times, data_per_timeframe = visualisations.get_diachronic_contexts(
+        'she', 'mock-csv-corpus'
+    )
+    similarity = visualisations.get_similarity_over_time('she', 'her', 'mock-csv-corpus')
+
+    AlignedModels.convert(load_word_models(corpus_copy), corpus_copy.word_model_path)
+    aligned_word_data, aligned_times, aligned_data = visualisations.get_diachronic_contexts(
+        'she', 'mock-csv-corpus'
+    )
+    aligned_similarity = visualisations.get_similarity_over_time(
+        'she', 'her', 'mock-csv-corpus'
+    )
+
+    assert aligned_times == times
+    assert [item['key'] for item in aligned_word_data] == [item['key'] for item in word_data]
+    for data, aligned in zip(data_per_timeframe, aligned_data):
+        assert [item['key'] for item in aligned] == [item['key'] for item in data]
+    for item, aligned_item in zip(similarity, aligned_similarity):
+        assert aligned_item['similarity'] == pytest.approx(item['similarity'])
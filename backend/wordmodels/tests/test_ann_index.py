@@ -0,0 +1,67 @@
+import os
+import shutil
+import pytest
+from django.core.management import call_command
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from wordmodels.ann_index import IVFIndex, index_path, load_index
+from wordmodels.similarity import find_n_most_similar
+from wordmodels.utils import load_word_models
+from wordmodels.management.commands import build_wordmodel_index
+
+
+def test_ivf_index_exhaustive(mock_corpus):
+    model = load_word_models(mock_corpus)[0]
+    vectors = model['vectors']
+    vectors.fill_norms()
+    index = IVFIndex.build(vectors.get_normed_vectors(), 8)
+
+    query = vectors.get_vector('elizabeth', norm=True)
+    results = index.search(vectors.vectors, vectors.norms, query, 10, n_probe=8)
+    expected = vectors.most_similar(positive=[query], topn=10)
+    assert [vectors.index_to_key[i] for i, _ in results] == [key for key, _ in expected]
+
+
+def test_build_index_command(mock_corpus, tmpdir, settings, monkeypatch):
+    corpus = load_corpus_definition(mock_corpus)
+    for filename in os.listdir(corpus.word_model_path):
+        shutil.copy(os.path.join(corpus.word_model_path, filename), tmpdir)
+    corpus.word_model_path = str(tmpdir)
+    monkeypatch.setattr(
+        build_wordmodel_index, 'load_corpus_definition', lambda name: corpus
+    )
+
+    exact_models = load_word_models(corpus)
+    assert all(model['index'] is None for model in exact_models)
+
+    call_command('build_wordmodel_index', mock_corpus, '--clusters', '4')
+
+    models = load_word_models(corpus)
+    assert all(model['index'].n_clusters == 4 for model in models)
+
+    settings.WORDMODELS_ANN_PROBES = 4 # search all clusters
+    for model, exact_model in zip(models, exact_models):
+        result = find_n_most_similar(model, 'she', 5)
+        expected = find_n_most_similar(exact_model, 'she', 5)
+        assert [item['key'] for item in result] == [item['key'] for item in expected]
+        for item, expected_item in zip(result, expected):
+            assert item['similarity'] == pytest.approx(expected_item['similarity'])
+
+
+def test_load_stale_index(mock_corpus, tmpdir):
+    corpus = load_corpus_definition(mock_corpus)
+    wm_file = os.path.join(corpus.word_model_path, sorted(
+        f for f in os.listdir(corpus.word_model_path) if f.endswith('.wv')
+    )[0])
+    copied = os.path.join(tmpdir, os.path.basename(wm_file))
+    shutil.copy(wm_file, copied)
+    vectors = load_word_models(corpus)[0]['vectors']
+    vectors.fill_norms()
+    IVFIndex.build(vectors.get_normed_vectors(), 4).save(index_path(copied))
+
+    assert load_index(copied, len(vectors)).n_clusters == 4
+    # built for a different vocabulary
+    assert load_index(copied, len(vectors) + 1) is None
+    # the model was replaced after the index was built
+    os.utime(index_path(copied), (0, 0))
+    assert load_index(copied, len(vectors)) is None
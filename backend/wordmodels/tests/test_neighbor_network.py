@@ -0,0 +1,34 @@
+from itertools import combinations
+import pytest
+
+from wordmodels.neighbor_network import graph_data_for_timeframe, neighbor_network_data
+from wordmodels.similarity import term_similarity
+from wordmodels.utils import load_word_models
+
+
+def test_graph_links(mock_corpus):
+    model = load_word_models(mock_corpus)[1]
+    nodes, links = graph_data_for_timeframe(model, 'alice', 15)
+    assert len(nodes) == 16
+
+    threshold = min(node['similarity'] for node in nodes)
+    expected = {
+        (n1['index'], n2['index'])
+        for n1, n2 in combinations(nodes, 2)
+        if term_similarity(model, n1['term'], n2['term']) >= threshold
+    }
+    assert {(link['source'], link['target']) for link in links} == expected
+
+    for link in links:
+        term1 = nodes[link['source']]['term']
+        term2 = nodes[link['target']]['term']
+        assert link['value'] == pytest.approx(term_similarity(model, term1, term2), abs=1e-6)
+
+
+def test_graph_table_data(mock_corpus):
+    data = neighbor_network_data(mock_corpus, 'she')
+    nodes = data['graph']['data'][0]['values']
+    for row in data['table']:
+        terms = [node['term'] for node in nodes if node['timeframe'] == row['timeframe']]
+        assert row['term1'] in terms
+        assert row['term2'] in terms
@@ -0,0 +1,81 @@
+import os
+import shutil
+import pytest
+from django.core.management import call_command
+
+from addcorpus.python_corpora.load_corpus import load_corpus_definition
+from wordmodels.management.commands import precompute_related_words
+from wordmodels.neighbours_table import NeighboursTable, load_neighbours_table, table_path
+from wordmodels.similarity import find_n_most_similar
+from wordmodels.utils import load_word_models
+
+
+def test_neighbours_table(mock_corpus):
+    vectors = load_word_models(mock_corpus)[0]['vectors']
+    table = NeighboursTable.compute(vectors, 50, 10)
+
+    assert len(table.terms) == 50
+    assert table.size == 10
+
+    term = vectors.index_to_key[3]
+    result = table.lookup(3, 5)
+    expected = vectors.most_similar(term, topn=5)
+    assert [vectors.index_to_key[i] for i, _ in result] == [key for key, _ in expected]
+    for (_, similarity), (_, expected_similarity) in zip(result, expected):
+        assert similarity == pytest.approx(expected_similarity, abs=1e-6)
+
+    assert table.lookup(3, 11) is None
+    assert table.lookup(100, 5) is None
+
+
+def test_neighbours_table_size(mock_corpus):
+    vectors = load_word_models(mock_corpus)[0]['vectors']
+
+    with pytest.raises(ValueError):
+        NeighboursTable.compute(vectors, 50, 0)
+    with pytest.raises(ValueError):
+        NeighboursTable.compute(vectors, 0, 10)
+
+    table = NeighboursTable.compute(vectors, 5, len(vectors) + 10)
+    assert table.size == len(vectors) - 1
+
+
+def test_precompute_command(mock_corpus, tmpdir, monkeypatch):
+    corpus = load_corpus_definition(mock_corpus)
+    for filename in os.listdir(corpus.word_model_path):
+        shutil.copy(os.path.join(corpus.word_model_path, filename), tmpdir)
+    corpus.word_model_path = str(tmpdir)
+    monkeypatch.setattr(
+        precompute_related_words, 'load_corpus_definition', lambda name: corpus
+    )
+
+    exact_models = load_word_models(corpus)
+    call_command('precompute_related_words', mock_corpus, '--terms', '200')
+    models = load_word_models(corpus)
+
+    for model, exact_model in zip(models, exact_models):
+        assert model['neighbours']
+        result = find_n_most_similar(model, 'she', 5)
+        expected = find_n_most_similar(exact_model, 'she', 5)
+        assert [item['key'] for item in result] == [item['key'] for item in expected]
+
+
+def test_load_stale_table(mock_corpus, tmpdir):
+    corpus = load_corpus_definition(mock_corpus)
+    wm_files = sorted(
+        os.path.join(corpus.word_model_path, f)
+        for f in os.listdir(corpus.word_model_path) if f.endswith('.wv')
+    )
+    copied = os.path.join(tmpdir, os.path.basename(wm_files[0]))
+    shutil.copy(wm_files[0], copied)
+    vectors = load_word_models(corpus)[0]['vectors']
+    NeighboursTable.compute(vectors, 50, 10).save(table_path(copied))
+
+    assert load_neighbours_table(copied, len(vectors)).size == 10
+    # refers to terms outside the vocabulary
+    assert load_neighbours_table(copied, 20) is None
+
+    # the model was replaced after the table was computed
+    os.utime(table_path(copied), (0, 0))
+    shutil.copy(wm_files[-1], copied)
+    assert load_neighbours_table(copied, len(vectors)) is None
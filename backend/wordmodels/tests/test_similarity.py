@@ -77,3 +77,16 @@ def test_vocab_is_subset_of_model(model_with_term_removed):
     neighbours = similarity.find_n_most_similar(model, similar_term, 10)
     assert not any([neighbour['key'] == missing_term for neighbour in neighbours])
     assert len(neighbours) == 10
+
+def test_term_similarities(mock_corpus):
+    model = load_word_models(mock_corpus)[0]
+    terms = ['she', 'He', 'nonexistentterm', 'darcy']
+
+    result = similarity.term_similarities(model, 'elizabeth', terms)
+
+    assert result[2] is None
+    for term, value in zip(terms, result):
+        expected = similarity.term_similarity(model, 'elizabeth', term)
+        assert value == pytest.approx(expected, abs=1e-6)
+
+    assert similarity.term_similarities(model, 'nonexistentterm', terms) == [None] * 4
@@ -1,3 +1,5 @@
+import os
+import shutil
 import numpy as np
 
 import pytest
@@ -5,6 +7,7 @@ import pytest
 from addcorpus.python_corpora.load_corpus import load_corpus_definition
 from addcorpus.models import CorpusDocumentationPage
 from wordmodels.utils import load_word_models, word_in_models, transform_query
+from wordmodels.vocabulary import Vocabulary
 from wordmodels.conftest import TEST_VOCAB_SIZE, TEST_DIMENSIONS, TEST_BINS
 
 def test_import(mock_corpus):
@@ -70,3 +73,31 @@ def test_query_transform(mock_corpus):
     for query, expected in cases:
         transformed = transform_query(query)
         assert transformed == expected
+
+
+def test_word_models_cache(mock_corpus, tmpdir):
+    corpus = load_corpus_definition(mock_corpus)
+    for filename in os.listdir(corpus.word_model_path):
+        shutil.copy(os.path.join(corpus.word_model_path, filename), tmpdir)
+    corpus.word_model_path = str(tmpdir)
+
+    models = load_word_models(corpus)
+    assert load_word_models(corpus) is models
+
+    # changing a file should reload the models
+    os.utime(os.path.join(tmpdir, 'model_1810_1839.wv'), (0, 0))
+    reloaded = load_word_models(corpus)
+    assert reloaded is not models
+    assert len(reloaded) == len(TEST_BINS)
+
+
+def test_vocabulary_similar_terms():
+    vocab = Vocabulary(['whale', 'whales', 'wale', 'shale', 'while', 'walrus', 'hwale'])
+    assert 'whale' in vocab
+    assert 'whal' not in vocab
+    assert vocab.similar_terms('whale', 0) == ['whale']
+    assert vocab.similar_terms('hwale', 1) == ['hwale', 'wale', 'whale']
+    assert vocab.similar_terms('whael', 1) == ['whale']
+    assert vocab.similar_terms('whale', 1) == [
+        'whale', 'hwale', 'shale', 'wale', 'whales', 'while'
+    ]
@@ -1,10 +1,27 @@
 import pytest
+from time import sleep
+
+
+def task_results(client, response, attempts=50):
+    '''Poll the task status view until the scheduled tasks are done'''
+    assert response.status_code == 200
+    for _ in range(attempts):
+        status = client.post(
+            '/api/task_status',
+            {'task_ids': response.data['task_ids']},
+            content_type='application/json'
+        )
+        assert status.status_code == 200
+        if status.data['status'] == 'done':
+            return status.data['results']
+        sleep(0.1)
+    raise TimeoutError('Tasks did not finish')
 
 def test_wm_documentation_view(admin_client, mock_corpus):
     response = admin_client.get(f'/api/corpus/documentation/?corpus={mock_corpus}')
     assert any(page['type'] == 'Word models'for page in response.data)
 
-def test_related_words_view(admin_client, mock_corpus):
+def test_related_words_view(transactional_db, admin_client, mock_corpus, celery_worker):
 
     query_json = {
         'query_term': 'alice',
@@ -16,17 +33,21 @@ def test_related_words_view(admin_client, mock_corpus):
         query_json,
         content_type='application/json'
     )
-    assert response.status_code == 200
+    [result] = task_results(admin_client, response)
+    assert set(result.keys()) == {
+        'similarities_over_time', 'similarities_over_time_local_top_n', 'time_points'
+    }
 
 
-def test_word_similarity_view(admin_client, mock_corpus):
+def test_word_similarity_view(transactional_db, admin_client, mock_corpus, celery_worker):
     term_1 = 'test'
     term_2 = 'testing'
     response = admin_client.get(
         f'/api/wordmodels/similarity_over_time?term_1={term_1}&term_2={term_2}&corpus_name={mock_corpus}',
         content_type='application/json'
     )
-    assert response.status_code == 200
+    [result] = task_results(admin_client, response)
+    assert len(result) == 3
 
 word_in_models_test_cases = [
     ('alice', True),
@@ -52,7 +73,7 @@ def test_word_in_models_view(term, in_model, admin_client, mock_corpus):
         assert 'similar_keys' in data
 
 
-def test_neighbor_network_view(admin_client, mock_corpus):
+def test_neighbor_network_view(transactional_db, admin_client, mock_corpus, celery_worker):
     query_json = {
         'query_term': 'alice',
         'corpus_name': mock_corpus,
@@ -62,4 +83,53 @@ def test_neighbor_network_view(admin_client, mock_corpus):
         query_json,
         content_type='application/json'
     )
-    assert response.status_code == 200
+    [result] = task_results(admin_client, response)
+    assert set(result.keys()) == {'graph', 'table'}
+
+
+@pytest.mark.parametrize('neighbours', ['ten', 0, 1000, True, [5]])
+def test_neighbor_network_view_invalid_neighbours(neighbours, admin_client, mock_corpus):
+    query_json = {
+        'query_term': 'alice',
+        'corpus_name': mock_corpus,
+        'neighbours': neighbours,
+    }
+    response = admin_client.post(
+        '/api/wordmodels/neighbor_network',
+        query_json,
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('neighbours', ['ten', 0, 1000])
+def test_related_words_view_invalid_neighbours(neighbours, admin_client, mock_corpus):
+    query_json = {
+        'query_term': 'alice',
+        'corpus_name': mock_corpus,
+        'neighbours': neighbours,
+    }
+    response = admin_client.post(
+        '/api/wordmodels/related_words',
+        query_json,
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+
+def test_result_reuse(transactional_db, admin_client, mock_corpus, celery_worker):
+    url = f'/api/wordmodels/similarity_over_time?term_1=alice&term_2=she&corpus_name={mock_corpus}'
+    response = admin_client.get(url)
+    [result] = task_results(admin_client, response)
+
+    for _ in range(50):
+        repeated = admin_client.get(url)
+        if repeated.data['task_ids'][0].startswith('cached:'):
+            break
+        sleep(0.1)
+    assert task_results(admin_client, repeated) == [result]
+
+    other = admin_client.get(
+        f'/api/wordmodels/similarity_over_time?term_1=alice&term_2=rabbit&corpus_name={mock_corpus}'
+    )
+    assert not other.data['task_ids'][0].startswith('cached:')
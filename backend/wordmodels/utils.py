@@ -1,44 +1,153 @@
+import hashlib
+import logging
 import os
 from os.path import basename, exists, join, splitext
 import pickle
 from string import punctuation
-from textdistance import damerau_levenshtein
 from gensim.models import KeyedVectors
 
 from addcorpus.python_corpora.load_corpus import corpus_dir, load_corpus_definition
+from wordmodels.aligned import AlignedModels, has_aligned_models
+from wordmodels.ann_index import load_index
+from wordmodels.neighbours_table import load_neighbours_table
+from wordmodels.vocabulary import Vocabulary
 
 from glob import glob
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+_word_models_cache: Dict[str, Tuple[Tuple, List[Dict]]] = {}
+_vocabulary_cache: Dict[str, Tuple[List[Dict], Vocabulary]] = {}
+_aligned_models_cache: Dict[str, Tuple[List[Dict], Optional[AlignedModels]]] = {}
+_word_models_lock = Lock()
 
 
 def load_word_models(corpus):
+    '''
+    Load the diachronic word models of a corpus.
+
+    Models are cached per process, so they are only read from disk once. Vectors are
+    memory-mapped, so their pages can be shared between worker processes. The cache
+    is refreshed when the files in the word model directory change.
+
+    The returned models are shared between requests and should not be modified.
+    '''
     if type(corpus)==str:
         corpus = load_corpus_definition(corpus)
-    wv_list = glob('{}/*.wv'.format(corpus.word_model_path))
-    wv_list.sort()
-    wm = [
-            {
-                "start_year": get_year(wm_file, 1),
-                "end_year": get_year(wm_file, 2),
-                "vectors": KeyedVectors.load(wm_file),
-            }
-        for wm_file in wv_list
-    ]
-    return wm
+    path = corpus.word_model_path
+    signature = _directory_signature(path)
+
+    with _word_models_lock:
+        cached = _word_models_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        wv_list = glob('{}/*.wv'.format(path))
+        wv_list.sort()
+        wm = [_load_word_model(wm_file) for wm_file in wv_list]
+        _word_models_cache[path] = (signature, wm)
+        return wm
+
+
+def _load_word_model(wm_file: str) -> Dict:
+    vectors = KeyedVectors.load(wm_file, mmap='r')
+    return {
+        "start_year": get_year(wm_file, 1),
+        "end_year": get_year(wm_file, 2),
+        "vectors": vectors,
+        "index": load_index(wm_file, len(vectors)),
+        "neighbours": load_neighbours_table(wm_file, len(vectors)),
+        "file_signature": _file_signature(wm_file),
+    }
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    '''
+    Modification time (in nanoseconds) and size of a file, used to detect changes.
+    '''
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _directory_signature(path: str) -> Tuple:
+    '''
+    Summary of the files in a directory, used to detect changes.
+    '''
+    files = sorted(glob('{}/*'.format(path)))
+    stats = [os.stat(f) for f in files]
+    return tuple(
+        (f, stat.st_mtime_ns, stat.st_size) for f, stat in zip(files, stats)
+    )
+
+
+def word_models_version(corpus) -> str:
+    '''
+    A version string for the word models of a corpus, which changes when the files
+    in the word model directory change.
+    '''
+    signature = _directory_signature(corpus.word_model_path)
+    return hashlib.sha256(repr(signature).encode()).hexdigest()
+
 
 def get_year(kv_filename, position):
     return int(splitext(basename(kv_filename))[0].split('_')[position])
 
-def word_in_models(query_term, corpus, max_distance=2):
+def load_vocabulary(corpus) -> Vocabulary:
+    '''
+    Load the combined vocabulary of the word models of a corpus.
+
+    The vocabulary is cached along with the word models.
+    '''
+    if type(corpus)==str:
+        corpus = load_corpus_definition(corpus)
     models = load_word_models(corpus)
+
+    with _word_models_lock:
+        cached = _vocabulary_cache.get(corpus.word_model_path)
+        if cached and cached[0] is models:
+            return cached[1]
+
+        vocab = Vocabulary(
+            term for model in models for term in model['vectors'].index_to_key
+        )
+        _vocabulary_cache[corpus.word_model_path] = (models, vocab)
+        return vocab
+
+def load_aligned_models(corpus) -> Optional[AlignedModels]:
+    '''
+    Load the aligned word models of a corpus, if they have been created.
+
+    Returns `None` if there are no aligned models, or if they were not created from
+    the current word models of the corpus (i.e. the time bins differ, or the model
+    files changed since they were aligned). Aligned models are cached along with the
+    word models.
+    '''
+    if type(corpus)==str:
+        corpus = load_corpus_definition(corpus)
+    models = load_word_models(corpus)
+    path = corpus.word_model_path
+
+    with _word_models_lock:
+        cached = _aligned_models_cache.get(path)
+        if cached and cached[0] is models:
+            return cached[1]
+
+        aligned = AlignedModels.load(path) if has_aligned_models(path) else None
+        if aligned and not aligned.matches(models):
+            logger.warning(f'Ignoring aligned models in {path}: they do not match the word models')
+            aligned = None
+        _aligned_models_cache[path] = (models, aligned)
+        return aligned
+
+def word_in_models(query_term, corpus, max_distance=2):
+    vocab = load_vocabulary(corpus)
     transformed_query = transform_query(query_term)
-    vocab = set()
-    for model in models:
-        vocab.update(model['vectors'].index_to_key)
-    if transformed_query in list(vocab):
+    if transformed_query in vocab:
         return { 'exists': True }
     # if word is not in vocab, search for close matches
-    is_similar = lambda term : damerau_levenshtein(query_term, term) <= max_distance
-    similar_keys = [term for term in list(vocab) if is_similar(term)]
+    similar_keys = vocab.similar_terms(transformed_query or query_term, max_distance)
     return {
         'exists': False,
         'similar_keys': similar_keys
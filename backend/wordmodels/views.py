@@ -1,72 +1,98 @@
+import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from addcorpus.permissions import CanSearchCorpus, corpus_name_from_request
-from wordmodels import utils, visualisations
-from rest_framework.exceptions import APIException
-from wordmodels import neighbor_network
+from rest_framework.exceptions import APIException, ParseError
+from wordmodels import neighbor_network, tasks, utils, visualisations
+
+logger = logging.getLogger()
+
+
+def _schedule(task, **kwargs) -> Response:
+    try:
+        task_id = tasks.schedule_task(task, **kwargs)
+        return Response({'task_ids': [task_id]})
+    except Exception as e:
+        logger.error(e)
+        raise APIException(detail='Could not set up word model task.')
+
+
+def parse_neighbours(value, maximum: int) -> int:
+    '''
+    Parse the number of neighbours in a request: a positive integer up to `maximum`.
+    '''
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ParseError('neighbours should be an integer')
+    try:
+        neighbours = int(value)
+    except ValueError:
+        raise ParseError('neighbours should be an integer')
+    if not 0 < neighbours <= maximum:
+        raise ParseError(f'neighbours should be between 1 and {maximum}')
+    return neighbours
+
 
 class RelatedWordsView(APIView):
     '''
-    Get words with the highest similarity to the query term
+    Schedule a task to get words with the highest similarity to the query term
     '''
 
     permission_classes = [CanSearchCorpus]
 
     def post(self, request, *args, **kwargs):
         corpus = corpus_name_from_request(request)
-        results = visualisations.get_diachronic_contexts(
-            request.data['query_term'],
-            corpus,
-            number_similar = request.data['neighbours'],
+        return _schedule(
+            tasks.get_related_words,
+            query_term=request.data['query_term'],
+            corpus_name=corpus,
+            neighbours=parse_neighbours(
+                request.data.get('neighbours', visualisations.NUMBER_SIMILAR),
+                visualisations.MAX_SIMILAR,
+            ),
         )
-        if isinstance(results, str):
-            # the method returned an error string
-            raise APIException(detail=results)
-        else:
-            return Response({
-                    'similarities_over_time': results[0],
-                    'similarities_over_time_local_top_n': results[2],
-                    'time_points': results[1]
-            })
 
 
 class NeighborNetworkView(APIView):
     '''
-    Get a graph of the nearest neighbours of the query term
+    Schedule a task to get a graph of the nearest neighbours of the query term
     '''
 
     permission_classes = [CanSearchCorpus]
 
     def post(self, request, *args, **kwargs):
         corpus = corpus_name_from_request(request)
-        query_term = request.data['query_term']
-        results = neighbor_network.neighbor_network_data(corpus, query_term)
-        return Response(results)
+        return _schedule(
+            tasks.get_neighbor_network,
+            query_term=request.data['query_term'],
+            corpus_name=corpus,
+            neighbours=parse_neighbours(
+                request.data.get('neighbours', neighbor_network.NUMBER_NEIGHBOURS),
+                neighbor_network.MAX_NEIGHBOURS,
+            ),
+        )
 
 
 class SimilarityView(APIView):
     '''
-    Get similarity between two query terms
+    Schedule a task to get the similarity between two query terms
     '''
 
     permission_classes = [CanSearchCorpus]
 
     def get(self, request, *args, **kwargs):
         corpus = corpus_name_from_request(request)
-        term_1 = request.query_params.get('term_1')
-        term_2 = request.query_params.get('term_2')
-
-        results = visualisations.get_similarity_over_time(term_1, term_2, corpus)
-
-        if isinstance(results, str):
-            # the method returned an error string
-            raise APIException(detail=results)
-        else:
-            return Response(results)
+        return _schedule(
+            tasks.get_similarity_over_time,
+            term_1=request.query_params.get('term_1'),
+            term_2=request.query_params.get('term_2'),
+            corpus_name=corpus,
+        )
 
 class WordInModelView(APIView):
     '''
     Check if a word has a vector in the model for a corpus
+
+    This is a lookup in the vocabulary index, so it is not scheduled as a task.
     '''
 
     permission_classes = [CanSearchCorpus]
@@ -74,11 +100,4 @@ class WordInModelView(APIView):
     def get(self, request, *args, **kwargs):
         corpus = corpus_name_from_request(request)
         query_term = request.query_params.get('query_term')
-
-        results = utils.word_in_models(query_term, corpus)
-
-        if isinstance(results, str):
-            # the method returned an error string
-            raise APIException(detail=results)
-        else:
-            return Response(results)
+        return Response(utils.word_in_models(query_term, corpus))
@@ -3,23 +3,32 @@ from operator import concat
 import pandas as pd
 
 from addcorpus.python_corpora.load_corpus import load_corpus_definition
-from wordmodels.similarity import find_n_most_similar, term_similarity
-from wordmodels.utils import load_word_models, time_labels
+from wordmodels.similarity import find_n_most_similar, term_similarity, term_similarities
+from wordmodels.utils import load_aligned_models, load_word_models, time_labels, transform_query
 
 
 NUMBER_SIMILAR = 8
 
+MAX_SIMILAR = 50
+'Maximum number of related words in a request'
+
 def get_similarity_over_time(query_term, comparison_term, corpus_string):
     corpus = load_corpus_definition(corpus_string)
     wm_list = load_word_models(corpus)
-    data = [
-        term_similarity(
-            time_bin,
-            query_term,
-            comparison_term
+    aligned = load_aligned_models(corpus)
+    if aligned:
+        data = aligned.similarity_over_time(
+            transform_query(query_term), transform_query(comparison_term)
         )
-        for time_bin in wm_list
-    ]
+    else:
+        data = [
+            term_similarity(
+                time_bin,
+                query_term,
+                comparison_term
+            )
+            for time_bin in wm_list
+        ]
     labels = time_labels(wm_list)
 
     similarities = [
@@ -37,31 +46,56 @@ def get_similarity_over_time(query_term, comparison_term, corpus_string):
 def get_diachronic_contexts(query_term, corpus_string, number_similar=NUMBER_SIMILAR):
     corpus = load_corpus_definition(corpus_string)
     wm_list = load_word_models(corpus)
+    aligned = load_aligned_models(corpus)
     times = time_labels(wm_list)
-    data_per_timeframe = [
-        find_n_most_similar(time_bin, query_term, number_similar)
-        for time_bin in wm_list
-    ]
+    data_per_timeframe = _most_similar_per_timeframe(
+        wm_list, aligned, query_term, number_similar
+    )
     flattened_data = reduce(concat, data_per_timeframe)
     all_words = list(set([item.get('key') for item in flattened_data]))
     frequencies = {word: [] for word in all_words}
     for item in flattened_data:
         frequencies[item['key']].append(item['similarity'])
     max_similarities = pd.DataFrame({'word': all_words, 'max': [max(f) for f in frequencies.values()]})
-    words = max_similarities.nlargest(number_similar, 'max')['word']
+    words = list(max_similarities.nlargest(number_similar, 'max')['word'])
 
-    get_similarity = lambda word, time_bin: term_similarity(
-        time_bin,
-        query_term,
-        word
-    )
+    if aligned:
+        similarities_per_timeframe = aligned.similarities_over_time(
+            transform_query(query_term), [transform_query(word) for word in words]
+        )
+    else:
+        similarities_per_timeframe = [
+            term_similarities(time_bin, query_term, words) for time_bin in wm_list
+        ]
 
     word_data = [
         {
             'key': word,
-            'similarity': get_similarity(word, time_bin),
+            'similarity': similarity,
             'time': time_label
         }
-        for (time_label, time_bin) in zip(times, wm_list) for word in words]
+        for (time_label, similarities) in zip(times, similarities_per_timeframe)
+        for word, similarity in zip(words, similarities)
+    ]
 
     return word_data, times, data_per_timeframe
+
+
+def _most_similar_per_timeframe(wm_list, aligned, query_term, number_similar):
+    '''
+    Find the most similar terms to the query term in each time bin.
+
+    Aligned models are used to search all time bins at once, unless the models have
+    precomputed neighbours or an approximate nearest neighbour index.
+    '''
+    if aligned and not any(wm.get('neighbours') or wm.get('index') for wm in wm_list):
+        return [
+            [{'key': key, 'similarity': similarity} for key, similarity in results]
+            for results in aligned.most_similar_over_time(
+                transform_query(query_term), number_similar
+            )
+        ]
+    return [
+        find_n_most_similar(time_bin, query_term, number_similar)
+        for time_bin in wm_list
+    ]
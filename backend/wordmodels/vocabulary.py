@@ -0,0 +1,88 @@
+from collections import Counter
+from typing import Dict, Iterable, List
+import numpy as np
+from textdistance import damerau_levenshtein
+
+ALPHABET_SIZE = 63
+'Number of characters that are counted separately in the character count index'
+
+
+class Vocabulary:
+    '''
+    The combined vocabulary of a set of word models.
+
+    Supports constant-time membership checks, and an index to find terms within a
+    maximum edit distance of a query.
+
+    The index stores the length and character counts of each term. An edit operation
+    changes the character counts by at most 2 (a substitution), so terms whose counts
+    differ by more than twice the maximum distance can be ruled out with a single
+    vectorised comparison. The remaining candidates are compared with
+    Damerau-Levenshtein distance.
+    '''
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted(set(terms))
+        self._lookup = frozenset(self.terms)
+        self._lengths = np.array([len(term) for term in self.terms], dtype=np.int32)
+        self._alphabet = self._make_alphabet(self.terms)
+        self._counts = np.zeros(
+            (len(self.terms), len(self._alphabet) + 1), dtype=np.int16
+        )
+        other = len(self._alphabet)
+        rows = np.repeat(np.arange(len(self.terms)), self._lengths)
+        columns = np.array([
+            self._alphabet.get(char, other) for term in self.terms for char in term
+        ], dtype=np.intp)
+        np.add.at(self._counts, (rows, columns), 1)
+
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._lookup
+
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+    def similar_terms(self, query: str, max_distance: int) -> List[str]:
+        '''
+        Terms in the vocabulary within a maximum Damerau-Levenshtein distance of the
+        query, sorted by distance.
+        '''
+        if not len(self.terms):
+            return []
+        length_diff = np.abs(self._lengths - len(query))
+        count_diff = np.abs(self._counts - self._char_counts(query)).sum(axis=1)
+        candidates = np.flatnonzero(
+            (length_diff <= max_distance) & (count_diff <= 2 * max_distance)
+        )
+
+        distances = {
+            self.terms[i]: damerau_levenshtein(query, self.terms[i])
+            for i in candidates
+        }
+        return sorted(
+            (term for term, distance in distances.items() if distance <= max_distance),
+            key=lambda term: (distances[term], term),
+        )
+
+
+    def _make_alphabet(self, terms: List[str]) -> Dict[str, int]:
+        '''
+        Assign a column to the most common characters; other characters share the
+        last column.
+        '''
+        counter = Counter(char for term in terms for char in term)
+        return {
+            char: i
+            for i, (char, _) in enumerate(counter.most_common(ALPHABET_SIZE))
+        }
+
+
+    def _char_counts(self, term: str) -> np.ndarray:
+        counts = np.zeros(len(self._alphabet) + 1, dtype=np.int16)
+        other = len(self._alphabet)
+        for char in term:
+            counts[self._alphabet.get(char, other)] += 1
+        return counts
@@ -19,11 +19,24 @@ export interface APIIndexHealth {
     index_compatible: boolean | null;
     latest_job: number | null;
     job_status: JobStatus | null;
+    populate_progress: APIPopulateProgress | null;
     includes_latest_data: boolean | null;
     corpus_ready_to_index: boolean | null;
     corpus_validation_feedback: string | null;
 }
 
+export interface APIPopulateProgress {
+    documents_indexed: number;
+    documents_failed: number;
+    sources_processed: number;
+    sources_total: number | null;
+    extraction_time: number;
+    bulk_time: number;
+    documents_per_second: number | null;
+    bytes_per_second: number | null;
+    estimated_time_remaining: number | null;
+}
+
 export interface APIIndexJob {
     id: number;
     corpus: number;
@@ -0,0 +1,34 @@
+import { clusterZoom, mapBounds, MapView } from './map-data';
+
+describe('map data', () => {
+    it('should choose a cluster zoom level for the map scale', () => {
+        const zoom = clusterZoom(500);
+        expect(clusterZoom(1000)).toBe(zoom + 1);
+        expect(clusterZoom(2000)).toBe(zoom + 2);
+        expect(clusterZoom(0.001)).toBe(0);
+    });
+
+    it('should compute the bounds of the visible map', () => {
+        const view: MapView = {
+            scale: 500, rotateX: 0, centerX: 5, centerY: 52, width: 600, height: 400,
+        };
+        const bounds = mapBounds(view);
+        expect(bounds.top_left.lon).toBeLessThan(5);
+        expect(bounds.bottom_right.lon).toBeGreaterThan(5);
+        expect(bounds.top_left.lat).toBeGreaterThan(52);
+        expect(bounds.bottom_right.lat).toBeLessThan(52);
+        // the map is centered on the center point
+        expect((bounds.top_left.lon + bounds.bottom_right.lon) / 2).toBeCloseTo(5);
+
+        // dragging the map to the east shows places further west
+        const rotated = mapBounds({ ...view, rotateX: 10 });
+        expect(rotated.top_left.lon).toBeCloseTo(bounds.top_left.lon - 10);
+    });
+
+    it('should not restrict the bounds if the whole world is visible', () => {
+        const view: MapView = {
+            scale: 50, rotateX: 0, centerX: 0, centerY: 0, width: 600, height: 400,
+        };
+        expect(mapBounds(view)).toBeUndefined();
+    });
+});
@@ -1,12 +1,71 @@
 import { map, of, Observable, switchMap, withLatestFrom  } from 'rxjs';
 import { Results } from './results';
-import { GeoDocument, GeoLocation } from './search-results';
+import { GeoCluster, GeoDocument, GeoLocation } from './search-results';
+import { GeoBounds } from './visualization';
 import { Params } from '@angular/router';
 import { VisualizationService } from '@services';
 import { Store } from '../store/types';
 import { QueryModel } from './query';
 import { CorpusField } from './corpus';
 import { findByName } from '@utils/utils';
+import * as _ from 'lodash';
+
+/** initial scale of the map projection */
+export const INITIAL_MAP_SCALE = 500;
+
+/** highest zoom level supported for clusters */
+const MAX_CLUSTER_ZOOM = 29;
+
+/** width (in pixels) of a map tile at zoom level 0 */
+const TILE_SIZE = 256;
+
+/** the visible part of the map: parameters of the mercator projection */
+export interface MapView {
+    scale: number;
+    rotateX: number;
+    centerX: number;
+    centerY: number;
+    width: number;
+    height: number;
+}
+
+/**
+ * Zoom level for clusters at a scale of the map projection. Tiles are about 64
+ * pixels wide, so zooming in on the map requests smaller clusters.
+ */
+export const clusterZoom = (scale: number): number => {
+    const worldWidth = 2 * Math.PI * scale;
+    const zoom = Math.round(Math.log2(worldWidth / TILE_SIZE)) + 2;
+    return _.clamp(zoom, 0, MAX_CLUSTER_ZOOM);
+};
+
+const radians = (value: number) => value * Math.PI / 180;
+const degrees = (value: number) => value * 180 / Math.PI;
+const mercatorY = (latitude: number) => Math.log(Math.tan(Math.PI / 4 + radians(latitude) / 2));
+const normalizeLongitude = (longitude: number) => ((longitude + 540) % 360) - 180;
+
+/**
+ * Bounding box of the visible map, or undefined if the whole width of the world
+ * is visible.
+ */
+export const mapBounds = (view: MapView): GeoBounds | undefined => {
+    const invert = (x: number, y: number) => ({
+        lon: normalizeLongitude(
+            degrees((x - view.width / 2) / view.scale) - view.rotateX + view.centerX
+        ),
+        lat: _.clamp(degrees(
+            2 * Math.atan(Math.exp(mercatorY(view.centerY) - (y - view.height / 2) / view.scale))
+            - Math.PI / 2
+        ), -90, 90),
+    });
+    if (view.width >= 2 * Math.PI * view.scale) {
+        return undefined;
+    }
+    return {
+        top_left: invert(0, 0),
+        bottom_right: invert(view.width, view.height),
+    };
+};
 
 
 interface MapDataParameters {
@@ -17,6 +76,7 @@ interface MapDataParameters {
 interface MapData {
     mapCenter: GeoLocation;
     geoDocuments: GeoDocument[];
+    clusters: GeoCluster[];
 }
 
 
@@ -43,24 +103,56 @@ export class MapDataResults extends Results<MapDataParameters, MapData> {
     fetch(): Observable<MapData> {
         const field = this.state$.value.field;
         if (!field) {
-            return of({ geoDocuments: [], mapCenter: null });
+            return of({ geoDocuments: [], clusters: [], mapCenter: null });
         }
 
-        const geoDocuments$ = this.visualizationService.getGeoData(
+        // request clusters first; only load individual documents if there are
+        // not more than the server's limit
+        const data$ = this.visualizationService.getGeoClusters(
             field.name,
             this.query,
-            this.query.corpus
+            this.query.corpus,
+            clusterZoom(INITIAL_MAP_SCALE),
+        ).pipe(
+            switchMap(({ clusters, points_limit }) => {
+                const total = _.sumBy(clusters, cluster => cluster.properties.count);
+                if (total > points_limit) {
+                    return of({ geoDocuments: [], clusters });
+                }
+                return this.visualizationService.getGeoData(
+                    field.name,
+                    this.query,
+                    this.query.corpus
+                ).pipe(map(result => result.truncated
+                    ? { geoDocuments: [], clusters }
+                    : { geoDocuments: result.features, clusters: [] }
+                ));
+            })
         );
 
-        return geoDocuments$.pipe(
+        return data$.pipe(
             withLatestFrom(this.mapCenter$),
-            map(([geoDocuments, mapCenter]) => ({
-                geoDocuments,
+            map(([data, mapCenter]) => ({
+                ...data,
                 mapCenter
             }))
         );
     }
 
+    /**
+     * Clusters for the visible part of the map, at the zoom level of its scale.
+     */
+    clustersForView(view: MapView): Observable<GeoCluster[]> {
+        const field = this.state$.value.field;
+        return this.visualizationService.getGeoClusters(
+            field.name,
+            this.query,
+            this.query.corpus,
+            clusterZoom(view.scale),
+            mapBounds(view),
+        ).pipe(map(result => result.clusters));
+    }
+
     protected stateToStore(state: MapDataParameters): Params {
         return { visualizedField: state.field?.name || null };
     }
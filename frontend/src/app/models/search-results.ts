@@ -36,6 +36,34 @@ export interface GeoDocument {
     };
 }
 
+/** number of documents in a map tile, located at their centroid */
+export interface GeoCluster {
+    type: string; // e.g. 'Feature'
+    geometry: {
+        type: string; // e.g. 'Point'
+        coordinates: [number, number]; // [longitude, latitude]
+    };
+    properties: {
+        tile: string;
+        count: number;
+    };
+}
+
+/** clusters for a zoom level, and the maximum number of documents shown as points */
+export interface GeoClustersResult {
+    clusters: GeoCluster[];
+    points_limit: number;
+}
+
+/** documents as points; `truncated` is true if there are more than `limit` results */
+export interface GeoPointsResult {
+    total: number;
+    limit: number;
+    truncated: boolean;
+    features: GeoDocument[];
+    error?: string;
+}
+
 export interface GeoLocation {
     location: {
         lat: number;
@@ -94,12 +122,29 @@ export const entityKeys: Record<string, string> = {
 
 export interface TaskResult { task_ids: string[] };
 
+export interface TaskStatusRequest extends TaskResult {
+    /** seconds to wait until another task is complete (long polling) */
+    wait?: number;
+    /** include the results of tasks that are complete */
+    partial?: boolean;
+};
+
+/** result of a single task, streamed as soon as the task is complete */
+export interface TaskStreamResult<T> {
+    /** index of the task in the requested task IDs */
+    index: number;
+    result: T;
+}
+
 export interface TaskSuccess {
     success: true;
 }
 
 interface WorkingTask {
     status: 'working';
+    /** results of completed tasks, only included for partial requests */
+    results?: unknown[];
+    ready?: boolean[];
 }
 
 export interface SuccessfulTask<T> {
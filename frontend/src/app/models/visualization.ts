@@ -50,8 +50,8 @@ export type HistogramSeries = BarchartSeries<TermsResult>;
 export type TimelineSeries = BarchartSeries<DateResult>;
 
 
-export interface TimelineBin {start_date: string; end_date: string; size: number }
-export interface HistogramBin {field_value: string|number; size: number }
+export interface TimelineBin {start_date: string; end_date: string; size: number; doc_count?: number }
+export interface HistogramBin {field_value: string|number; size: number; doc_count?: number }
 
 export type TimeCategory =  'year'|'week'|'month'|'day';
 
@@ -75,6 +75,21 @@ export type WordcloudParameters = {
 } & APIQuery;
 
 
+/** bounding box of the visible map */
+export interface GeoBounds {
+    top_left: { lat: number; lon: number };
+    bottom_right: { lat: number; lon: number };
+}
+
+export type GeoClusterParameters = {
+    corpus: string;
+    field: string;
+    mode: 'clusters';
+    zoom: number;
+    bounds?: GeoBounds;
+} & APIQuery;
+
+
 export type NGramRequestParameters = {
     corpus_name: string;
     field: string;
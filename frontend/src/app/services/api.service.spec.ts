@@ -5,7 +5,7 @@ import { ApiService } from './api.service';
 import { HttpClient, HttpErrorResponse, provideHttpClient, withInterceptorsFromDi } from '@angular/common/http';
 import { fakeNgramResult } from '@mock-data/api';
 import { Subject, from, throwError } from 'rxjs';
-import { TaskResult, TasksOutcome } from '@models';
+import { TaskResult, TaskStatusRequest, TasksOutcome } from '@models';
 
 describe('ApiService', () => {
     let service: ApiService;
@@ -58,6 +58,67 @@ describe('ApiService', () => {
         stopPolling$.next();
     }));
 
+    it('should pass on partial results when polling task progress', fakeAsync(() => {
+        const stopPolling$ = new Subject<void>();
+        const testData: TasksOutcome[] = [
+            { status: 'working', results: [fakeNgramResult, null], ready: [true, false] },
+            { status: 'done', results: [fakeNgramResult, fakeNgramResult] }
+        ];
+        service.getTasksStatus = (tasks: TaskResult) => from(testData);
+        const outcomes: TasksOutcome[] = [];
+        service.pollTaskProgress(['fake_id_1', 'fake_id_2'], stopPolling$).subscribe(
+            (outcome) => outcomes.push(outcome)
+        );
+        tick(5000);
+        expect(outcomes).toEqual(testData);
+        stopPolling$.next();
+    }));
+
+    it('should only request partial results when polling task progress', fakeAsync(() => {
+        const stopPolling$ = new Subject<void>();
+        const requests: TaskStatusRequest[] = [];
+        service.getTasksStatus = (tasks: TaskStatusRequest) => {
+            requests.push(tasks);
+            return from([{ status: 'done', results: [fakeNgramResult] } as TasksOutcome]);
+        };
+        service.pollTasks(['fake_id'], stopPolling$).subscribe();
+        service.pollTaskProgress(['fake_id'], stopPolling$).subscribe();
+        tick(5000);
+        expect(requests.map((request) => request.partial)).toEqual([false, true]);
+        stopPolling$.next();
+    }));
+
+    it('should open a new stream for tasks that are pending after a timeout', fakeAsync(() => {
+        const stop$ = new Subject<void>();
+        const requestedIds: string[][] = [];
+        (service as any).taskEvents = (ids: string[]) => {
+            requestedIds.push(ids);
+            if (ids.length === 2) {
+                return from([
+                    { event: 'result', data: { index: 1, result: 'b' } },
+                    { event: 'timeout', data: { pending: [0], retry: 1 } },
+                ]);
+            }
+            return from([
+                { event: 'result', data: { index: 0, result: 'a' } },
+                { event: 'done', data: {} },
+            ]);
+        };
+        const results = [];
+        let complete = false;
+        service.streamTasks<string>(['id_a', 'id_b'], stop$).subscribe({
+            next: (result) => results.push(result),
+            complete: () => complete = true,
+        });
+        tick(1000);
+        expect(requestedIds).toEqual([['id_a', 'id_b'], ['id_a']]);
+        expect(results).toEqual([
+            { index: 1, result: 'b' },
+            { index: 0, result: 'a' },
+        ]);
+        expect(complete).toBeTrue();
+    }));
+
     it('should poll tasks and complete if stopPolling$ is triggered', fakeAsync(() => {
         const stopPolling$ = new Subject<void>();
         spyOn(pollingCallback, 'complete');
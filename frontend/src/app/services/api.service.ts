@@ -1,9 +1,14 @@
 /* eslint-disable @typescript-eslint/member-ordering */
 import { Injectable } from '@angular/core';
 
-import { HttpClient, HttpParams } from '@angular/common/http';
-import { interval, Observable } from 'rxjs';
-import { filter, switchMap, take, takeUntil } from 'rxjs/operators';
+import {
+    HttpClient, HttpDownloadProgressEvent, HttpEvent, HttpEventType, HttpParams
+} from '@angular/common/http';
+import { defer, from, interval, Observable, of, timer } from 'rxjs';
+import {
+    concatMap, filter, map, mergeMap, repeat, scan, switchMap, take, takeUntil,
+    takeWhile
+} from 'rxjs/operators';
 import {
     AggregateTermFrequencyParameters,
     Corpus,
@@ -14,8 +19,10 @@ import {
     DownloadOptions,
     FieldCoverage,
     FoundDocument,
-    GeoDocument,
+    GeoClusterParameters,
+    GeoClustersResult,
     GeoLocation,
+    GeoPointsResult,
     LimitedResultsDownloadParameters,
     MostFrequentWordsResult,
     NGramRequestParameters,
@@ -23,6 +30,8 @@ import {
     ResultsDownloadParameters,
     Tag,
     TaskResult,
+    TaskStatusRequest,
+    TaskStreamResult,
     TaskSuccess,
     TasksOutcome,
     UserResponse,
@@ -38,6 +47,7 @@ import {
 } from '@models/corpus-definition';
 import { APIIndexHealth, APIIndexJob, isComplete, JobStatus } from '@models/indexing';
 import { ImageInfo } from '@models/image';
+import { parseServerSentEvents, ServerSentEvent } from '@utils/server-sent-events';
 
 interface SolisLoginResponse {
     success: boolean;
@@ -48,6 +58,11 @@ interface SolisLoginResponse {
     queries: QueryDb[];
 }
 
+/** seconds for which the server may hold a task status request */
+const TASK_STATUS_WAIT = 5;
+/** milliseconds between task status requests */
+const TASK_POLLING_DELAY = 500;
+
 @Injectable({
     providedIn: 'root',
 })
@@ -118,7 +133,7 @@ export class ApiService {
     }
 
     // Tasks
-    public getTasksStatus(tasks: TaskResult): Observable<TasksOutcome> {
+    public getTasksStatus(tasks: TaskStatusRequest): Observable<TasksOutcome> {
         return this.http.post<TasksOutcome>('/api/task_status', tasks);
     }
 
@@ -132,14 +147,102 @@ export class ApiService {
         return response.status === 'done';
     }
 
+    /**
+     * Poll the status of tasks until they are all done.
+     *
+     * Uses long polling: the server holds each request until another task is
+     * complete (up to TASK_STATUS_WAIT seconds), so `period` is only the delay
+     * between consecutive requests. Results are only sent when all tasks are done.
+     */
     public pollTasks(
         ids: string[],
-        stopPolling$: Observable<void>
+        stopPolling$: Observable<void>,
+        period: number = TASK_POLLING_DELAY
     ): Observable<TasksOutcome> {
-        return this.pollRequest(
-            () => this.getTasksStatus({ task_ids: ids }),
-            this.tasksDone,
-            stopPolling$,
+        return this.pollTaskStatus(ids, stopPolling$, period, false).pipe(
+            filter(this.tasksDone),
+            take(1),
+        );
+    }
+
+    /**
+     * Like `pollTasks`, but emits every response, including the results of
+     * tasks that are complete while others are still working. Can be used to
+     * render results progressively.
+     */
+    public pollTaskProgress(
+        ids: string[],
+        stopPolling$: Observable<void>,
+        period: number = TASK_POLLING_DELAY
+    ): Observable<TasksOutcome> {
+        return this.pollTaskStatus(ids, stopPolling$, period, true);
+    }
+
+    private pollTaskStatus(
+        ids: string[],
+        stopPolling$: Observable<void>,
+        period: number,
+        partial: boolean,
+    ): Observable<TasksOutcome> {
+        const request: TaskStatusRequest = {
+            task_ids: ids, wait: TASK_STATUS_WAIT, partial
+        };
+        return defer(() => this.getTasksStatus(request)).pipe(
+            repeat({ delay: period }),
+            takeUntil(stopPolling$),
+            takeWhile((response) => !this.tasksDone(response), true),
+        );
+    }
+
+    /**
+     * Stream the results of tasks as server-sent events. Emits the result of
+     * each task as soon as it is complete (in order of completion), and
+     * completes when all tasks are complete.
+     *
+     * The server closes streams after a short time; if tasks are still pending,
+     * a new stream is opened for them.
+     */
+    public streamTasks<T>(
+        ids: string[],
+        stop$: Observable<void>
+    ): Observable<TaskStreamResult<T>> {
+        return this.taskEvents(ids, stop$).pipe(
+            takeWhile((event) => event.event !== 'done'),
+            mergeMap((event) => {
+                if (event.event === 'error') {
+                    throw new Error(event.data.detail);
+                }
+                if (event.event === 'timeout') {
+                    const pending: number[] = event.data.pending;
+                    return timer(event.data.retry * 1000).pipe(
+                        takeUntil(stop$),
+                        mergeMap(() => this.streamTasks<T>(pending.map((i) => ids[i]), stop$)),
+                        map((result) => ({ ...result, index: pending[result.index] })),
+                    );
+                }
+                return of(event.data as TaskStreamResult<T>);
+            }),
+        );
+    }
+
+    /** the events of a stream of task results */
+    private taskEvents(
+        ids: string[],
+        stop$: Observable<void>
+    ): Observable<ServerSentEvent> {
+        const initial = { parsed: 0, events: [] as ServerSentEvent[] };
+        return this.http.post('/api/task_stream', { task_ids: ids }, {
+            observe: 'events', reportProgress: true, responseType: 'text',
+        }).pipe(
+            takeUntil(stop$),
+            map(streamedText),
+            filter((text) => text !== undefined),
+            // only pass on events that were not parsed before
+            scan((state, text) => {
+                const events = parseServerSentEvents(text);
+                return { parsed: events.length, events: events.slice(state.parsed) };
+            }, initial),
+            concatMap((state) => from(state.events)),
         );
     }
 
@@ -151,9 +254,14 @@ export class ApiService {
         return this.http.post<MostFrequentWordsResult[]>(url, data);
     }
 
-    public geoData(data: WordcloudParameters): Observable<GeoDocument[]> {
+    public geoData(data: WordcloudParameters): Observable<GeoPointsResult> {
+        const url = this.apiRoute(this.visApiURL, 'geo');
+        return this.http.post<GeoPointsResult>(url, data);
+    }
+
+    public geoClusters(data: GeoClusterParameters): Observable<GeoClustersResult> {
         const url = this.apiRoute(this.visApiURL, 'geo');
-        return this.http.post<GeoDocument[]>(url, data);
+        return this.http.post<GeoClustersResult>(url, data);
     }
 
     public geoCentroid(data: {corpus: string, field: string}): Promise<GeoLocation> {
@@ -540,3 +648,13 @@ export class ApiService {
         );
     }
 }
+
+/** the text received so far in a streamed response */
+const streamedText = (event: HttpEvent<string>): string | undefined => {
+    if (event.type === HttpEventType.DownloadProgress) {
+        return (event as HttpDownloadProgressEvent).partialText;
+    }
+    if (event.type === HttpEventType.Response) {
+        return event.body;
+    }
+};
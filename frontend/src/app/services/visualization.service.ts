@@ -3,8 +3,10 @@ import {
     AggregateTermFrequencyParameters,
     Corpus,
     DateTermFrequencyParameters,
-    GeoDocument,
+    GeoBounds,
+    GeoClustersResult,
     GeoLocation,
+    GeoPointsResult,
     MostFrequentWordsResult,
     NGramRequestParameters,
     QueryModel,
@@ -13,6 +15,7 @@ import {
 } from '@models';
 import { ApiService } from './api.service';
 import { Observable } from 'rxjs';
+import { map } from 'rxjs/operators';
 import { NgramSettings } from '@models/ngram';
 
 @Injectable({
@@ -37,13 +40,40 @@ export class VisualizationService {
         });
     }
 
+    /**
+     * Documents as points on the map. Documents are streamed by the server, so an
+     * error can be reported after the response has started; this is thrown as an
+     * error.
+     */
     public getGeoData(fieldName: string, queryModel: QueryModel, corpus: Corpus):
-        Observable<GeoDocument[]> {
+        Observable<GeoPointsResult> {
         const query = queryModel.toAPIQuery();
         return this.apiService.geoData({
             ...query,
             corpus: corpus.name,
             field: fieldName,
+        }).pipe(
+            map(result => {
+                if (result.error) {
+                    throw new Error(result.error);
+                }
+                return result;
+            })
+        );
+    }
+
+    public getGeoClusters(
+        fieldName: string, queryModel: QueryModel, corpus: Corpus, zoom: number,
+        bounds?: GeoBounds,
+    ): Observable<GeoClustersResult> {
+        const query = queryModel.toAPIQuery();
+        return this.apiService.geoClusters({
+            ...query,
+            corpus: corpus.name,
+            field: fieldName,
+            mode: 'clusters',
+            zoom,
+            bounds,
         });
     }
 
@@ -56,26 +86,26 @@ export class VisualizationService {
 }
 
     public makeAggregateTermFrequencyParameters(
-        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {fieldValue: string|number; size: number}[],
+        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {fieldValue: string|number; size: number; docCount?: number}[],
     ): AggregateTermFrequencyParameters {
         const query = queryModel.toAPIQuery();
         return {
             corpus_name: corpus.name,
             ...query,
             field_name: fieldName,
-            bins: bins.map(bin => ({field_value: bin.fieldValue, size: bin.size})),
+            bins: bins.map(bin => ({field_value: bin.fieldValue, size: bin.size, doc_count: bin.docCount})),
         };
     }
 
     public async aggregateTermFrequencySearch(
-        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {fieldValue: string|number; size: number}[],
+        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {fieldValue: string|number; size: number; docCount?: number}[],
     ): Promise<TaskResult> {
         const params = this.makeAggregateTermFrequencyParameters(corpus, queryModel, fieldName, bins);
         return this.apiService.getAggregateTermFrequency(params);
     }
 
     public makeDateTermFrequencyParameters(
-        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {size: number; start_date: Date; end_date?: Date}[],
+        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {size: number; start_date: Date; end_date?: Date; docCount?: number}[],
         unit: TimeCategory,
     ): DateTermFrequencyParameters {
         const query = queryModel.toAPIQuery();
@@ -87,6 +117,7 @@ export class VisualizationService {
                 start_date: bin.start_date.toISOString().slice(0, 10),
                 end_date: bin.end_date ? bin.end_date.toISOString().slice(0, 10) : null,
                 size: bin.size,
+                doc_count: bin.docCount,
             })),
             unit,
         };
@@ -115,7 +146,7 @@ export class VisualizationService {
     }
 
     public async dateTermFrequencySearch<TKey>(
-        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {size: number; start_date: Date; end_date?: Date}[],
+        corpus: Corpus, queryModel: QueryModel, fieldName: string, bins: {size: number; start_date: Date; end_date?: Date; docCount?: number}[],
         unit: TimeCategory,
     ): Promise<TaskResult> {
         const params = this.makeDateTermFrequencyParameters(corpus, queryModel, fieldName, bins, unit);
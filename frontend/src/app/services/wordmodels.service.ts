@@ -1,24 +1,32 @@
 import { Injectable } from '@angular/core';
 
 import { HttpClient } from '@angular/common/http';
+import { NEVER, Observable } from 'rxjs';
+import { map, mergeMap } from 'rxjs/operators';
 import {
     RelatedWordsResults,
+    SuccessfulTask,
+    TaskResult,
     WordInModelResult,
     WordSimilarity,
 } from '@models';
+import { ApiService } from './api.service';
+
+/** polling interval (ms) for word model tasks; results are usually ready quickly */
+const TASK_POLLING_PERIOD = 500;
 
 @Injectable()
 export class WordmodelsService {
-    constructor(private http: HttpClient) {}
+    constructor(private http: HttpClient, private apiService: ApiService) {}
 
     public relatedWordsRequest(data: {
         query_term: string;
         corpus_name: string;
         neighbours: number;
     }): Promise<RelatedWordsResults> {
-        return this.http
-            .post<RelatedWordsResults>(this.wmApiRoute('related_words'), data)
-            .toPromise();
+        return this.taskResult<RelatedWordsResults>(
+            this.http.post<TaskResult>(this.wmApiRoute('related_words'), data)
+        ).toPromise();
     }
 
     public wordSimilarityRequest(data: {
@@ -26,12 +34,11 @@ export class WordmodelsService {
         term_2: string;
         corpus_name: string;
     }): Promise<WordSimilarity[]> {
-        const { term_1, term_2, corpus_name } = data;
-        return this.http
-            .get<WordSimilarity[]>(this.wmApiRoute('similarity_over_time'), {
+        return this.taskResult<WordSimilarity[]>(
+            this.http.get<TaskResult>(this.wmApiRoute('similarity_over_time'), {
                 params: data,
             })
-            .toPromise();
+        ).toPromise();
     }
 
     public wordInModelRequest(data: {
@@ -62,11 +69,13 @@ export class WordmodelsService {
         corpusName: string,
         neighbours: number,
     ) {
-        return this.http.post(this.wmApiRoute('neighbor_network'), {
-            query_term: queryTerm,
-            corpus_name: corpusName,
-            neighbours,
-        });
+        return this.taskResult(
+            this.http.post<TaskResult>(this.wmApiRoute('neighbor_network'), {
+                query_term: queryTerm,
+                corpus_name: corpusName,
+                neighbours,
+            })
+        );
     }
 
     public async getWordSimilarity(
@@ -91,5 +100,17 @@ export class WordmodelsService {
         });
     }
 
+    /**
+     * Wait for the task scheduled by a request, and return its result.
+     */
+    private taskResult<T>(request: Observable<TaskResult>): Observable<T> {
+        return request.pipe(
+            mergeMap((response) =>
+                this.apiService.pollTasks(response.task_ids, NEVER, TASK_POLLING_PERIOD)
+            ),
+            map((outcome) => (outcome as SuccessfulTask<T[]>).results[0])
+        );
+    }
+
     private wmApiRoute = (route: string): string => `/api/wordmodels/${route}`;
 }
@@ -0,0 +1,20 @@
+import { parseServerSentEvents } from './server-sent-events';
+
+describe('parseServerSentEvents', () => {
+    it('should parse complete events', () => {
+        const text = 'event: result\ndata: {"index": 0, "result": 1}\n\n' +
+            'event: done\ndata: {}\n\n';
+        expect(parseServerSentEvents(text)).toEqual([
+            { event: 'result', data: { index: 0, result: 1 } },
+            { event: 'done', data: {} },
+        ]);
+    });
+
+    it('should leave out incomplete events', () => {
+        const text = 'event: result\ndata: {"index": 0, "result": 1}\n\n' +
+            'event: result\ndata: {"ind';
+        expect(parseServerSentEvents(text)).toEqual([
+            { event: 'result', data: { index: 0, result: 1 } },
+        ]);
+    });
+});
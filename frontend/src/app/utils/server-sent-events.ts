@@ -0,0 +1,30 @@
+export interface ServerSentEvent {
+    event: string;
+    data: any;
+}
+
+/**
+ * Parse the complete events in the text of a server-sent event stream.
+ *
+ * Events are separated by a blank line; an incomplete event at the end of
+ * the text is left out, so this can be used on a partially received stream.
+ * Event data is parsed as JSON.
+ */
+export const parseServerSentEvents = (text: string): ServerSentEvent[] => {
+    const blocks = text.split('\n\n');
+    // the last block is incomplete (or empty if the text ends with a blank line)
+    return blocks.slice(0, -1).map(parseEvent);
+};
+
+const parseEvent = (block: string): ServerSentEvent => {
+    let event = 'message';
+    const data: string[] = [];
+    for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) {
+            event = line.slice('event:'.length).trim();
+        } else if (line.startsWith('data:')) {
+            data.push(line.slice('data:'.length).trim());
+        }
+    }
+    return { event, data: data.length ? JSON.parse(data.join('\n')) : undefined };
+};
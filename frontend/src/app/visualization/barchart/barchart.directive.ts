@@ -449,18 +449,26 @@ export abstract class BarchartDirective<
         return new Promise((resolve, reject) => {
             this.requestSeriesTermFrequency(series, queryModelCopy).then(response => {
                 this.tasksToCancel = response.task_ids;
-                const poller$ = this.apiService.pollTasks(this.tasksToCancel, this.stopPolling$);
-                poller$.subscribe({
+                // results are streamed per bin, as soon as each bin is complete
+                const results: TermFrequencyResult[] = new Array(response.task_ids.length);
+                let received = 0;
+                const stream$ = this.apiService.streamTasks<TermFrequencyResult>(
+                    this.tasksToCancel, this.stopPolling$
+                );
+                stream$.subscribe({
                     error: (error) => {
                         this.onFailure(error);
                         reject(error);
                     },
-                    next: (result) => {
-                        resolve(this.processSeriesTermFrequency(result['results'], series));
+                    next: ({ index, result }) => {
+                        results[index] = result;
+                        received += 1;
                     },
                     complete: () => {
-                        // abort tasks if the Observable is completed via takeUntil
-                        if (!this.dataHasLoaded) {
+                        if (received === results.length) {
+                            resolve(this.processSeriesTermFrequency(results, series));
+                        } else {
+                            // abort tasks if the Observable is completed via takeUntil
                             this.apiService.abortTasks({ task_ids: this.tasksToCancel });
                         }
                     }
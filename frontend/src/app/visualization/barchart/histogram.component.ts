@@ -83,6 +83,7 @@ export class HistogramComponent
         return series.data.map((bin) => ({
             fieldValue: bin.key,
             size: this.documentLimitForCategory(bin, series),
+            docCount: bin.doc_count,
         }));
     }
 
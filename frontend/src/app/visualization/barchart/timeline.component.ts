@@ -101,6 +101,7 @@ export class TimelineComponent
                 start_date: minDate,
                 end_date: maxDate,
                 size: this.documentLimitForCategory(bin, series),
+                docCount: bin.doc_count,
             };
         });
     }
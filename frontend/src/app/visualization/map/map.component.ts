@@ -1,10 +1,15 @@
 import { Component, ElementRef, EventEmitter, Input, Output, OnChanges, SimpleChanges, ViewChild } from '@angular/core';
-import { BehaviorSubject } from 'rxjs';
+import { BehaviorSubject, Subject, Subscription } from 'rxjs';
+import { debounceTime, switchMap } from 'rxjs/operators';
+import { changeset, View } from 'vega';
 import embed, { VisualizationSpec } from 'vega-embed';
 
-import { Corpus, CorpusField, GeoDocument, GeoLocation, QueryModel } from '@models';
+import { Corpus, CorpusField, GeoCluster, GeoDocument, GeoLocation, QueryModel } from '@models';
 import { VisualizationService } from '@services';
-import { MapDataResults } from '@models/map-data';
+import { INITIAL_MAP_SCALE, MapDataResults, MapView } from '@models/map-data';
+
+/** delay (ms) after panning or zooming before clusters are requested */
+const VIEW_CHANGE_DEBOUNCE = 300;
 import { RouterStoreService } from 'app/store/router-store.service';
 
 
@@ -26,10 +31,14 @@ export class MapComponent implements OnChanges {
 
     mapCenter: GeoLocation | null;
     results: GeoDocument[];
+    clusters: GeoCluster[];
 
     isLoading$ = new BehaviorSubject<boolean>(false);
 
     private mapDataResults: MapDataResults;
+    private view: View;
+    private viewChange$ = new Subject<MapView>();
+    private clustersSubscription: Subscription;
 
     constructor(
         private routerStoreService: RouterStoreService,
@@ -59,12 +68,24 @@ export class MapComponent implements OnChanges {
 
                 this.mapDataResults.result$.subscribe(data => {
                     this.results = data.geoDocuments;
+                    this.clusters = data.clusters;
                     this.mapCenter = data.mapCenter;
                     this.renderChart();
                 });
 
 
                 this.mapDataResults.error$.subscribe(error => this.emitError(error));
+
+                // request clusters for the visible map when it is panned or zoomed
+                this.clustersSubscription?.unsubscribe();
+                const mapDataResults = this.mapDataResults;
+                this.clustersSubscription = this.viewChange$.pipe(
+                    debounceTime(VIEW_CHANGE_DEBOUNCE),
+                    switchMap(view => mapDataResults.clustersForView(view)),
+                ).subscribe({
+                    next: clusters => this.updateClusters(clusters),
+                    error: error => this.emitError(error),
+                });
             }
         }
     }
@@ -72,6 +93,7 @@ export class MapComponent implements OnChanges {
 
     ngOnDestroy(): void {
         this.mapDataResults?.complete();
+        this.clustersSubscription?.unsubscribe();
     }
 
 
@@ -94,7 +116,7 @@ export class MapComponent implements OnChanges {
                 { "name": "ty", "update": "height / 2" },
                 {
                     "name": "scale",
-                    "value": 500,
+                    "value": INITIAL_MAP_SCALE,
                     "on": [{
                         "events": { "type": "wheel", "consume": true },
                         "update": "clamp(scale * pow(1.0005, -event.deltaY * pow(16, event.deltaMode)), 150, 3000)"
@@ -179,6 +201,21 @@ export class MapComponent implements OnChanges {
                     "name": "points",
                     "format": { "type": "json" },
                     "values": this.results
+                },
+                {
+                    "name": "clusters",
+                    "format": { "type": "json" },
+                    "values": this.clusters
+                }
+            ],
+
+            "scales": [
+                {
+                    "name": "clusterSize",
+                    "type": "sqrt",
+                    "domain": { "data": "clusters", "field": "properties.count" },
+                    "zero": true,
+                    "range": [0, 600]
                 }
             ],
 
@@ -216,6 +253,30 @@ export class MapComponent implements OnChanges {
                             "projection": "projection",
                         }
                     ]
+                },
+                {
+                    "type": "symbol",
+                    "from": { "data": "clusters" },
+                    "encode": {
+                        "enter": {
+                            "size": { "scale": "clusterSize", "field": "properties.count" },
+                            "fill": { "value": "#303F9F" },
+                            "fillOpacity": { "value": 0.6 },
+                            "stroke": { "value": "grey" },
+                            "tooltip": { "signal": "datum.properties.count + ' documents'" },
+                        },
+                        "update": {
+                            "x": { "field": "x" },
+                            "y": { "field": "y" },
+                        },
+                    },
+                    "transform": [
+                        {
+                            "type": "geopoint",
+                            "projection": "projection",
+                            "fields": ["geometry.coordinates[0]", "geometry.coordinates[1]"],
+                        }
+                    ]
                 }
             ]
         };
@@ -229,7 +290,7 @@ export class MapComponent implements OnChanges {
         const height = width * aspectRatio;
 
         try {
-            await embed(this.vegaMap.nativeElement, spec, {
+            const result = await embed(this.vegaMap.nativeElement, spec, {
                 mode: 'vega',
                 renderer: 'canvas',
                 width: width,
@@ -237,11 +298,38 @@ export class MapComponent implements OnChanges {
                 actions: false,
                 tooltip: true,
             });
+            this.view = result.view;
+            if (this.clusters?.length) {
+                const onViewChange = () => this.viewChange$.next(this.currentView());
+                ['scale', 'rotateX', 'centerY'].forEach(signal =>
+                    this.view.addSignalListener(signal, onViewChange)
+                );
+            }
         } catch (error) {
             this.emitError(error);
         }
     }
 
+    /** parameters of the map projection as it is currently shown */
+    private currentView(): MapView {
+        return {
+            scale: this.view.signal('scale'),
+            rotateX: this.view.signal('rotateX'),
+            centerX: this.mapCenter.location.lon,
+            centerY: this.view.signal('centerY'),
+            width: this.view.width(),
+            height: this.view.height(),
+        };
+    }
+
+    /** replace the clusters on the map, without resetting the view */
+    private updateClusters(clusters: GeoCluster[]): void {
+        this.clusters = clusters;
+        this.view?.change(
+            'clusters', changeset().remove(() => true).insert(clusters)
+        ).run();
+    }
+
     emitError(error: { message: string }) {
         this.mapError.emit(error?.message);
     }
@@ -2,7 +2,9 @@ import * as _ from 'lodash';
 import { Observable, Subject, from, of } from 'rxjs';
 import { takeUntil } from 'rxjs/operators';
 import { mockUserResponse } from './user';
-import { Corpus, CorpusDocumentationPage, TaskResult, TasksOutcome } from '../app/models';
+import {
+    Corpus, CorpusDocumentationPage, TaskResult, TasksOutcome, TaskStreamResult
+} from '../app/models';
 import { LimitedResultsDownloadParameters } from '../app/models/search-results';
 import { corpusDefinitionFactory } from './corpus-definition';
 import { APIEditableCorpus, CorpusDataFile } from '../app/models/corpus-definition';
@@ -61,6 +63,12 @@ export class ApiServiceMock {
         return from([response, response]).pipe(takeUntil(stopPolling$));
     }
 
+    public streamTasks<T>(ids: string[], stop$: Subject<void>): Observable<TaskStreamResult<T>> {
+        return from(ids.map((id, index) => ({ index, result: undefined as T }))).pipe(
+            takeUntil(stop$)
+        );
+    }
+
     public downloads() {
         return Promise.resolve([]);
     }